@@ -0,0 +1,194 @@
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class UserDeletionDomain:
+    """
+    Cascade delete of everything a user owns
+    Sessions (GSI1), application authorizations (both relationship directions
+    plus the authorization-{app} scope records), orders in the orders table,
+    then the user record, and the Cognito user last
+
+    Every step only deletes what is still there and nothing is looked up
+    through a record an earlier step removed, so a retry after a partial
+    failure simply picks up the leftovers. The user record and the Cognito
+    user are kept until everything else is gone, because they are how the
+    user is found again on a retry.
+    """
+
+    def __init__(self, dynamodb_service, cognito_service, progress_callback=None):
+        """
+        Initialize with the services the cascade works through
+
+        Args:
+            dynamodb_service: An instance of DynamoDBService
+            cognito_service: An instance of CognitoAdminService
+            progress_callback (callable): Called with (step, report) after each step (optional)
+        """
+        self.dynamodb_service = dynamodb_service
+        self.cognito_service = cognito_service
+        self.progress_callback = progress_callback
+
+    def delete_user(self, username):
+        """
+        Delete a user and everything they own
+
+        Args:
+            username (str): Cognito username (the user_id in the admin API path)
+
+        Returns:
+            dict: Per-step counts, the resolved DynamoDB user ID and whether the deletion is complete
+        """
+        cognito_user = self.cognito_service.get_user(username)
+        user_id = self._resolve_user_id(username, cognito_user)
+
+        report = {
+            'username': username,
+            'user_id': user_id,
+            'complete': False
+        }
+
+        report['sessions'] = self._delete_sessions(user_id)
+        self._progress('sessions', report)
+
+        report['authorizations'] = self._delete_user_partition(user_id)
+        self._progress('authorizations', report)
+
+        report['orders'] = self._delete_orders(user_id)
+        self._progress('orders', report)
+
+        if any(report[step]['failed'] for step in ('sessions', 'authorizations', 'orders')):
+            # keep the user record and the Cognito user so a retry can find the leftovers
+            logger.warning("Cascade delete for %s incomplete, keeping user record for retry", username)
+            return report
+
+        report['user_record'] = self.dynamodb_service.delete_user_record(user_id)
+        self._progress('user_record', report)
+        if not report['user_record']:
+            return report
+
+        report['cognito'] = self.cognito_service.delete_user(username)
+        self._progress('cognito', report)
+
+        report['complete'] = report['cognito']
+        return report
+
+    def _resolve_user_id(self, username, cognito_user):
+        """
+        Find the DynamoDB user ID (user-xxxxxxxx) for a Cognito user
+        The sub is looked up through GSI3; the username itself is tried as a sub
+        and as a legacy user-{username} ID when Cognito no longer knows the user
+
+        Args:
+            username (str): Cognito username
+            cognito_user (dict): User data from CognitoAdminService.get_user (None if not found)
+
+        Returns:
+            str: The DynamoDB user ID
+        """
+        subs = []
+        if cognito_user and cognito_user.get('attributes', {}).get('sub'):
+            subs.append(cognito_user['attributes']['sub'])
+        subs.append(username)
+
+        for sub in subs:
+            user = self.dynamodb_service.get_user_by_sub(sub)
+            if user:
+                return user['PK']
+
+        return f"user-{username}"
+
+    def _delete_sessions(self, user_id):
+        """
+        Delete every session of a user, found through GSI1
+
+        Args:
+            user_id (str): The DynamoDB user ID
+
+        Returns:
+            dict: found / deleted / failed counts
+        """
+        from boto3.dynamodb.conditions import Key, Attr
+
+        keys = [
+            {'PK': item['PK'], 'SK': item['SK']}
+            for item in self.dynamodb_service.iter_query({
+                'IndexName': 'GSI1',
+                'KeyConditionExpression': Key('GSI1-PK').eq(f"user-{user_id}"),
+                'FilterExpression': Attr('SK').eq('session')
+            }, projection=['PK', 'SK'])
+        ]
+        return self._batch_delete(keys)
+
+    def _delete_user_partition(self, user_id):
+        """
+        Delete everything stored under the user's partition except the user record,
+        plus the application-side records for each authorized application
+
+        Args:
+            user_id (str): The DynamoDB user ID
+
+        Returns:
+            dict: found / deleted / failed counts
+        """
+        from boto3.dynamodb.conditions import Key
+
+        keys = []
+        for item in self.dynamodb_service.iter_query({
+            'KeyConditionExpression': Key('PK').eq(user_id)
+        }, projection=['PK', 'SK']):
+            if item['SK'] == 'user':
+                continue
+
+            keys.append({'PK': item['PK'], 'SK': item['SK']})
+
+            if item['SK'].startswith('application-'):
+                application_id = item['SK'].replace('application-', '', 1)
+                keys.append({'PK': f"application-{application_id}", 'SK': user_id})
+                keys.append({'PK': f"authorization-{application_id}", 'SK': user_id})
+
+        return self._batch_delete(keys)
+
+    def _delete_orders(self, user_id):
+        """
+        Delete the user's orders from the orders table
+
+        Args:
+            user_id (str): The DynamoDB user ID
+
+        Returns:
+            dict: found / deleted / failed counts
+        """
+        from boto3.dynamodb.conditions import Key
+
+        keys = [
+            {'PK': item['PK'], 'SK': item['SK']}
+            for item in self.dynamodb_service.iter_query({
+                'KeyConditionExpression': Key('PK').eq(user_id)
+            }, table=self.dynamodb_service.orders_table, projection=['PK', 'SK'])
+        ]
+        return self._batch_delete(keys, self.dynamodb_service.orders_table_name)
+
+    def _batch_delete(self, keys, table_name=None):
+        """
+        Delete keys in parallel batches and summarise the outcome
+
+        Args:
+            keys (list): The keys to delete
+            table_name (str): Table to delete from (default: main table)
+
+        Returns:
+            dict: found / deleted / failed counts
+        """
+        result = self.dynamodb_service.batch_delete_items(keys, table_name=table_name)
+        return {
+            'found': len(keys),
+            'deleted': len(result['deleted']),
+            'failed': len(result['failed'])
+        }
+
+    def _progress(self, step, report):
+        """Log a finished step and pass it to the progress callback"""
+        logger.info("Cascade delete %s: %s", report['username'], step, result=report.get(step))
+        if self.progress_callback:
+            self.progress_callback(step, report)
@@ -1,8 +1,16 @@
 import os
 import json
-from app.services.aws.cognito_admin_service import CognitoAdminService
+from app.services import registry
 from app.middlewares.admin_auth import admin_only
+from app.services.aws.io_budget import track_io
+from app.utils.logger import get_logger, log_request
+from app.services.warmup import warm_start
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'cognito': 1})
 @admin_only
 def handler(event, context):
     """
@@ -52,7 +60,7 @@ def handler(event, context):
             }
         
         # Initialize Cognito service
-        cognito_service = CognitoAdminService()
+        cognito_service = registry.cognito_admin_service()
         
         success = False
         action_performed = ""
@@ -107,7 +115,7 @@ def handler(event, context):
         }
         
     except Exception as e:
-        print(f"Error changing user account status: {str(e)}")
+        logger.error("Error changing user account status: %s", e)
         return {
             'statusCode': 500,
             'headers': {
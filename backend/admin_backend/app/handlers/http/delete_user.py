@@ -1,14 +1,22 @@
 import os
 import json
-from app.services.aws.cognito_admin_service import CognitoAdminService
-from app.services.aws.dynamodb_service import DynamoDBService
+from app.services import registry
+from app.domains.user_deletion_domain import UserDeletionDomain
 from app.middlewares.admin_auth import admin_only
+from app.services.aws.io_budget import track_io
+from app.utils.logger import get_logger, log_request
+from app.services.warmup import warm_start
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io()
 @admin_only
 def handler(event, context):
     """
     Handler for deleting a user
-    Removes user from Cognito User Pool and cleans up related DynamoDB records
+    Removes everything the user owns in DynamoDB, then the user from Cognito User Pool
     
     Args:
         event: API Gateway Lambda Proxy Input Format
@@ -50,13 +58,15 @@ def handler(event, context):
             }
         
         # Initialize services
-        cognito_service = CognitoAdminService()
-        dynamodb_service = DynamoDBService()
+        cognito_service = registry.cognito_admin_service()
+        dynamodb_service = registry.dynamodb_service()
+        user_deletion_domain = UserDeletionDomain(dynamodb_service, cognito_service)
         
-        # Delete user from Cognito
-        cognito_success = cognito_service.delete_user(user_id)
+        # Remove sessions, authorizations, orders, the user record and finally the Cognito user
+        report = user_deletion_domain.delete_user(user_id)
         
-        if not cognito_success:
+        if not report['complete']:
+            # Whatever is left is still reachable, so calling delete again resumes the cleanup
             return {
                 'statusCode': 500,
                 'headers': {
@@ -64,21 +74,13 @@ def handler(event, context):
                     'Access-Control-Allow-Origin': '*',
                     'Access-Control-Allow-Credentials': True,
                 },
-                'body': json.dumps({'message': 'Failed to delete user from Cognito'})
+                'body': json.dumps({
+                    'message': 'User deletion incomplete, retry to finish',
+                    'user_id': user_id,
+                    'report': report
+                })
             }
         
-        # Clean up DynamoDB records
-        db_user_id = f"user-{user_id}"
-        
-        # Delete user record
-        dynamodb_service.delete_user_record(db_user_id)
-        
-        # Delete user authorizations
-        dynamodb_service.delete_user_authorizations(db_user_id)
-        
-        # Delete user sessions
-        dynamodb_service.delete_user_sessions(db_user_id)
-        
         # Return success response
         return {
             'statusCode': 200,
@@ -89,12 +91,13 @@ def handler(event, context):
             },
             'body': json.dumps({
                 'message': 'User deleted successfully',
-                'user_id': user_id
+                'user_id': user_id,
+                'report': report
             })
         }
         
     except Exception as e:
-        print(f"Error deleting user: {str(e)}")
+        logger.error("Error deleting user: %s", e)
         return {
             'statusCode': 500,
             'headers': {
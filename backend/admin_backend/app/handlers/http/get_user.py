@@ -1,9 +1,16 @@
 import os
 import json
-from app.services.aws.cognito_admin_service import CognitoAdminService
-from app.services.aws.dynamodb_service import DynamoDBService
+from app.services import registry
 from app.middlewares.admin_auth import admin_only
+from app.services.aws.io_budget import track_io
+from app.utils.logger import get_logger, log_request
+from app.services.warmup import warm_start
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 3, 'cognito': 1, 'forbid': ['Scan']})
 @admin_only
 def handler(event, context):
     """
@@ -32,8 +39,8 @@ def handler(event, context):
             }
         
         # Initialize services
-        cognito_service = CognitoAdminService()
-        dynamodb_service = DynamoDBService()
+        cognito_service = registry.cognito_admin_service()
+        dynamodb_service = registry.dynamodb_service()
         
         # Get user from Cognito
         user_data = cognito_service.get_user(user_id)
@@ -55,17 +62,22 @@ def handler(event, context):
         # Get user's authorized applications
         user_applications = dynamodb_service.get_user_applications(f"user-{user_id}")
         
+        # Load the application records for all of them in one batched read
+        application_ids = [app.get('SK', '').replace('application-', '') for app in user_applications]
+        applications = dynamodb_service.get_applications(application_ids)
+        
         # Combine data
         complete_user_data = {
             **user_data,
             'dynamodb_data': dynamodb_user if dynamodb_user else {},
             'authorized_applications': [
                 {
-                    'application_id': app.get('SK', '').replace('application-', ''),
-                    'authorized_at': app.get('authorized_at', ''),
-                    'channels': app.get('channels', [])
+                    'application_id': application_id,
+                    'application_name': applications.get(application_id, {}).get('name', application_id),
+                    'authorized_at': app.get('authorized_at', app.get('created_at', '')),
+                    'channels': app.get('channels', applications.get(application_id, {}).get('channels', []))
                 } 
-                for app in user_applications
+                for application_id, app in zip(application_ids, user_applications)
             ]
         }
         
@@ -81,7 +93,7 @@ def handler(event, context):
         }
         
     except Exception as e:
-        print(f"Error getting user: {str(e)}")
+        logger.error("Error getting user: %s", e)
         return {
             'statusCode': 500,
             'headers': {
@@ -1,8 +1,16 @@
 import os
 import json
-from app.services.aws.cognito_admin_service import CognitoAdminService
+from app.services import registry
 from app.middlewares.admin_auth import admin_only
+from app.services.aws.io_budget import track_io
+from app.utils.logger import get_logger, log_request
+from app.services.warmup import warm_start
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'cognito': 1})
 @admin_only
 def handler(event, context):
     """
@@ -23,7 +31,7 @@ def handler(event, context):
         filter_expr = query_params.get('filter')
         
         # Initialize Cognito service
-        cognito_service = CognitoAdminService()
+        cognito_service = registry.cognito_admin_service()
         
         # Get users from Cognito
         result = cognito_service.list_users(
@@ -50,7 +58,7 @@ def handler(event, context):
         }
         
     except Exception as e:
-        print(f"Error listing users: {str(e)}")
+        logger.error("Error listing users: %s", e)
         return {
             'statusCode': 500,
             'headers': {
@@ -1,8 +1,16 @@
 import os
 import json
-from app.services.aws.cognito_admin_service import CognitoAdminService
+from app.services import registry
 from app.middlewares.admin_auth import admin_only
+from app.services.aws.io_budget import track_io
+from app.utils.logger import get_logger, log_request
+from app.services.warmup import warm_start
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'cognito': 1})
 @admin_only
 def handler(event, context):
     """
@@ -74,7 +82,7 @@ def handler(event, context):
                 }
         
         # Initialize Cognito service
-        cognito_service = CognitoAdminService()
+        cognito_service = registry.cognito_admin_service()
         
         # Update user attributes
         success = cognito_service.update_user_attributes(user_id, attributes)
@@ -105,7 +113,7 @@ def handler(event, context):
         }
         
     except Exception as e:
-        print(f"Error updating user: {str(e)}")
+        logger.error("Error updating user: %s", e)
         return {
             'statusCode': 500,
             'headers': {
@@ -1,16 +1,31 @@
 import os
 import json
-import base64
-import time
 import traceback
 from functools import wraps
-from jose import jwk, jwt
-from jose.utils import base64url_decode
+
+from app.services import registry
+from app.services.auth.claims_cache import VerifiedClaimsCache
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class AdminAuthError(Exception):
     """Custom exception for admin authorization failures"""
     pass
 
+# Shared across warm invocations: JWKS + verified claims live in JWTService,
+# the admin decision for each token digest is kept here until the token's exp
+_admin_decision_cache = VerifiedClaimsCache()
+
+def get_jwt_service():
+    """
+    Get the JWTService used to verify admin tokens (the container's shared one)
+    
+    Returns:
+        JWTService: Shared JWT service instance
+    """
+    return registry.jwt_service()
+
 def admin_only(handler):
     """
     Middleware decorator to verify admin access to endpoints
@@ -32,7 +47,7 @@ def admin_only(handler):
             headers_lower = {k.lower(): v for k, v in headers.items()} if headers else {}
             
             if not headers_lower or 'authorization' not in headers_lower:
-                print("Authorization header missing. Available headers:", headers)
+                logger.warning("Authorization header missing")
                 return {
                     'statusCode': 401,
                     'headers': {
@@ -45,14 +60,23 @@ def admin_only(handler):
                 
             # Extract the JWT token from the Authorization header
             auth_header = headers_lower.get('authorization')
-            print("Authorization header found:", auth_header)
             token = auth_header.replace('Bearer ', '')
             
-            # Verify token and extract claims
-            claims = verify_token(token)
+            # Reuse the decision for a token we already verified, otherwise verify and check for admin role
+            decision = _admin_decision_cache.get(token)
+            if decision is None:
+                claims = verify_token(token)
+                decision = {
+                    'exp': claims.get('exp'),
+                    'claims': claims,
+                    'is_admin': is_admin_user(claims)
+                }
+                _admin_decision_cache.put(token, decision)
+            
+            claims = decision['claims']
             
             # Check for admin role
-            if not is_admin_user(claims):
+            if not decision['is_admin']:
                 return {
                     'statusCode': 403,
                     'headers': {
@@ -73,7 +97,7 @@ def admin_only(handler):
             return handler(event, context)
             
         except AdminAuthError as e:
-            print(f"Admin auth error: {str(e)}")
+            logger.warning("Admin auth error: %s", e)
             return {
                 'statusCode': 401,
                 'headers': {
@@ -84,8 +108,7 @@ def admin_only(handler):
                 'body': json.dumps({'message': str(e)})
             }
         except Exception as e:
-            print(f"Unexpected error in admin authorization: {str(e)}")
-            print(traceback.format_exc())
+            logger.error("Unexpected error in admin authorization: %s", e, traceback=traceback.format_exc)
             return {
                 'statusCode': 500,
                 'headers': {
@@ -100,7 +123,8 @@ def admin_only(handler):
 
 def verify_token(token):
     """
-    Verify JWT token signature and expiration
+    Verify JWT token signature (RS256 against the Cognito JWKS), expiration,
+    issuer and audience
     
     Args:
         token (str): JWT token
@@ -111,43 +135,24 @@ def verify_token(token):
     Raises:
         AdminAuthError: If token is invalid
     """
+    if not os.environ.get('COGNITO_USER_POOL_ID'):
+        logger.error("COGNITO_USER_POOL_ID environment variable not set")
+        raise AdminAuthError('Configuration error')
+    
     try:
-        # Get Cognito user pool ID and region from environment variables
-        user_pool_id = os.environ.get('COGNITO_USER_POOL_ID')
-        region = os.environ.get('AWS_REGION', 'ap-southeast-2')
-        
-        if not user_pool_id:
-            print("COGNITO_USER_POOL_ID environment variable not set")
-            raise AdminAuthError('Configuration error')
-            
-        # Get token header
-        header = jwt.get_unverified_header(token)
-        
-        # For debugging
-        print(f"Token header: {header}")
-        
-        # For development/testing purposes, we'll use unverified claims
-        # but log the details for debugging
-        payload = jwt.get_unverified_claims(token)
-        print(f"Token payload: {json.dumps(payload)}")
-        
-        # Check if token is expired
-        if 'exp' in payload and payload['exp'] < int(time.time()):
-            print(f"Token expired: {payload['exp']} < {int(time.time())}")
+        claims = get_jwt_service().validate_id_token(token)
+    except ValueError as e:
+        logger.warning("Error verifying token: %s", e)
+        if 'expired' in str(e):
             raise AdminAuthError('Token is expired')
-            
-        # Check issuer
-        expected_issuer = f'https://cognito-idp.{region}.amazonaws.com/{user_pool_id}'
-        if 'iss' in payload and payload['iss'] != expected_issuer:
-            print(f"Invalid issuer: {payload['iss']} != {expected_issuer}")
-            # For debugging, we'll just log this but not fail
-            print("WARNING: Token issuer doesn't match expected value")
-            
-        return payload
-        
-    except Exception as e:
-        print(f"Error verifying token: {str(e)}")
         raise AdminAuthError('Invalid token')
+    
+    # Admin checks rely on ID token claims (custom:is_admin)
+    if claims.get('token_use') != 'id':
+        logger.warning("Rejected token with token_use: %s", claims.get('token_use'))
+        raise AdminAuthError('Invalid token')
+    
+    return claims
 
 def is_admin_user(claims):
     """
@@ -159,9 +164,6 @@ def is_admin_user(claims):
     Returns:
         bool: True if user has admin role, False otherwise
     """
-    # Print all claims for debugging
-    print(f"Checking admin status in claims: {json.dumps(claims)}")
-    
     # Check for admin attribute in various possible formats
     # 1. Check custom:is_admin attribute
     if claims.get('custom:is_admin', '').lower() == 'true':
@@ -179,7 +181,7 @@ def is_admin_user(claims):
         
     # 4. For testing, if environment variable BYPASS_ADMIN_CHECK is set to true, allow all authenticated users
     if os.environ.get('BYPASS_ADMIN_CHECK', '').lower() == 'true':
-        print("WARNING: Admin check bypassed due to BYPASS_ADMIN_CHECK environment variable")
+        logger.warning("Admin check bypassed due to BYPASS_ADMIN_CHECK environment variable")
         return True
         
     # No admin role found
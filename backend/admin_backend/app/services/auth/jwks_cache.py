@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class JWKSCache:
+    """
+    cache for cognito's public keys (jwks)
+    keeps the key set in memory for a ttl, mirrors it to /tmp so the next cold
+    start in the same sandbox can skip the download, and refetches once when a
+    token is signed with a kid we don't know yet (cognito key rotation)
+    a failed download isn't retried for min_refresh_interval - requests keep the
+    stale keys (or fail fast without any) instead of each waiting out the timeout
+    """
+
+    # one cache per jwks url, shared by every JWTService in the container
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_url(cls, jwks_url):
+        """get the shared cache for a jwks url (created on first use)"""
+        with cls._instances_lock:
+            cache = cls._instances.get(jwks_url)
+            if cache is None:
+                cache = cls(jwks_url)
+                cls._instances[jwks_url] = cache
+            return cache
+
+    def __init__(self, jwks_url, ttl_seconds=None, cache_dir=None, min_refresh_interval=None, timeout=None):
+        """
+        set up the cache (nothing is downloaded until the keys are needed)
+
+        args:
+            jwks_url (str): where cognito publishes the key set
+            ttl_seconds (int): how long a downloaded key set is trusted (env JWKS_CACHE_TTL_SECONDS, default 1 hour)
+            cache_dir (str): where the on-disk copy lives (env JWKS_CACHE_DIR, default /tmp)
+            min_refresh_interval (int): minimum seconds between kid-miss refetches, and between retries
+                after a failed download (env JWKS_MIN_REFRESH_SECONDS, default 60)
+            timeout (int): download timeout in seconds (env JWKS_FETCH_TIMEOUT_SECONDS, default 5)
+        """
+        self.jwks_url = jwks_url
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.environ.get('JWKS_CACHE_TTL_SECONDS', 3600))
+        self.min_refresh_interval = (min_refresh_interval if min_refresh_interval is not None
+                                     else int(os.environ.get('JWKS_MIN_REFRESH_SECONDS', 60)))
+        self.timeout = timeout if timeout is not None else int(os.environ.get('JWKS_FETCH_TIMEOUT_SECONDS', 5))
+
+        cache_dir = cache_dir or os.environ.get('JWKS_CACHE_DIR', '/tmp')
+        url_digest = hashlib.sha256(jwks_url.encode('utf-8')).hexdigest()[:16]
+        self.cache_path = os.path.join(cache_dir, f"jwks-{url_digest}.json")
+
+        self.jwks = None
+        self.fetched_at = 0.0
+        self.failed_at = 0.0  # last failed download, for the backoff
+        self.version = 0  # bumped every time a new key set is installed
+        self._disk_checked = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        get the current key set, downloading it only when missing or past its ttl
+
+        returns:
+            dict: the jwks document ({'keys': [...]})
+
+        raises:
+            RuntimeError: if there are no keys and the last download failed within min_refresh_interval
+        """
+        if self.jwks is not None and (not self._is_stale() or self._backing_off()):
+            return self.jwks
+
+        with self._lock:
+            # another thread may have refreshed (or failed to) while we waited for the lock
+            if self.jwks is not None and (not self._is_stale() or self._backing_off()):
+                return self.jwks
+
+            if not self._disk_checked:
+                self._disk_checked = True
+                if self._load_from_disk() and not self._is_stale():
+                    return self.jwks
+
+            if self._backing_off():
+                raise RuntimeError(f"jwks download failed {time.time() - self.failed_at:.0f}s ago, not retrying yet")
+
+            try:
+                self._fetch()
+            except Exception as e:
+                self.failed_at = time.time()
+                if self.jwks is None:
+                    raise
+                # cognito unreachable - keep using the keys we already have
+                logger.warning("jwks refresh failed, using cached keys: %s", e)
+
+        return self.jwks
+
+    def get_key(self, kid):
+        """
+        find the jwk with a given kid, refetching once if it isn't in the cached set
+
+        args:
+            kid (str): key id from the token header
+
+        returns:
+            dict: the matching jwk, or none if cognito doesn't know it either
+        """
+        key = self._find_key(self.get(), kid)
+        if key is not None:
+            return key
+
+        # unknown kid - cognito may have rotated its keys since we cached them
+        if self.refresh():
+            return self._find_key(self.jwks, kid)
+        return None
+
+    def refresh(self):
+        """
+        force a refetch (single-flight and rate limited by min_refresh_interval)
+
+        returns:
+            bool: true if a newer key set is available than before the call
+        """
+        seen_version = self.version
+
+        with self._lock:
+            # someone else already refetched while we were waiting
+            if self.version != seen_version:
+                return True
+
+            if time.time() - max(self.fetched_at, self.failed_at) < self.min_refresh_interval:
+                return False
+
+            try:
+                self._fetch()
+            except Exception as e:
+                self.failed_at = time.time()
+                logger.error("jwks refresh failed: %s", e)
+                return False
+
+        return True
+
+    def _is_stale(self):
+        """check if the cached key set is older than the ttl"""
+        return time.time() - self.fetched_at >= self.ttl_seconds
+
+    def _backing_off(self):
+        """check if the last download failed less than min_refresh_interval ago"""
+        return time.time() - self.failed_at < self.min_refresh_interval
+
+    def _find_key(self, jwks, kid):
+        """look up a kid in a key set"""
+        for key in (jwks or {}).get('keys', []):
+            if key.get('kid') == kid:
+                return key
+        return None
+
+    def _fetch(self):
+        """download the key set from cognito and install it (caller holds the lock)"""
+        # only needed on a download, importing it costs tens of ms at cold start
+        import urllib.request
+
+        logger.info("downloading public keys from %s", self.jwks_url)
+        with urllib.request.urlopen(self.jwks_url, timeout=self.timeout) as response:
+            jwks = json.loads(response.read().decode('utf-8'))
+
+        if not isinstance(jwks, dict) or not isinstance(jwks.get('keys'), list):
+            raise ValueError("jwks response has no 'keys' list")
+
+        self._install(jwks, time.time())
+        self._save_to_disk()
+
+    def _install(self, jwks, fetched_at):
+        """swap in a new key set"""
+        self.jwks = jwks
+        self.fetched_at = fetched_at
+        self.version += 1
+
+    def _load_from_disk(self):
+        """
+        reuse the key set a previous container in this sandbox left in /tmp
+
+        returns:
+            bool: true if a key set was loaded
+        """
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+
+            if cached.get('jwks_url') != self.jwks_url or not isinstance(cached.get('jwks', {}).get('keys'), list):
+                return False
+
+            self._install(cached['jwks'], float(cached['fetched_at']))
+            return True
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return False
+
+    def _save_to_disk(self):
+        """write the key set to /tmp atomically so readers never see a partial file"""
+        import tempfile
+
+        tmp_path = None
+        try:
+            cache_dir = os.path.dirname(self.cache_path)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.jwks-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'jwks_url': self.jwks_url,
+                    'fetched_at': self.fetched_at,
+                    'jwks': self.jwks
+                }, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning("couldn't persist jwks to %s: %s", self.cache_path, e)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,152 @@
+import os
+
+from app.services.auth.jwks_cache import JWKSCache
+from app.services.auth.claims_cache import VerifiedClaimsCache
+from app.services.auth.verifiers import get_verifier, TokenVerificationError, ExpiredTokenError
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class JWTService:
+    """
+    service for validating cognito tokens using public keys
+    think of this as: "is this jwt really from cognito?"
+    """
+    
+    def __init__(self):
+        """grab cognito variables from environment variables"""
+        self.user_pool_id = os.environ.get('COGNITO_USER_POOL_ID')
+        self.app_client_id = os.environ.get('COGNITO_APP_CLIENT_ID')
+        self.region = os.environ.get('AWS_REGION', 'ap-southeast-2')
+        
+        # this is cognito's "phone book" of public keys
+        self.jwks_url = f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
+        # cache the keys so we don't download every time (shared per url, ttl + /tmp copy)
+        self.jwks_cache = JWKSCache.for_url(self.jwks_url)
+        
+        # tokens we already verified, so repeat requests skip the rsa check until exp
+        self.issuer = f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}"
+        self.claims_cache = VerifiedClaimsCache.shared(self.issuer, self.app_client_id)
+        
+        # the jwt library doing the rs256 work (JWT_VERIFIER_BACKEND: auto, jose or pyjwt),
+        # picked on the first token that misses the claims cache so cold starts skip the import
+        self._verifier = None
+        
+        # kid -> ready-to-use public key, rebuilt only when the key set changes
+        self._keys_by_kid = {}
+        self._keys_source = None
+    
+    @property
+    def verifier(self):
+        """the jwt library wrapper, created (and its library imported) on first use"""
+        if self._verifier is None:
+            self._verifier = get_verifier()
+        return self._verifier
+    
+    def _get_jwks(self):
+        """get the public keys from cognito (downloaded once per ttl, then cached)"""
+        return self.jwks_cache.get()
+    
+    def _get_key_for_token(self, token_header):
+        """find which key cognito used to sign this specific token"""
+        kid = token_header.get('kid')
+        
+        # step 2: look up the prebuilt key with matching kid
+        key = self._get_compiled_keys().get(kid)
+        
+        # unknown kid - cognito may have rotated its keys, refetch once and look again
+        if key is None and self.jwks_cache.refresh():
+            key = self._get_compiled_keys().get(kid)
+        
+        if key is not None:  # found it!
+            return key
+        
+        # step 3: if we get here, something's wrong
+        raise ValueError("can't find the key for this token - might be fake?")
+    
+    def _get_compiled_keys(self):
+        """
+        turn the jwks into rsa key objects once, instead of rebuilding the key
+        from its modulus/exponent on every token we verify
+        """
+        jwks = self._get_jwks()
+        
+        # the cache swaps in a new dict whenever it downloads, so identity tells us if it changed
+        if jwks is not self._keys_source:
+            self._keys_by_kid = {
+                key_data['kid']: self.verifier.construct_key(key_data)
+                for key_data in jwks.get('keys', [])
+                if key_data.get('kid') and key_data.get('kty') == 'RSA'
+            }
+            self._keys_source = jwks
+        
+        return self._keys_by_kid
+    
+    def warm_up(self):
+        """
+        download the public keys and build them (importing the jwt library) before
+        the first token needs them, used when priming a container at init
+        
+        returns:
+            int: number of keys ready
+        """
+        return len(self._get_compiled_keys())
+    
+    def validate_id_token(self, id_token):
+        """
+        main function: verify if this jwt is real and extract user info
+        this is like checking if a check is real using the bank's signature
+        """
+        # step 0: seen this exact token before? then it's already been verified
+        cached_claims = self.claims_cache.get(id_token)
+        if cached_claims is not None:
+            return cached_claims
+        
+        try:
+            logger.debug("checking if this jwt token is legit...")
+            
+            # step 1: peek at jwt header to see which key was used
+            token_header = self.verifier.get_unverified_header(id_token)
+            
+            # step 2: get the matching public key from cognito
+            key = self._get_key_for_token(token_header)
+            
+            # step 3: verify the signature using rsa + sha256 magic
+            # rs256 only, token must be for our app and from our cognito
+            decoded_token = self.verifier.decode(
+                id_token,
+                key,
+                audience=self.app_client_id,
+                issuer=self.issuer
+            )
+            
+            logger.debug("token is valid! user: %s", decoded_token.get('sub'))
+            self.claims_cache.put(id_token, decoded_token)
+            return decoded_token
+            
+        except ExpiredTokenError:
+            raise ValueError("token is expired")
+        except TokenVerificationError as e:
+            logger.warning("jwt verification failed: %s", e)
+            raise ValueError(f"bad token: {str(e)}")
+        except Exception as e:
+            logger.error("something went wrong: %s", e)
+            raise ValueError(f"token check failed: {str(e)}")
+    
+    def extract_user_info(self, id_token):
+        """
+        convenient function: verify token + extract user details
+        this is what we call from our api handlers
+        """
+        # first verify the token is real (all the crypto happens here)
+        decoded_token = self.validate_id_token(id_token)
+        
+        # then extract the useful user info from the verified payload
+        return {
+            'sub': decoded_token.get('sub'),  # cognito user id (never changes)
+            'email': decoded_token.get('email'),  # user's email
+            'name': decoded_token.get('name'),  # user's display name
+            'email_verified': decoded_token.get('email_verified'),  # is email confirmed?
+            'token_use': decoded_token.get('token_use'),  # should be "id"
+            'cognito:user_status': decoded_token.get('cognito:user_status')  # account status
+        } 
\ No newline at end of file
@@ -0,0 +1,161 @@
+import os
+from abc import ABC, abstractmethod
+
+class TokenVerificationError(ValueError):
+    """raised by a verifier when a token fails any check (signature, claims, format)"""
+    pass
+
+class ExpiredTokenError(TokenVerificationError):
+    """raised by a verifier when the token's exp is in the past"""
+    pass
+
+class TokenVerifier(ABC):
+    """
+    interface for the library that does the actual rs256 work
+    every backend turns a jwk into a ready key once, then decodes tokens against it
+    the library itself is imported when the verifier is created, not at module load
+    a backend missing any of the methods below fails when it's created, not on its first token
+    """
+    name = None
+
+    @abstractmethod
+    def get_unverified_header(self, token):
+        """read the jwt header (kid, alg) without checking anything"""
+
+    @abstractmethod
+    def get_unverified_claims(self, token):
+        """read the jwt payload without checking the signature (never trust these for auth)"""
+
+    @abstractmethod
+    def construct_key(self, jwk_data):
+        """build a reusable public key object from a jwk dict"""
+
+    @abstractmethod
+    def decode(self, token, key, audience, issuer):
+        """
+        verify signature, exp, aud and iss and return the claims
+
+        raises:
+            ExpiredTokenError: token is past its exp
+            TokenVerificationError: any other failure
+        """
+
+class JoseVerifier(TokenVerifier):
+    """python-jose (uses the cryptography backend when installed, pure-python rsa otherwise)"""
+    name = 'jose'
+
+    def __init__(self):
+        from jose import jwk, jwt, JWTError, ExpiredSignatureError
+        self._jwk = jwk
+        self._jwt = jwt
+        self._error = JWTError
+        self._expired_error = ExpiredSignatureError
+
+    def get_unverified_header(self, token):
+        try:
+            return self._jwt.get_unverified_header(token)
+        except self._error as e:
+            raise TokenVerificationError(str(e))
+
+    def get_unverified_claims(self, token):
+        try:
+            return self._jwt.get_unverified_claims(token)
+        except self._error as e:
+            raise TokenVerificationError(str(e))
+
+    def construct_key(self, jwk_data):
+        return self._jwk.construct(jwk_data, 'RS256')
+
+    def decode(self, token, key, audience, issuer):
+        try:
+            return self._jwt.decode(
+                token,
+                key,
+                algorithms=['RS256'],  # only allow rs256, no funny business
+                audience=audience,
+                issuer=issuer,
+                options={"verify_at_hash": False}  # skip at_hash validation for OAuth flows
+            )
+        except self._expired_error as e:
+            raise ExpiredTokenError(str(e))
+        except self._error as e:
+            raise TokenVerificationError(str(e))
+
+class PyJWTVerifier(TokenVerifier):
+    """PyJWT with the cryptography rsa implementation (pip install "PyJWT[crypto]")"""
+    name = 'pyjwt'
+
+    def __init__(self):
+        import jwt
+        from jwt.algorithms import RSAAlgorithm
+        self._jwt = jwt
+        self._rsa = RSAAlgorithm
+
+    def get_unverified_header(self, token):
+        try:
+            return self._jwt.get_unverified_header(token)
+        except self._jwt.InvalidTokenError as e:
+            raise TokenVerificationError(str(e))
+
+    def get_unverified_claims(self, token):
+        try:
+            return self._jwt.decode(token, options={"verify_signature": False})
+        except self._jwt.InvalidTokenError as e:
+            raise TokenVerificationError(str(e))
+
+    def construct_key(self, jwk_data):
+        return self._rsa.from_jwk(jwk_data)
+
+    def decode(self, token, key, audience, issuer):
+        try:
+            return self._jwt.decode(
+                token,
+                key,
+                algorithms=['RS256'],
+                audience=audience,
+                issuer=issuer
+            )
+        except self._jwt.ExpiredSignatureError as e:
+            raise ExpiredTokenError(str(e))
+        except self._jwt.InvalidTokenError as e:
+            raise TokenVerificationError(str(e))
+
+VERIFIERS = {
+    JoseVerifier.name: JoseVerifier,
+    PyJWTVerifier.name: PyJWTVerifier
+}
+
+# preference order for JWT_VERIFIER_BACKEND=auto, fastest correct backend first
+# (scripts/bench_jwt_verifiers.py, rsa-2048: jose on cryptography ~57 us/verify, pyjwt ~77 us,
+# jose on pure-python rsa ~233 us)
+AUTO_ORDER = ['jose', 'pyjwt']
+
+def get_verifier(name=None):
+    """
+    create the verifier picked by name or JWT_VERIFIER_BACKEND (default: auto)
+    auto uses the first backend in AUTO_ORDER whose library is installed
+
+    args:
+        name (str): 'jose', 'pyjwt' or 'auto'
+
+    returns:
+        TokenVerifier: ready verifier instance
+    """
+    name = (name or os.environ.get('JWT_VERIFIER_BACKEND', 'auto')).lower()
+
+    if name != 'auto':
+        if name not in VERIFIERS:
+            raise ValueError(f"unknown JWT_VERIFIER_BACKEND '{name}', expected one of: auto, {', '.join(VERIFIERS)}")
+        try:
+            return VERIFIERS[name]()
+        except ImportError as e:
+            raise ImportError(f"JWT_VERIFIER_BACKEND={name} but its library isn't installed ({e}) - "
+                              f"check the backend's requirements.txt") from e
+
+    for candidate in AUTO_ORDER:
+        try:
+            return VERIFIERS[candidate]()
+        except ImportError:
+            continue
+
+    raise ImportError("no jwt library installed - need python-jose or PyJWT[crypto]")
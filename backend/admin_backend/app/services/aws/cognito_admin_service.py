@@ -1,7 +1,10 @@
 import os
-import boto3
 import json
 from datetime import datetime
+from app.services.aws.io_budget import instrument_client
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class CognitoAdminService:
@@ -12,10 +15,18 @@ class CognitoAdminService:
 
     def __init__(self):
         """Initialize Cognito service with user pool information from environment"""
-        self.cognito = boto3.client('cognito-idp')
+        self._cognito = None
         self.user_pool_id = os.environ.get('COGNITO_USER_POOL_ID')
         self.app_client_id = os.environ.get('COGNITO_APP_CLIENT_ID')
 
+    @property
+    def cognito(self):
+        """Cognito client, created on first use so importing a handler doesn't pay for boto3"""
+        if self._cognito is None:
+            import boto3
+            self._cognito = instrument_client(boto3.client('cognito-idp'))
+        return self._cognito
+
     def _format_user_attributes(self, attributes):
         """
         Format Cognito user attributes into a dictionary
@@ -95,7 +106,7 @@ class CognitoAdminService:
             return result
             
         except Exception as e:
-            print(f"Error listing users: {str(e)}")
+            logger.error("Error listing users: %s", e)
             raise
     
     def get_user(self, username):
@@ -127,10 +138,10 @@ class CognitoAdminService:
             return user_data
             
         except self.cognito.exceptions.UserNotFoundException:
-            print(f"User not found: {username}")
+            logger.info("User not found: %s", username)
             return None
         except Exception as e:
-            print(f"Error getting user {username}: {str(e)}")
+            logger.error("Error getting user %s: %s", username, e)
             raise
     
     def update_user_attributes(self, username, attributes):
@@ -159,7 +170,7 @@ class CognitoAdminService:
             return True
             
         except Exception as e:
-            print(f"Error updating attributes for user {username}: {str(e)}")
+            logger.error("Error updating attributes for user %s: %s", username, e)
             return False
     
     def force_password_reset(self, username):
@@ -181,7 +192,7 @@ class CognitoAdminService:
             return True
             
         except Exception as e:
-            print(f"Error forcing password reset for user {username}: {str(e)}")
+            logger.error("Error forcing password reset for user %s: %s", username, e)
             return False
     
     def deactivate_user(self, username):
@@ -203,7 +214,7 @@ class CognitoAdminService:
             return True
             
         except Exception as e:
-            print(f"Error deactivating user {username}: {str(e)}")
+            logger.error("Error deactivating user %s: %s", username, e)
             return False
     
     def activate_user(self, username):
@@ -225,12 +236,13 @@ class CognitoAdminService:
             return True
             
         except Exception as e:
-            print(f"Error activating user {username}: {str(e)}")
+            logger.error("Error activating user %s: %s", username, e)
             return False
     
     def delete_user(self, username):
         """
         Delete a user from the Cognito User Pool
+        A user that no longer exists counts as deleted, so retries are safe
         
         Args:
             username (str): Cognito username
@@ -246,6 +258,10 @@ class CognitoAdminService:
             
             return True
             
+        except self.cognito.exceptions.UserNotFoundException:
+            # Already gone (e.g. a retried deletion) - nothing left to do
+            logger.info("User already deleted from Cognito: %s", username)
+            return True
         except Exception as e:
-            print(f"Error deleting user {username}: {str(e)}")
+            logger.error("Error deleting user %s: %s", username, e)
             return False
@@ -1,18 +1,83 @@
 import os
-import boto3
+import time
+import random
+import threading
 from decimal import Decimal
+from app.services.aws.io_budget import instrument_client
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# guards the first boto3.resource call when requests share a container's service from threads
+_resource_lock = threading.Lock()
 
 class DynamoDBService:
     """
     Service for DynamoDB operations in admin backend
     Handles access to the main table for user-related operations
+    and to the orders table for user deletion
     """
     
+    # BatchGetItem accepts at most 100 keys per request
+    BATCH_GET_CHUNK_SIZE = 100
+    # Attempts at re-requesting keys DynamoDB left unprocessed (throttling / 16 MB limit)
+    BATCH_GET_MAX_RETRIES = 5
+    BATCH_GET_BASE_DELAY_SECONDS = 0.05
+    # BatchWriteItem accepts at most 25 requests
+    BATCH_WRITE_CHUNK_SIZE = 25
+    BATCH_WRITE_MAX_RETRIES = 5
+    BATCH_WRITE_BASE_DELAY_SECONDS = 0.05
+    # Chunks sent at the same time by batch_delete_items
+    BATCH_WRITE_MAX_WORKERS = 4
+    
     def __init__(self):
-        """Initialize DynamoDB service with table names from environment"""
-        self.dynamodb = boto3.resource('dynamodb')
+        """
+        Initialize DynamoDB service with table names from environment
+        The boto3 resource and tables are created on first use (see dynamodb)
+        """
         self.main_table_name = os.environ.get('MAIN_TABLE', 'matt-cognito-hop-main')
-        self.main_table = self.dynamodb.Table(self.main_table_name)
+        self.orders_table_name = os.environ.get('ORDERS_TABLE', 'matt-cognito-hop-orders')
+        self._dynamodb = None
+        self._main_table = None
+        self._orders_table = None
+
+    @property
+    def dynamodb(self):
+        """The boto3 DynamoDB resource, created on first use so importing a handler doesn't pay for boto3."""
+        if self._dynamodb is None:
+            with _resource_lock:
+                if self._dynamodb is None:
+                    import boto3
+                    dynamodb = boto3.resource('dynamodb')
+                    instrument_client(dynamodb.meta.client)
+                    self._dynamodb = dynamodb
+        return self._dynamodb
+    
+    @dynamodb.setter
+    def dynamodb(self, resource):
+        self._dynamodb = resource
+
+    @property
+    def main_table(self):
+        """The main table, bound to the resource on first use"""
+        if self._main_table is None:
+            self._main_table = self.dynamodb.Table(self.main_table_name)
+        return self._main_table
+    
+    @main_table.setter
+    def main_table(self, table):
+        self._main_table = table
+
+    @property
+    def orders_table(self):
+        """The orders table, bound to the resource on first use"""
+        if self._orders_table is None:
+            self._orders_table = self.dynamodb.Table(self.orders_table_name)
+        return self._orders_table
+    
+    @orders_table.setter
+    def orders_table(self, table):
+        self._orders_table = table
     
     def get_user_by_id(self, user_id):
         """
@@ -33,12 +98,37 @@ class DynamoDBService:
             )
             return response.get('Item')
         except Exception as e:
-            print(f"Error getting user {user_id}: {str(e)}")
+            logger.error("Error getting user %s: %s", user_id, e)
+            return None
+    
+    def get_user_by_sub(self, cognito_sub):
+        """
+        Find a user record by Cognito sub using GSI3
+        
+        Args:
+            cognito_sub (str): The Cognito sub
+            
+        Returns:
+            dict: User record if found, None otherwise
+        """
+        from boto3.dynamodb.conditions import Key
+        
+        try:
+            items = self.iter_query({
+                'IndexName': 'GSI3',
+                'KeyConditionExpression': Key('GSI3-PK').eq(f"sub-{cognito_sub}") &
+                                          Key('GSI3-SK').eq('user')
+            }, max_items=1)
+            return next(items, None)
+        except Exception as e:
+            logger.error("Error finding user by sub %s: %s", cognito_sub, e)
             return None
     
     def get_user_applications(self, user_id):
         """
         Get application authorizations for a user
+        Reads the PK = user_id, SK = application-{app_id} items the SSO backend
+        mirrors from each application -> user relationship
         
         Args:
             user_id (str): The user ID
@@ -46,16 +136,77 @@ class DynamoDBService:
         Returns:
             list: List of application authorizations
         """
+        from boto3.dynamodb.conditions import Key
+        
         try:
-            response = self.main_table.query(
-                KeyConditionExpression=boto3.dynamodb.conditions.Key('PK').eq(user_id) & 
-                                      boto3.dynamodb.conditions.Key('SK').begins_with('application-')
-            )
-            return response.get('Items', [])
+            return list(self.iter_query({
+                'KeyConditionExpression': Key('PK').eq(user_id) & 
+                                          Key('SK').begins_with('application-')
+            }))
         except Exception as e:
-            print(f"Error querying applications for user {user_id}: {str(e)}")
+            logger.error("Error querying applications for user %s: %s", user_id, e)
             return []
     
+    def get_applications(self, application_ids):
+        """
+        Get application records for several application IDs in one batched read
+        
+        Args:
+            application_ids (list): The application IDs
+            
+        Returns:
+            dict: Application records keyed by application ID (unknown IDs are left out)
+        """
+        keys = [
+            {'PK': f"application-{application_id}", 'SK': 'application'}
+            for application_id in application_ids
+        ]
+        
+        if not keys:
+            return {}
+        
+        try:
+            items = self.batch_get_items(keys)
+            return {item['PK'].replace('application-', '', 1): item for item in items}
+        except Exception as e:
+            logger.error("Error batch getting applications %s: %s", application_ids, e)
+            return {}
+    
+    def batch_get_items(self, keys):
+        """
+        Get many items from the main table with BatchGetItem
+        Keys are de-duplicated and sent in chunks of 100; keys DynamoDB returns as
+        unprocessed are retried with exponential backoff
+        
+        Args:
+            keys (list): The keys of the items to get
+            
+        Returns:
+            list: The items found (in no particular order, missing keys are skipped)
+        """
+        unique_keys = list({tuple(sorted(key.items())): key for key in keys}.values())
+        items = []
+        
+        for start in range(0, len(unique_keys), self.BATCH_GET_CHUNK_SIZE):
+            request = {'Keys': unique_keys[start:start + self.BATCH_GET_CHUNK_SIZE]}
+            
+            for attempt in range(self.BATCH_GET_MAX_RETRIES + 1):
+                response = self.dynamodb.batch_get_item(RequestItems={self.main_table_name: request})
+                items.extend(response.get('Responses', {}).get(self.main_table_name, []))
+                
+                request = response.get('UnprocessedKeys', {}).get(self.main_table_name)
+                if not request or not request.get('Keys'):
+                    break
+                
+                if attempt == self.BATCH_GET_MAX_RETRIES:
+                    logger.warning("BatchGetItem gave up on %d unprocessed keys", len(request['Keys']))
+                    break
+                
+                # Exponential backoff with jitter before asking for the leftovers again
+                time.sleep(self.BATCH_GET_BASE_DELAY_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5))
+        
+        return items
+    
     def delete_user_record(self, user_id):
         """
         Delete user record from DynamoDB
@@ -75,62 +226,159 @@ class DynamoDBService:
             )
             return True
         except Exception as e:
-            print(f"Error deleting user record {user_id}: {str(e)}")
+            logger.error("Error deleting user record %s: %s", user_id, e)
             return False
     
-    def delete_user_authorizations(self, user_id):
+    def batch_delete_items(self, keys, table_name=None, max_workers=None):
         """
-        Delete all application authorizations for a user
+        Delete many items with parallel BatchWriteItem calls
+        Keys are sent in chunks of 25 from a small thread pool (through the
+        thread-safe low-level client); unprocessed deletes are retried with
+        exponential backoff, so the call finishes in bounded time
         
         Args:
-            user_id (str): The user ID
+            keys (list): The keys of the items to delete
+            table_name (str): Table to delete from (default: main table)
+            max_workers (int): Chunks in flight at once (default BATCH_WRITE_MAX_WORKERS)
             
         Returns:
-            bool: True if successful, False otherwise
+            dict: {'deleted': [keys], 'failed': [keys]} - every key lands in exactly one list
         """
-        try:
-            # First, query to get all authorizations
-            authorizations = self.get_user_applications(user_id)
-            
-            # Delete each authorization
-            for auth in authorizations:
-                self.main_table.delete_item(
-                    Key={
-                        'PK': auth['PK'],
-                        'SK': auth['SK']
-                    }
-                )
-            return True
-        except Exception as e:
-            print(f"Error deleting authorizations for user {user_id}: {str(e)}")
-            return False
-            
-    def delete_user_sessions(self, user_id):
+        table_name = table_name or self.main_table_name
+        unique_keys = list({tuple(sorted(key.items())): key for key in keys}.values())
+        chunks = [
+            unique_keys[start:start + self.BATCH_WRITE_CHUNK_SIZE]
+            for start in range(0, len(unique_keys), self.BATCH_WRITE_CHUNK_SIZE)
+        ]
+        result = {'deleted': [], 'failed': []}
+        
+        if not chunks:
+            return result
+        
+        from concurrent.futures import ThreadPoolExecutor
+        
+        workers = min(max_workers or self.BATCH_WRITE_MAX_WORKERS, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for deleted, failed in executor.map(lambda chunk: self._batch_delete_chunk(table_name, chunk), chunks):
+                result['deleted'].extend(deleted)
+                result['failed'].extend(failed)
+        
+        return result
+    
+    def _batch_delete_chunk(self, table_name, keys):
         """
-        Delete all sessions for a user
+        Delete up to 25 items, retrying unprocessed ones with backoff
         
         Args:
-            user_id (str): The user ID
+            table_name (str): Table to delete from
+            keys (list): The keys to delete
             
         Returns:
-            bool: True if successful, False otherwise
+            tuple: (deleted keys, failed keys)
         """
-        try:
-            # Query to find all sessions for this user
-            response = self.main_table.query(
-                KeyConditionExpression=boto3.dynamodb.conditions.Key('PK').begins_with('session-') & 
-                                      boto3.dynamodb.conditions.Key('SK').eq(user_id)
-            )
+        from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+        
+        serializer = TypeSerializer()
+        deserializer = TypeDeserializer()
+        client = self.dynamodb.meta.client
+        
+        pending = [
+            {'DeleteRequest': {'Key': {name: serializer.serialize(value) for name, value in key.items()}}}
+            for key in keys
+        ]
+        
+        for attempt in range(self.BATCH_WRITE_MAX_RETRIES + 1):
+            try:
+                response = client.batch_write_item(RequestItems={table_name: pending})
+            except Exception as e:
+                logger.error("BatchWriteItem failed for %d deletes on %s: %s", len(pending), table_name, e)
+                break
             
-            # Delete each session
-            for session in response.get('Items', []):
-                self.main_table.delete_item(
-                    Key={
-                        'PK': session['PK'],
-                        'SK': session['SK']
-                    }
-                )
-            return True
-        except Exception as e:
-            print(f"Error deleting sessions for user {user_id}: {str(e)}")
-            return False
+            pending = response.get('UnprocessedItems', {}).get(table_name, [])
+            if not pending or attempt == self.BATCH_WRITE_MAX_RETRIES:
+                break
+            
+            # Exponential backoff with jitter before resending the leftovers
+            time.sleep(self.BATCH_WRITE_BASE_DELAY_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5))
+        
+        failed = [
+            {name: deserializer.deserialize(value) for name, value in request['DeleteRequest']['Key'].items()}
+            for request in pending
+        ]
+        failed_set = {tuple(sorted(key.items())) for key in failed}
+        deleted = [key for key in keys if tuple(sorted(key.items())) not in failed_set]
+        
+        return deleted, failed
+    
+    def iter_query(self, params, table=None, page_size=None, projection=None, max_items=None):
+        """
+        Lazily query a table (or a GSI via IndexName), one page at a time
+        The next page is only requested once the caller has consumed the current one
+        
+        Args:
+            params (dict): Query parameters including KeyConditionExpression
+            table: boto3 Table to query (default: main table)
+            page_size (int): Items DynamoDB evaluates per request (optional)
+            projection (list): Attribute names to return (optional)
+            max_items (int): Stop after yielding this many items (optional)
+        
+        Yields:
+            dict: Items from DynamoDB
+        """
+        table = table if table is not None else self.main_table
+        return self._iter_pages(table.query, params, page_size, projection, max_items)
+    
+    def iter_scan(self, params=None, table=None, page_size=None, projection=None, max_items=None):
+        """
+        Lazily scan a table, one page at a time
+        
+        Args:
+            params (dict): Scan parameters such as FilterExpression (optional)
+            table: boto3 Table to scan (default: main table)
+            page_size (int): Items DynamoDB evaluates per request (optional)
+            projection (list): Attribute names to return (optional)
+            max_items (int): Stop after yielding this many items (optional)
+        
+        Yields:
+            dict: Items from DynamoDB
+        """
+        table = table if table is not None else self.main_table
+        return self._iter_pages(table.scan, params or {}, page_size, projection, max_items)
+    
+    def _iter_pages(self, operation, params, page_size, projection, max_items):
+        """Follow LastEvaluatedKey across pages of a query/scan, yielding items as they arrive"""
+        request = dict(params)
+    
+        if projection:
+            # Placeholders so reserved words like name / status / ttl can be projected
+            names = dict(request.get('ExpressionAttributeNames', {}))
+            placeholders = []
+            for index, attribute in enumerate(projection):
+                placeholder = f"#p{index}"
+                names[placeholder] = attribute
+                placeholders.append(placeholder)
+            request['ProjectionExpression'] = ', '.join(placeholders)
+            request['ExpressionAttributeNames'] = names
+    
+        if page_size:
+            request['Limit'] = page_size
+    
+        yielded = 0
+        while max_items is None or yielded < max_items:
+            # Without a filter every evaluated item is returned, so don't read past the budget
+            if max_items is not None and 'FilterExpression' not in request:
+                remaining = max_items - yielded
+                request['Limit'] = min(page_size, remaining) if page_size else remaining
+    
+            response = operation(**request)
+    
+            for item in response.get('Items', []):
+                yield item
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+    
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            request['ExclusiveStartKey'] = last_key
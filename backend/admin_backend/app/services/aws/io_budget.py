@@ -0,0 +1,317 @@
+import os
+import json
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from app.utils.logger import get_logger, add_request_fields
+
+logger = get_logger(__name__)
+
+# dynamodb operations that accept ReturnConsumedCapacity
+CAPACITY_OPERATIONS = frozenset([
+    'GetItem', 'PutItem', 'UpdateItem', 'DeleteItem', 'Query', 'Scan',
+    'BatchGetItem', 'BatchWriteItem', 'TransactGetItems', 'TransactWriteItems'
+])
+# capacity from these is read capacity, everything else is write capacity
+READ_OPERATIONS = frozenset(['GetItem', 'Query', 'Scan', 'BatchGetItem', 'TransactGetItems'])
+# budget keys for each aws service (endpoint prefix -> short name)
+SERVICE_NAMES = {'dynamodb': 'dynamodb', 'cognito-idp': 'cognito'}
+
+class IOBudgetExceeded(AssertionError):
+    """an invocation made more (or other) aws calls than its handler's budget allows"""
+    pass
+
+class IORecorder:
+    """
+    counts the aws calls made during one lambda invocation
+    calls are grouped by service, operation and table / index so a warm
+    container that never resets still only holds one entry per call site shape
+    thread safe, batch deletes fan out over worker threads
+    """
+
+    def __init__(self):
+        """set up an empty recorder"""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """forget every call recorded so far (start of an invocation)"""
+        with self._lock:
+            self._operations = {}
+            self.started_at = time.perf_counter()
+
+    def record(self, service, operation, target, items, latency_ms, capacity=0.0, error=None):
+        """
+        add one aws call
+
+        args:
+            service (str): short service name (dynamodb / cognito)
+            operation (str): api operation name (like Query)
+            target (str): table, table/index or None for services without tables
+            items (int): items read or written by the call
+            latency_ms (float): wall time of the call including retries
+            capacity (float): consumed capacity units reported by dynamodb
+            error (str): error code if the call failed
+        """
+        key = (service, operation, target)
+        with self._lock:
+            entry = self._operations.get(key)
+            if entry is None:
+                entry = {'calls': 0, 'items': 0, 'ms': 0.0, 'capacity': 0.0, 'errors': 0}
+                self._operations[key] = entry
+            entry['calls'] += 1
+            entry['items'] += items or 0
+            entry['ms'] += latency_ms
+            entry['capacity'] += capacity or 0.0
+            if error:
+                entry['errors'] += 1
+
+    def calls(self, service=None, operation=None):
+        """
+        count recorded calls, optionally for one service and / or operation
+
+        returns:
+            int: number of calls
+        """
+        with self._lock:
+            return sum(
+                entry['calls'] for (svc, op, _), entry in self._operations.items()
+                if (service is None or svc == service) and (operation is None or op == operation)
+            )
+
+    def summary(self):
+        """
+        totals for the invocation so far
+
+        returns:
+            dict: calls, latency, rcu / wcu and a per operation breakdown
+        """
+        with self._lock:
+            operations = {}
+            totals = {'calls': 0, 'items': 0, 'ms': 0.0, 'rcu': 0.0, 'wcu': 0.0, 'errors': 0}
+            per_service = {}
+            for (service, operation, target), entry in sorted(self._operations.items(), key=lambda kv: str(kv[0])):
+                name = f"{service}.{operation}" + (f" {target}" if target else "")
+                operations[name] = {
+                    'calls': entry['calls'],
+                    'items': entry['items'],
+                    'ms': round(entry['ms'], 1)
+                }
+                totals['calls'] += entry['calls']
+                totals['items'] += entry['items']
+                totals['ms'] += entry['ms']
+                totals['errors'] += entry['errors']
+                totals['rcu' if operation in READ_OPERATIONS else 'wcu'] += entry['capacity']
+                per_service[service] = per_service.get(service, 0) + entry['calls']
+            elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+
+        totals['ms'] = round(totals['ms'], 1)
+        totals['rcu'] = round(totals['rcu'], 2)
+        totals['wcu'] = round(totals['wcu'], 2)
+        return dict(totals, elapsed_ms=round(elapsed_ms, 1), services=per_service, operations=operations)
+
+# one recorder per process, lambda runs one invocation at a time per container
+_recorder = IORecorder()
+
+def get_recorder():
+    """get the process wide recorder the instrumented clients write to"""
+    return _recorder
+
+def instrument_client(client):
+    """
+    hook a boto3 client so every api call it makes is recorded
+    dynamodb calls also ask for ReturnConsumedCapacity=TOTAL unless the caller set it
+    clients without a botocore event system (offline stand-ins) are left alone
+
+    args:
+        client: boto3 client (for a resource pass resource.meta.client)
+
+    returns:
+        the same client
+    """
+    meta = getattr(client, 'meta', None)
+    events = getattr(meta, 'events', None)
+    if events is None or getattr(client, '_io_budget_instrumented', False):
+        return client
+
+    service_id = meta.service_model.service_id.hyphenize()
+    service = SERVICE_NAMES.get(meta.service_model.endpoint_prefix, meta.service_model.endpoint_prefix)
+
+    def before_params(params, model, context, **kwargs):
+        if service == 'dynamodb' and model.name in CAPACITY_OPERATIONS and 'ReturnConsumedCapacity' not in params:
+            params['ReturnConsumedCapacity'] = 'TOTAL'
+        context['io_budget'] = {
+            'operation': model.name,
+            'target': _target(params),
+            'requested': _requested_writes(model.name, params),
+            'started_at': time.perf_counter()
+        }
+
+    def after_call(parsed, context, **kwargs):
+        _finish(service, context, parsed=parsed)
+
+    def after_call_error(exception, context, **kwargs):
+        _finish(service, context, error=type(exception).__name__)
+
+    events.register(f'provide-client-params.{service_id}.*', before_params)
+    events.register(f'after-call.{service_id}.*', after_call)
+    events.register(f'after-call-error.{service_id}.*', after_call_error)
+    client._io_budget_instrumented = True
+    return client
+
+def _target(params):
+    """table (or table/index) a call goes to, batch calls list every table"""
+    if 'TableName' in params:
+        index = params.get('IndexName')
+        return f"{params['TableName']}/{index}" if index else params['TableName']
+    if 'RequestItems' in params:
+        return ','.join(sorted(params['RequestItems']))
+    return None
+
+def _requested_writes(operation, params):
+    """number of put / delete requests in a BatchWriteItem"""
+    if operation != 'BatchWriteItem':
+        return 0
+    return sum(len(requests) for requests in params.get('RequestItems', {}).values())
+
+def _item_count(operation, parsed, requested):
+    """items read or written according to the response"""
+    if operation in ('Query', 'Scan'):
+        return parsed.get('Count', 0)
+    if operation == 'GetItem':
+        return 1 if parsed.get('Item') else 0
+    if operation == 'BatchGetItem':
+        return sum(len(items) for items in parsed.get('Responses', {}).values())
+    if operation == 'BatchWriteItem':
+        unprocessed = sum(len(requests) for requests in (parsed.get('UnprocessedItems') or {}).values())
+        return requested - unprocessed
+    if operation in ('PutItem', 'UpdateItem', 'DeleteItem'):
+        return 1
+    if operation == 'ListUsers':
+        return len(parsed.get('Users', []))
+    return 0
+
+def _consumed_capacity(parsed):
+    """add up ConsumedCapacity (a dict for single table calls, a list for batches)"""
+    consumed = parsed.get('ConsumedCapacity')
+    if not consumed:
+        return 0.0
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(float(entry.get('CapacityUnits', 0)) for entry in consumed)
+
+def _finish(service, context, parsed=None, error=None):
+    """record a finished call from the state stashed by before_params"""
+    state = context.pop('io_budget', None) if context else None
+    if state is None:
+        return
+    operation = state['operation']
+    latency_ms = (time.perf_counter() - state['started_at']) * 1000
+    items = 0
+    capacity = 0.0
+    if parsed is not None:
+        error = (parsed.get('Error') or {}).get('Code') or error
+        if not error:
+            items = _item_count(operation, parsed, state['requested'])
+        capacity = _consumed_capacity(parsed)
+    _recorder.record(service, operation, state['target'], items, latency_ms, capacity, error)
+
+def check_budget(summary, budget):
+    """
+    compare an invocation summary against a budget
+
+    args:
+        summary (dict): output of IORecorder.summary()
+        budget (dict): max calls per service ({'dynamodb': 3, 'cognito': 1})
+            plus optional 'forbid' (operations that must not run, like ['Scan'])
+
+    returns:
+        list: human readable violations, empty when within budget
+    """
+    violations = []
+    for service, calls in summary['services'].items():
+        limit = budget.get(service, 0)
+        if calls > limit:
+            violations.append(f"{service}: {calls} calls (budget {limit})")
+    for operation in budget.get('forbid', ()):
+        used = [name for name in summary['operations'] if name.split(' ')[0].split('.', 1)[1] == operation]
+        if used:
+            violations.append(f"forbidden operation {operation}: {', '.join(used)}")
+    return violations
+
+def track_io(budget=None):
+    """
+    decorator for lambda handlers, resets the recorder per invocation and adds
+    the calls it made to the request's log line (operations breakdown only
+    with IO_SUMMARY_LOG=true, the default), so put it under @log_request
+    a handler over its budget logs a warning, and fails with IOBudgetExceeded
+    when IO_BUDGET_ENFORCE=true (tests / load runs)
+    put it above the other decorators so auth lookups are counted too
+
+    args:
+        budget (dict): see check_budget, exposed on the handler as handler.io_budget
+    """
+    def decorator(handler):
+        name = handler.__module__.rsplit('.', 1)[-1]
+
+        @wraps(handler)
+        def wrapper(event, context):
+            _recorder.reset()
+            response = handler(event, context)
+            summary = _recorder.summary()
+            violations = check_budget(summary, budget) if budget is not None else []
+
+            io = {'calls': summary['calls'], 'ms': summary['ms'], 'rcu': summary['rcu'], 'wcu': summary['wcu']}
+            if os.environ.get('IO_SUMMARY_LOG', 'true').lower() == 'true':
+                io['operations'] = summary['operations']
+            add_request_fields(io=io)
+            if violations:
+                logger.warning("over io budget", violations=violations, budget=budget)
+
+            if violations and os.environ.get('IO_BUDGET_ENFORCE', 'false').lower() == 'true':
+                raise IOBudgetExceeded(f"{name} over its io budget: {'; '.join(violations)}")
+            return response
+
+        wrapper.io_budget = budget
+        return wrapper
+    return decorator
+
+@contextmanager
+def assert_io_budget(**budget):
+    """
+    test helper, fails if the block makes more aws calls than allowed
+
+        with assert_io_budget(dynamodb=2, forbid=['Scan']):
+            handler(event, None)
+
+    args:
+        budget: max calls per service plus optional forbid, see check_budget
+
+    yields:
+        IORecorder: the recorder, for extra assertions on recorder.calls(...)
+    """
+    _recorder.reset()
+    yield _recorder
+    summary = _recorder.summary()
+    violations = check_budget(summary, budget)
+    if violations:
+        raise IOBudgetExceeded('; '.join(violations) + f"\noperations: {json.dumps(summary['operations'])}")
+
+def assert_handler_budget(handler, event, context=None):
+    """
+    test helper, run a handler decorated with track_io and fail if it goes over its declared budget
+
+    args:
+        handler: handler function with an io_budget attribute
+        event (dict): lambda event
+        context: lambda context
+
+    returns:
+        the handler's response
+    """
+    budget = getattr(handler, 'io_budget', None)
+    if budget is None:
+        raise ValueError(f"{handler.__module__}.{handler.__name__} has no io budget")
+    with assert_io_budget(**budget):
+        return handler(event, context)
@@ -0,0 +1,63 @@
+import threading
+
+class ServiceRegistry:
+    """
+    process wide home for the services the handlers share
+    each service is built on first use and then kept for the life of the
+    container, so warm invocations never pay for a new boto3 client (and its
+    connection pool) again - boto3 clients are thread safe, so one instance
+    serves every thread
+    """
+
+    def __init__(self):
+        """set up an empty registry"""
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def get(self, factory, key=None):
+        """
+        get the shared instance for a key, building it with factory() the first time
+
+        args:
+            factory: zero-argument callable (usually the service class)
+            key: registry key (default: the factory itself)
+
+        returns:
+            the shared instance
+        """
+        key = key or factory
+        instance = self._instances.get(key)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(key)
+                if instance is None:
+                    instance = factory()
+                    self._instances[key] = instance
+        return instance
+
+    def register(self, key, instance):
+        """put an instance in the registry (scripts and tests swapping in stand-ins)"""
+        with self._lock:
+            self._instances[key] = instance
+
+    def clear(self):
+        """drop every instance, the next get builds new ones"""
+        with self._lock:
+            self._instances.clear()
+
+registry = ServiceRegistry()
+
+def dynamodb_service():
+    """shared DynamoDBService"""
+    from app.services.aws.dynamodb_service import DynamoDBService
+    return registry.get(DynamoDBService, 'dynamodb_service')
+
+def cognito_admin_service():
+    """shared CognitoAdminService"""
+    from app.services.aws.cognito_admin_service import CognitoAdminService
+    return registry.get(CognitoAdminService, 'cognito_admin_service')
+
+def jwt_service():
+    """shared JWTService"""
+    from app.services.auth.jwt_service import JWTService
+    return registry.get(JWTService, 'jwt_service')
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import threading
+from functools import wraps
+from app.services import registry
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# AWS_LAMBDA_INITIALIZATION_TYPE values where init runs before any request needs the container
+AHEAD_OF_TRAFFIC = frozenset(['provisioned-concurrency', 'snap-start'])
+# event sources that only ping a function to keep it warm
+WARMER_SOURCES = frozenset(['serverless-plugin-warmup', 'aws.events'])
+# key that is never written, reading it opens the dynamodb connection for 0.5 rcu
+WARMUP_KEY = {'PK': 'warmup', 'SK': 'warmup'}
+WARM_RESPONSE = {'statusCode': 200, 'body': json.dumps({'warm': True})}
+
+_primers = []
+_primed = False
+_lock = threading.Lock()
+
+def register_primer(name, primer):
+    """
+    add a step to the container priming (run in registration order)
+
+    args:
+        name (str): step name for the log line
+        primer: zero-argument callable, exceptions are logged and skipped
+    """
+    _primers.append((name, primer))
+
+def should_prime_on_init():
+    """
+    prime while the module loads? PRIME_ON_INIT=true / false decides, the default
+    (auto) primes only for provisioned concurrency and snapstart, where init runs
+    ahead of traffic - on an on-demand cold start the request would wait for it
+    """
+    setting = os.environ.get('PRIME_ON_INIT', 'auto').lower()
+    if setting in ('true', 'false'):
+        return setting == 'true'
+    return os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') in AHEAD_OF_TRAFFIC
+
+def prime():
+    """
+    run every primer, once per container
+    a failing step never fails init, the request that needs it just pays for it
+
+    returns:
+        bool: true if this call did the priming
+    """
+    global _primed
+    with _lock:
+        if _primed:
+            return False
+        _primed = True
+
+    timings = {}
+    for name, primer in _primers:
+        started = time.perf_counter()
+        try:
+            primer()
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+        except Exception as e:
+            logger.warning("primer %s failed: %s", name, e)
+            timings[name] = 'failed'
+
+    logger.info("container primed", primers=timings)
+    return True
+
+def is_warmer_event(event):
+    """true for keep-warm pings (serverless-plugin-warmup, eventbridge schedules, {"warmer": true})"""
+    return isinstance(event, dict) and (event.get('source') in WARMER_SOURCES or event.get('warmer') is True)
+
+def warm_start(handler):
+    """
+    decorator for http handlers, put it above @log_request
+    primes the container while the handler module loads (see should_prime_on_init)
+    and answers warmer pings without logging them or touching the domain layer -
+    the first ping also primes a container that started on demand
+
+    args:
+        handler: the lambda handler function
+
+    returns:
+        wrapped handler
+    """
+    if should_prime_on_init():
+        prime()
+
+    @wraps(handler)
+    def wrapper(event, context):
+        if is_warmer_event(event):
+            prime()
+            return WARM_RESPONSE
+        return handler(event, context)
+
+    return wrapper
+
+def _prime_dynamodb():
+    """build the resource (boto3 import, service model) and open its connection"""
+    registry.dynamodb_service().main_table.get_item(Key=WARMUP_KEY)
+
+def _prime_cognito():
+    """build the cognito client (service model), its connection opens on the first call"""
+    registry.cognito_admin_service().cognito
+
+def _prime_jwks():
+    """download the jwks and build the keys, so the first token only pays for the rsa check"""
+    registry.jwt_service().warm_up()
+
+register_primer('dynamodb', _prime_dynamodb)
+register_primer('cognito', _prime_cognito)
+register_primer('jwks', _prime_jwks)
@@ -5,18 +5,25 @@ import sys
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.order_repository import OrderRepository
-from services.auth.jwt_service import JWTService
 from domains.order_domain import OrderDomain
 from utils.response_formatter import success_response, error_response
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 order_repository = OrderRepository(dynamodb_service)
-jwt_service = JWTService()
+jwt_service = registry.jwt_service()
 order_domain = OrderDomain(order_repository, jwt_service)
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 2, 'forbid': ['Scan']})
 def handler(event, context):
     """
     HTTP Handler for POST /orders
@@ -30,8 +37,6 @@ def handler(event, context):
         API Gateway response with created order details
     """
     try:
-        print("Create order request received:", json.dumps(event))
-        
         # Extract Authorization header
         headers = event.get('headers') or {}
         auth_header = headers.get('Authorization') or headers.get('authorization')
@@ -92,7 +97,7 @@ def handler(event, context):
         )
         
     except Exception as e:
-        print(f"Error in create order handler: {str(e)}")
+        logger.error("Error in create order handler: %s", e)
         return error_response(
             status_code=500,
             message="Internal server error",
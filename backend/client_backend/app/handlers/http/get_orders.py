@@ -1,4 +1,3 @@
-import json
 import os
 import sys
 from decimal import Decimal
@@ -6,18 +5,22 @@ from decimal import Decimal
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.order_repository import OrderRepository
-from services.auth.jwt_service import JWTService
 from domains.order_domain import OrderDomain
 from utils.response_formatter import success_response, error_response
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 order_repository = OrderRepository(dynamodb_service)
-jwt_service = JWTService()
+jwt_service = registry.jwt_service()
 order_domain = OrderDomain(order_repository, jwt_service)
 
+logger = get_logger(__name__)
+
 def convert_decimal_to_float(obj):
     """
     recursively convert decimal objects to float for json serialization
@@ -31,6 +34,9 @@ def convert_decimal_to_float(obj):
     else:
         return obj
 
+@warm_start
+@log_request
+@track_io({'dynamodb': 3, 'forbid': ['Scan']})
 def handler(event, context):
     """
     HTTP Handler for GET /orders
@@ -44,8 +50,6 @@ def handler(event, context):
         API Gateway response with user's orders
     """
     try:
-        print("Get orders request received:", json.dumps(event))
-        
         # Extract Authorization header
         headers = event.get('headers') or {}
         auth_header = headers.get('Authorization') or headers.get('authorization')
@@ -82,7 +86,7 @@ def handler(event, context):
         )
         
     except Exception as e:
-        print(f"Error in get orders handler: {str(e)}")
+        logger.error("Error in get orders handler: %s", e)
         return error_response(
             status_code=500,
             message="Internal server error",
@@ -1,6 +1,13 @@
 import os
-import boto3
+import threading
 from decimal import Decimal
+from services.aws.io_budget import instrument_client
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# guards the first boto3.resource call when requests share a container's service from threads
+_resource_lock = threading.Lock()
 
 class DynamoDBService:
     """
@@ -9,12 +16,53 @@ class DynamoDBService:
     """
     
     def __init__(self):
-        """initialize dynamodb service with table names from environment"""
-        self.dynamodb = boto3.resource('dynamodb')
+        """
+        initialize dynamodb service with table names from environment
+        the boto3 resource and tables are created on first use (see dynamodb)
+        """
         self.orders_table_name = os.environ.get('ORDERS_TABLE', 'matt-cognito-hop-orders')
         self.main_table_name = os.environ.get('MAIN_TABLE', 'matt-cognito-hop-main')
-        self.orders_table = self.dynamodb.Table(self.orders_table_name)
-        self.main_table = self.dynamodb.Table(self.main_table_name)
+        self._dynamodb = None
+        self._orders_table = None
+        self._main_table = None
+
+    @property
+    def dynamodb(self):
+        """the boto3 dynamodb resource, created on first use so importing a handler doesn't pay for boto3"""
+        if self._dynamodb is None:
+            with _resource_lock:
+                if self._dynamodb is None:
+                    import boto3
+                    dynamodb = boto3.resource('dynamodb')
+                    instrument_client(dynamodb.meta.client)
+                    self._dynamodb = dynamodb
+        return self._dynamodb
+    
+    @dynamodb.setter
+    def dynamodb(self, resource):
+        self._dynamodb = resource
+
+    @property
+    def orders_table(self):
+        """the orders table, bound to the resource on first use"""
+        if self._orders_table is None:
+            self._orders_table = self.dynamodb.Table(self.orders_table_name)
+        return self._orders_table
+    
+    @orders_table.setter
+    def orders_table(self, table):
+        self._orders_table = table
+
+    @property
+    def main_table(self):
+        """the main table, bound to the resource on first use"""
+        if self._main_table is None:
+            self._main_table = self.dynamodb.Table(self.main_table_name)
+        return self._main_table
+    
+    @main_table.setter
+    def main_table(self, table):
+        self._main_table = table
     
     def query_orders_by_user(self, user_id):
         """
@@ -26,13 +74,16 @@ class DynamoDBService:
         returns:
             list: list of order items for the user
         """
+        from boto3.dynamodb.conditions import Key
+        
         try:
-            response = self.orders_table.query(
-                KeyConditionExpression=boto3.dynamodb.conditions.Key('PK').eq(user_id)
-            )
-            return response.get('Items', [])
+            # follow every page so users with more than 1 mb of orders get all of them
+            return list(self.iter_query(
+                {'KeyConditionExpression': Key('PK').eq(user_id)},
+                table=self.orders_table
+            ))
         except Exception as e:
-            print(f"error querying orders for user {user_id}: {str(e)}")
+            logger.error("error querying orders for user %s: %s", user_id, e)
             return []
     
     def put_order(self, order_item):
@@ -54,17 +105,16 @@ class DynamoDBService:
             
             # save to orders table
             self.orders_table.put_item(Item=order_item)
-            print(f"successfully created order {order_item.get('order_id')}")
+            logger.debug("created order %s", order_item.get('order_id'))
             return True
             
         except Exception as e:
-            print(f"error creating order: {str(e)}")
+            logger.error("error creating order: %s", e)
             return False
 
-    def scan_users_by_sub(self, cognito_sub):
+    def query_user_by_sub(self, cognito_sub):
         """
-        find user by cognito sub in main table
-        note: in production, use gsi. for now, scan is ok with minimal data
+        find user by cognito sub in main table using gsi3
         
         args:
             cognito_sub (str): cognito user sub
@@ -72,15 +122,90 @@ class DynamoDBService:
         returns:
             dict: user item if found, none otherwise
         """
+        from boto3.dynamodb.conditions import Key
+        
         try:
-            response = self.main_table.scan(
-                FilterExpression=boto3.dynamodb.conditions.Attr('SK').eq('user') & 
-                               boto3.dynamodb.conditions.Attr('sub').eq(cognito_sub)
-            )
+            items = self.iter_query({
+                'IndexName': 'GSI3',
+                'KeyConditionExpression': Key('GSI3-PK').eq(f"sub-{cognito_sub}") &
+                                          Key('GSI3-SK').eq('user')
+            }, max_items=1)
             
-            items = response.get('Items', [])
-            return items[0] if items else None
+            return next(items, None)
             
         except Exception as e:
-            print(f"error finding user by sub {cognito_sub}: {str(e)}")
-            return None 
\ No newline at end of file
+            logger.error("error finding user by sub %s: %s", cognito_sub, e)
+            return None
+
+    def iter_query(self, params, table=None, page_size=None, projection=None, max_items=None):
+        """
+        lazily query a table (or a gsi via IndexName), one page at a time
+        the next page is only requested once the caller has consumed the current one
+
+        args:
+            params (dict): query parameters including KeyConditionExpression
+            table: boto3 table to query (default: main table)
+            page_size (int): items dynamodb evaluates per request (optional)
+            projection (list): attribute names to return (optional)
+            max_items (int): stop after yielding this many items (optional)
+
+        yields:
+            dict: items from dynamodb
+        """
+        table = table if table is not None else self.main_table
+        return self._iter_pages(table.query, params, page_size, projection, max_items)
+
+    def iter_scan(self, params=None, table=None, page_size=None, projection=None, max_items=None):
+        """
+        lazily scan a table, one page at a time
+
+        args:
+            params (dict): scan parameters such as FilterExpression (optional)
+            table: boto3 table to scan (default: main table)
+            page_size (int): items dynamodb evaluates per request (optional)
+            projection (list): attribute names to return (optional)
+            max_items (int): stop after yielding this many items (optional)
+
+        yields:
+            dict: items from dynamodb
+        """
+        table = table if table is not None else self.main_table
+        return self._iter_pages(table.scan, params or {}, page_size, projection, max_items)
+
+    def _iter_pages(self, operation, params, page_size, projection, max_items):
+        """follow LastEvaluatedKey across pages of a query/scan, yielding items as they arrive"""
+        request = dict(params)
+
+        if projection:
+            # placeholders so reserved words like name / status / ttl can be projected
+            names = dict(request.get('ExpressionAttributeNames', {}))
+            placeholders = []
+            for index, attribute in enumerate(projection):
+                placeholder = f"#p{index}"
+                names[placeholder] = attribute
+                placeholders.append(placeholder)
+            request['ProjectionExpression'] = ', '.join(placeholders)
+            request['ExpressionAttributeNames'] = names
+
+        if page_size:
+            request['Limit'] = page_size
+
+        yielded = 0
+        while max_items is None or yielded < max_items:
+            # without a filter every evaluated item is returned, so don't read past the budget
+            if max_items is not None and 'FilterExpression' not in request:
+                remaining = max_items - yielded
+                request['Limit'] = min(page_size, remaining) if page_size else remaining
+
+            response = operation(**request)
+
+            for item in response.get('Items', []):
+                yield item
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            request['ExclusiveStartKey'] = last_key
@@ -73,4 +73,4 @@ class OrderRepository:
         returns:
             dict: user item if found, none otherwise
         """
-        return self.dynamodb_service.scan_users_by_sub(cognito_sub) 
\ No newline at end of file
+        return self.dynamodb_service.query_user_by_sub(cognito_sub) 
\ No newline at end of file
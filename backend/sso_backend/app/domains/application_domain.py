@@ -1,3 +1,7 @@
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 class ApplicationDomain:
     """
     Domain class for application-related business logic.
@@ -24,7 +28,7 @@ class ApplicationDomain:
         Returns:
             tuple: (bool, str) - (is_valid, return_url)
         """
-        print(f"Validating app '{application_id}' with channel '{channel_id}'")
+        logger.debug("Validating app '%s' with channel '%s'", application_id, channel_id)
         
         # Use the existing method from ApplicationRepository
         return self.application_repository.validate_app_channel(application_id, channel_id) 
\ No newline at end of file
@@ -1,10 +1,24 @@
+from datetime import timedelta
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 class SessionDomain:
     """
     domain for session-related business logic
     handles session creation and validation with user authorization checks
     """
     
-    def __init__(self, session_repository, application_repository, jwt_service):
+    # access tokens expiring within this window are refreshed on read
+    REFRESH_WINDOW = timedelta(minutes=5)
+    # fallback token lifetime when cognito doesn't send expires_in
+    DEFAULT_EXPIRES_IN = 3600
+    # delays before each consistent read while waiting for another request's refresh:
+    # 4 reads over 2.8s (well inside the 10s lambda timeout), so the read + lease +
+    # polls stay within get_session's dynamodb budget of 6
+    REFRESH_POLL_DELAYS_SECONDS = (0, 0.4, 0.8, 1.6)
+    
+    def __init__(self, session_repository, application_repository, jwt_service, cognito_service=None):
         """
         initialize session domain
         
@@ -12,10 +26,12 @@ class SessionDomain:
             session_repository: instance of SessionRepository
             application_repository: instance of ApplicationRepository  
             jwt_service: instance of JWTService
+            cognito_service: instance of CognitoUserService (optional, defaults to the shared one on first refresh)
         """
         self.session_repository = session_repository
         self.application_repository = application_repository
         self.jwt_service = jwt_service
+        self._cognito_service = cognito_service
     
     def initialize_session(self, cognito_tokens, application_id, device_info=None):
         """
@@ -49,16 +65,15 @@ class SessionDomain:
         
         # If user not found, try to find by email
         if not user and 'email' in user_info:
-            print(f"User not found with sub: {cognito_sub}. Trying to find by email: {user_info['email']}")
-            from services.repositories.user_repository import UserRepository
-            user_repository = UserRepository(self.application_repository.dynamodb_service)
+            logger.debug("User not found with sub %s, trying email lookup", cognito_sub)
+            user_repository = self.application_repository.user_repository
             
             # Try to find user by email
             user_by_email = user_repository.find_user_by_email(user_info['email'])
             
             if user_by_email:
                 # Update the existing user's sub
-                print(f"Found user by email: {user_info['email']}. Updating sub.")
+                logger.debug("Found user by email, updating sub", cognito_sub=cognito_sub)
                 user_by_email['sub'] = cognito_sub
                 user = user_repository.update_user(user_by_email)
         
@@ -81,6 +96,9 @@ class SessionDomain:
     def get_session_tokens(self, session_id):
         """
         get tokens for a session
+        refreshes them through cognito when they are about to expire - only one caller
+        per session does the refresh (conditional-write lease), concurrent callers wait
+        for its result instead of refreshing again
         
         args:
             session_id (str): the session id
@@ -88,10 +106,6 @@ class SessionDomain:
         returns:
             dict: session data with tokens, or none if not found/expired
         """
-        from datetime import datetime, timedelta
-        import os
-        from services.aws.cognito_user_service import CognitoUserService
-        
         # Get the session data
         session = self.session_repository.get_session(session_id)
         
@@ -100,53 +114,160 @@ class SessionDomain:
             
         # Check if access token is expired or will expire soon (within 5 minutes)
         try:
-            # If we have an expires_at field, use that to check expiration
-            expires_at = session.get('expires_at')
-            if expires_at:
-                expiry_time = datetime.fromisoformat(expires_at)
-                # If token expires within 5 minutes or is already expired
-                if datetime.now() + timedelta(minutes=5) > expiry_time:
-                    print(f"Access token for session {session_id} is expired or expiring soon. Attempting to refresh...")
-                    
-                    # Check if we have a refresh token
-                    refresh_token = session.get('refresh_token')
-                    if not refresh_token:
-                        print(f"No refresh token available for session {session_id}")
-                        return None
-                    
-                    # Initialize CognitoUserService if not already available
-                    cognito_service = CognitoUserService()
-                    
-                    try:
-                        # Refresh the tokens
-                        new_tokens = cognito_service.refresh_tokens(refresh_token)
-                        
-                        if new_tokens and new_tokens.get('access_token') and new_tokens.get('id_token'):
-                            # Calculate new expiration time (1 hour from now)
-                            new_expires_at = (datetime.now() + timedelta(hours=1)).isoformat()
-                            
-                            # Update session with new tokens
-                            session.update({
-                                'id_token': new_tokens.get('id_token'),
-                                'access_token': new_tokens.get('access_token'),
-                                'refresh_token': new_tokens.get('refresh_token', refresh_token),
-                                'expires_at': new_expires_at
-                            })
-                            
-                            # Update the session in DynamoDB
-                            self.session_repository.update_session_tokens(session_id, new_tokens, new_expires_at)
-                            
-                            print(f"Successfully refreshed tokens for session {session_id}")
-                        else:
-                            print(f"Failed to refresh tokens for session {session_id}: Invalid token response")
-                    except Exception as e:
-                        print(f"Error refreshing tokens for session {session_id}: {str(e)}")
-                        # If refresh fails, return the session anyway - let the client handle token issues
+            if not self._needs_refresh(session):
+                return session
+            
+            logger.debug("Access token for session %s is expired or expiring soon, attempting to refresh", session_id)
+            
+            # Check if we have a refresh token
+            refresh_token = session.get('refresh_token')
+            if not refresh_token:
+                logger.warning("No refresh token available for session %s", session_id)
+                return None
+            
+            token_version = session.get('token_version', 0)
+            lease_owner = self.session_repository.acquire_refresh_lease(session_id, token_version)
+            
+            if not lease_owner:
+                # someone else is refreshing (or just did) - reuse their tokens
+                logger.debug("Session %s is being refreshed by another request, waiting for it", session_id)
+                return self._wait_for_refresh(session_id, token_version)
+            
+            # If refresh fails, return the session anyway - let the client handle token issues
+            _, session = self._refresh_session(session, refresh_token, lease_owner)
+            return session
         except Exception as e:
-            print(f"Error checking token expiration for session {session_id}: {str(e)}")
+            logger.error("Error checking token expiration for session %s: %s", session_id, e)
         
         return session
     
+    def refresh_session_tokens(self, session):
+        """
+        refresh a session's tokens ahead of expiry (background refresher)
+        takes the same lease as get_session_tokens, so it never races a user's request
+        
+        args:
+            session (dict): session item with PK, refresh_token and token_version
+            
+        returns:
+            str: 'refreshed', 'skipped' (someone else has it / no refresh token) or 'failed'
+        """
+        session_id = session['PK']
+        refresh_token = session.get('refresh_token')
+        if not refresh_token:
+            return 'skipped'
+        
+        lease_owner = self.session_repository.acquire_refresh_lease(session_id, session.get('token_version', 0))
+        if not lease_owner:
+            return 'skipped'
+        
+        stored, _ = self._refresh_session(session, refresh_token, lease_owner)
+        return 'refreshed' if stored else 'failed'
+    
+    def _needs_refresh(self, session):
+        """true if the session's access token expires within REFRESH_WINDOW"""
+        from datetime import datetime
+        
+        # If we have an expires_at field, use that to check expiration
+        expires_at = session.get('expires_at')
+        if not expires_at:
+            return False
+        
+        return datetime.now() + self.REFRESH_WINDOW > datetime.fromisoformat(expires_at)
+    
+    def _refresh_session(self, session, refresh_token, lease_owner):
+        """
+        refresh a session's tokens through cognito while holding its refresh lease
+        
+        args:
+            session (dict): the session item
+            refresh_token (str): the session's refresh token
+            lease_owner (str): lease owner id from acquire_refresh_lease
+            
+        returns:
+            tuple: (bool, dict) - (new tokens stored, session to serve): the session with the
+                new tokens, the latest stored one if the write lost the lease, the unchanged
+                one if cognito failed, or none if the session was revoked meanwhile
+        """
+        from datetime import datetime, timedelta
+        
+        session_id = session['PK']
+        
+        try:
+            # Refresh the tokens
+            new_tokens = self._get_cognito_service().refresh_tokens(refresh_token)
+        except Exception as e:
+            logger.error("Error refreshing tokens for session %s: %s", session_id, e)
+            new_tokens = None
+        
+        if not (new_tokens and new_tokens.get('access_token') and new_tokens.get('id_token')):
+            logger.error("Failed to refresh tokens for session %s: invalid token response", session_id)
+            # let the next request try again straight away instead of waiting out the lease
+            self.session_repository.release_refresh_lease(session_id, lease_owner)
+            return False, session
+        
+        # New expiration from cognito's expires_in (seconds)
+        expires_in = int(new_tokens.get('expires_in') or self.DEFAULT_EXPIRES_IN)
+        new_expires_at = (datetime.now() + timedelta(seconds=expires_in)).isoformat()
+        
+        # Update the session in DynamoDB (only applies while we still hold the lease)
+        if not self.session_repository.update_session_tokens(session_id, new_tokens, new_expires_at, lease_owner):
+            # never hand out tokens the session doesn't hold - serve what is stored, or nothing if it's gone
+            logger.warning("Refreshed tokens for session %s could not be stored (lease lost or session revoked)", session_id)
+            return False, self.session_repository.get_session(session_id, consistent_read=True)
+        
+        session.update({
+            'id_token': new_tokens.get('id_token'),
+            'access_token': new_tokens.get('access_token'),
+            'refresh_token': new_tokens.get('refresh_token', refresh_token),
+            'expires_in': expires_in,
+            'expires_at': new_expires_at,
+            'token_version': session.get('token_version', 0) + 1
+        })
+        
+        logger.debug("Refreshed tokens for session %s", session_id)
+        return True, session
+    
+    def _wait_for_refresh(self, session_id, token_version):
+        """
+        poll the session (consistent reads, REFRESH_POLL_DELAYS_SECONDS apart) until the
+        lease holder has stored new tokens
+        
+        args:
+            session_id (str): the session id
+            token_version (int): token_version before the refresh
+            
+        returns:
+            dict: the refreshed session, the latest session if the holder gave up or didn't
+                finish in time, or none if the session was revoked/expired meanwhile
+        """
+        import time
+        
+        for delay in self.REFRESH_POLL_DELAYS_SECONDS:
+            # first read straight away - the lease may have failed only because our copy was stale
+            time.sleep(delay)
+            session = self.session_repository.get_session(session_id, consistent_read=True)
+            if not session:
+                return None
+            
+            if session.get('token_version', 0) != token_version:
+                return session
+            
+            if 'refresh_lease_owner' not in session:
+                # the holder released the lease without new tokens
+                return session
+        
+        # still there, just not refreshed yet - serve the stored tokens like a failed refresh would
+        logger.warning("Timed out waiting for session %s to be refreshed", session_id)
+        return session
+    
+    def _get_cognito_service(self):
+        """cognito user service, the container's shared one unless one was passed in (most calls never need it)"""
+        if self._cognito_service is None:
+            from services import registry
+            self._cognito_service = registry.cognito_user_service()
+        return self._cognito_service
+    
     def get_user_sessions(self, user_id, include_expired=False):
         """
         get all sessions for a user with additional info
@@ -206,7 +327,10 @@ class SessionDomain:
             current_session_id (str): current session to keep
             
         returns:
-            int: number of sessions revoked
+            dict: revoked_count, failed_count and failed_session_ids
+            
+        raises:
+            Exception: if the user's sessions couldn't be listed
         """
         return self.session_repository.revoke_all_user_sessions(user_id, current_session_id)
     
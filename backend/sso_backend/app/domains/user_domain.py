@@ -1,3 +1,7 @@
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 class UserDomain:
     """
     Domain class for user-related business logic.
@@ -34,6 +38,6 @@ class UserDomain:
         # DO NOT auto-authorize - user must consent on first login
         # self.application_repository.create_app_user_relationship(application_id, user_id)
         
-        print(f"Successfully created user {user_id} - will require consent for application {application_id}")
+        logger.info("Created user %s - will require consent for application %s", user_id, application_id)
         
         return user_id, user_item
@@ -1,5 +1,8 @@
 import re
 from datetime import datetime
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class UserProfileDomain:
     """
@@ -201,9 +204,9 @@ class UserProfileDomain:
                     expression_attribute_names=expression_attribute_names
                 )
                 
-                print(f"Successfully synced profile updates to DynamoDB for user {user_id}")
+                logger.debug("Synced profile updates to DynamoDB for user %s", user_id)
             
         except Exception as e:
-            print(f"Warning: Failed to sync profile updates to DynamoDB: {str(e)}")
+            logger.warning("Failed to sync profile updates to DynamoDB: %s", e)
             # Don't fail the whole operation if DynamoDB sync fails
             pass 
\ No newline at end of file
@@ -5,18 +5,25 @@ import sys
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.application_repository import ApplicationRepository
-from services.auth.jwt_service import JWTService
 from domains.application_domain import ApplicationDomain
 from utils.response_formatter import success_response, error_response
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 application_repository = ApplicationRepository(dynamodb_service)
-jwt_service = JWTService()
+jwt_service = registry.jwt_service()
 application_domain = ApplicationDomain(application_repository)
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 7, 'cognito': 1, 'forbid': ['Scan']})
 def handler(event, context):
     """
     HTTP Handler for POST /authorize-application
@@ -30,8 +37,6 @@ def handler(event, context):
         API Gateway response with authorization result
     """
     try:
-        print("Authorize application request received:", json.dumps(event))
-        
         # Extract Authorization header
         headers = event.get('headers') or {}
         auth_header = headers.get('Authorization') or headers.get('authorization')
@@ -100,16 +105,15 @@ def handler(event, context):
         
         # If user not found, try to find by email
         if not user and user_info.get('email'):
-            print(f"User not found with sub: {cognito_sub}. Trying to find by email: {user_info.get('email')}")
-            from services.repositories.user_repository import UserRepository
-            user_repository = UserRepository(dynamodb_service)
+            logger.debug("User not found with sub %s, trying email lookup", cognito_sub)
+            user_repository = application_repository.user_repository
             
             # Try to find user by email
             existing_user = user_repository.find_user_by_email(user_info.get('email'))
             
             if existing_user:
                 # Update the existing user's sub
-                print(f"Found user by email: {user_info.get('email')}. Updating sub.")
+                logger.debug("Found user by email, updating sub", cognito_sub=cognito_sub)
                 existing_user['sub'] = cognito_sub
                 user = user_repository.update_user(existing_user)
         
@@ -134,7 +138,7 @@ def handler(event, context):
         
         if action == 'deny':
             # User denied authorization - we can log this but don't create any grants
-            print(f"User {user_id} denied authorization for application {application_id}")
+            logger.info("User %s denied authorization for application %s", user_id, application_id)
             return success_response(
                 data={
                     "status": "denied",
@@ -156,7 +160,7 @@ def handler(event, context):
             user_id
         )
         
-        print(f"Created authorization for user {user_id} and application {application_id}")
+        logger.info("Created authorization for user %s and application %s", user_id, application_id)
         
         return success_response(
             data={
@@ -168,7 +172,7 @@ def handler(event, context):
         )
         
     except Exception as e:
-        print(f"Error in authorize application handler: {str(e)}")
+        logger.error("Error in authorize application handler: %s", e)
         return error_response(
             status_code=500,
             message="Internal server error",
@@ -1,24 +1,30 @@
-import json
 import os
 import sys
 
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.application_repository import ApplicationRepository
 from services.repositories.user_repository import UserRepository
-from services.auth.jwt_service import JWTService
 from domains.application_domain import ApplicationDomain
 from utils.response_formatter import success_response, error_response
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 application_repository = ApplicationRepository(dynamodb_service)
 user_repository = UserRepository(dynamodb_service)
-jwt_service = JWTService()
+jwt_service = registry.jwt_service()
 application_domain = ApplicationDomain(application_repository)
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 4, 'cognito': 1, 'forbid': ['Scan']})
 def handler(event, context):
     """
     HTTP Handler for GET /check-app-user
@@ -32,8 +38,6 @@ def handler(event, context):
         API Gateway response with authorization result
     """
     try:
-        print("Check app user request received:", json.dumps(event))
-        
         # Extract Authorization header
         headers = event.get('headers') or {}
         auth_header = headers.get('Authorization') or headers.get('authorization')
@@ -71,20 +75,20 @@ def handler(event, context):
             )
         
         # Find user by Cognito sub
-        # We use scan for sub lookup, but fall back to GSI1 for email lookup if needed
+        # We use GSI3 for sub lookup, but fall back to GSI1 for email lookup if needed
         # This handles cases where a user's sub changes after password reset
         user = application_repository.find_user_by_sub(cognito_sub)
         
         # If user not found, try to find by email
         if not user and user_info.get('email'):
-            print(f"User not found with sub: {cognito_sub}. Trying to find by email: {user_info.get('email')}")
+            logger.debug("User not found with sub %s, trying email lookup", cognito_sub)
             
             # Check if user exists by email
             existing_user = user_repository.find_user_by_email(user_info.get('email'))
             
             if existing_user:
                 # Update the existing user's sub
-                print(f"Found user by email: {user_info.get('email')}. Updating sub.")
+                logger.debug("Found user by email, updating sub", cognito_sub=cognito_sub)
                 existing_user['sub'] = cognito_sub
                 user = user_repository.update_user(existing_user)
         
@@ -123,7 +127,7 @@ def handler(event, context):
             )
         
     except Exception as e:
-        print(f"Error in check app user handler: {str(e)}")
+        logger.error("Error in check app user handler: %s", e)
         return error_response(
             status_code=500,
             message="Internal server error",
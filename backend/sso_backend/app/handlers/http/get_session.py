@@ -1,4 +1,3 @@
-import json
 import os
 import sys
 import decimal
@@ -7,16 +6,24 @@ from decimal import Decimal
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.session_repository import SessionRepository
 from domains.session_domain import SessionDomain
 from utils.response_formatter import success_response, error_response
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 session_repository = SessionRepository(dynamodb_service)
 session_domain = SessionDomain(session_repository, None, None)  # only need session repo for this api
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 6, 'cognito': 1, 'forbid': ['Scan']})
 def handler(event, context):
     """
     HTTP Handler for GET /get-session
@@ -30,8 +37,6 @@ def handler(event, context):
         API Gateway response with token set
     """
     try:
-        print("Get session request received:", json.dumps(event))
-        
         # Extract query parameters
         query_params = event.get('queryStringParameters') or {}
         session_id = query_params.get('session_id')
@@ -73,7 +78,7 @@ def handler(event, context):
         )
         
     except Exception as e:
-        print(f"Error in get session handler: {str(e)}")
+        logger.error("Error in get session handler: %s", e)
         return error_response(
             status_code=500,
             message="Internal server error",
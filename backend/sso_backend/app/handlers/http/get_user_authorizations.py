@@ -1,20 +1,26 @@
-import json
 import os
 import sys
 
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.application_repository import ApplicationRepository
-from services.auth.jwt_service import JWTService
 from utils.response_formatter import success_response, error_response
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 application_repository = ApplicationRepository(dynamodb_service)
-jwt_service = JWTService()
+jwt_service = registry.jwt_service()
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 5, 'cognito': 1, 'forbid': ['Scan']})
 def handler(event, context):
     """
     HTTP Handler for GET /user-authorizations
@@ -28,8 +34,6 @@ def handler(event, context):
         API Gateway response with list of authorized applications
     """
     try:
-        print("Get user authorizations request received:", json.dumps(event))
-        
         # Extract Authorization header
         headers = event.get('headers') or {}
         auth_header = headers.get('Authorization') or headers.get('authorization')
@@ -79,7 +83,7 @@ def handler(event, context):
         )
         
     except Exception as e:
-        print(f"Error in get user authorizations handler: {str(e)}")
+        logger.error("Error in get user authorizations handler: %s", e)
         return error_response(
             status_code=500,
             message="Internal server error",
@@ -1,24 +1,30 @@
-import json
 import sys
 import os
 
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+from services import registry
 from utils.response_formatter import success_response, error_response
-from services.auth.jwt_service import JWTService
-from services.aws.dynamodb_service import DynamoDBService
 from services.repositories.session_repository import SessionRepository
 from services.repositories.application_repository import ApplicationRepository
 from domains.session_domain import SessionDomain
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and domain
-jwt_service = JWTService()
-dynamodb_service = DynamoDBService()
+jwt_service = registry.jwt_service()
+dynamodb_service = registry.dynamodb_service()
 session_repository = SessionRepository(dynamodb_service)
 application_repository = ApplicationRepository(dynamodb_service)
 session_domain = SessionDomain(session_repository, application_repository, jwt_service)
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 4, 'cognito': 1, 'forbid': ['Scan']})
 def lambda_handler(event, context):
     """
     Lambda handler for GET /user-sessions
@@ -27,8 +33,6 @@ def lambda_handler(event, context):
     Query parameters:
     - include_expired: 'true' to include expired sessions (default: false)
     """
-    print("Get user sessions request received:", event)
-    
     try:
         # Extract authorization header
         headers = event.get('headers', {})
@@ -44,7 +48,7 @@ def lambda_handler(event, context):
             user_info = jwt_service.extract_user_info(id_token)
             cognito_sub = user_info['sub']
         except ValueError as e:
-            print(f"Token validation failed: {str(e)}")
+            logger.warning("Token validation failed: %s", e)
             return error_response("Invalid or expired token", 401)
         
         # Find user by cognito sub
@@ -75,5 +79,5 @@ def lambda_handler(event, context):
         return success_response(response_data)
         
     except Exception as e:
-        print(f"Error in get_user_sessions: {str(e)}")
+        logger.error("Error in get_user_sessions: %s", e)
         return error_response("Internal server error", 500) 
\ No newline at end of file
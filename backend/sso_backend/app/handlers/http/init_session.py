@@ -5,20 +5,27 @@ import sys
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.application_repository import ApplicationRepository
 from services.repositories.session_repository import SessionRepository
-from services.auth.jwt_service import JWTService
 from domains.session_domain import SessionDomain
 from utils.response_formatter import success_response, error_response
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 application_repository = ApplicationRepository(dynamodb_service)
 session_repository = SessionRepository(dynamodb_service)
-jwt_service = JWTService()
+jwt_service = registry.jwt_service()
 session_domain = SessionDomain(session_repository, application_repository, jwt_service)
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 7, 'cognito': 1, 'forbid': ['Scan']})
 def handler(event, context):
     """
     HTTP Handler for POST /init-session
@@ -32,8 +39,6 @@ def handler(event, context):
         API Gateway response with session_id
     """
     try:
-        print("Init session request received:", json.dumps(event))
-        
         # Extract request body
         body = event.get('body')
         if not body:
@@ -100,7 +105,7 @@ def handler(event, context):
         )
         
     except Exception as e:
-        print(f"Error in init session handler: {str(e)}")
+        logger.error("Error in init session handler: %s", e)
         return error_response(
             status_code=500,
             message="Internal server error",
@@ -5,20 +5,27 @@ import os
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from utils.response_formatter import success_response, error_response
-from services.auth.jwt_service import JWTService
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
+from utils.response_formatter import success_response, error_response, format_response
 from services.repositories.session_repository import SessionRepository
 from services.repositories.application_repository import ApplicationRepository
 from domains.session_domain import SessionDomain
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and domain
-jwt_service = JWTService()
-dynamodb_service = DynamoDBService()
+jwt_service = registry.jwt_service()
+dynamodb_service = registry.dynamodb_service()
 session_repository = SessionRepository(dynamodb_service)
 application_repository = ApplicationRepository(dynamodb_service)
 session_domain = SessionDomain(session_repository, application_repository, jwt_service)
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 8, 'cognito': 1, 'forbid': ['Scan']})
 def lambda_handler(event, context):
     """
     Lambda handler for DELETE /user-sessions/{session_id}
@@ -31,15 +38,13 @@ def lambda_handler(event, context):
     - action: 'revoke_all_others' 
     - current_session_id: session to keep active
     """
-    print("Revoke user session request received:", event)
-    
     try:
         # Extract authorization header
         headers = event.get('headers', {})
         auth_header = headers.get('authorization') or headers.get('Authorization')
         
         if not auth_header or not auth_header.startswith('Bearer '):
-            return error_response("Missing or invalid authorization header", 401)
+            return error_response(401, "Missing or invalid authorization header")
         
         id_token = auth_header.replace('Bearer ', '')
         
@@ -48,13 +53,13 @@ def lambda_handler(event, context):
             user_info = jwt_service.extract_user_info(id_token)
             cognito_sub = user_info['sub']
         except ValueError as e:
-            print(f"Token validation failed: {str(e)}")
-            return error_response("Invalid or expired token", 401)
+            logger.warning("Token validation failed: %s", e)
+            return error_response(401, "Invalid or expired token")
         
         # Find user by cognito sub
         user = application_repository.find_user_by_sub(cognito_sub)
         if not user:
-            return error_response("User not found", 404)
+            return error_response(404, "User not found")
         
         user_id = user['PK']
         
@@ -63,7 +68,7 @@ def lambda_handler(event, context):
         session_id = path_params.get('session_id')
         
         if not session_id:
-            return error_response("Missing session_id in path", 400)
+            return error_response(400, "Missing session_id in path")
         
         # Handle bulk operations
         if session_id == 'all-others':
@@ -75,20 +80,44 @@ def lambda_handler(event, context):
                 
                 if action == 'revoke_all_others':
                     if not current_session_id:
-                        return error_response("current_session_id required for bulk revocation", 400)
+                        return error_response(400, "current_session_id required for bulk revocation")
+                    
+                    try:
+                        result = session_domain.revoke_all_other_sessions(user_id, current_session_id)
+                    except Exception as e:
+                        # couldn't even list the sessions - none were revoked, don't report success
+                        logger.error("Error listing sessions to revoke for %s: %s", user_id, e)
+                        return error_response(503, "Could not list sessions to revoke, please retry",
+                                              error_code="REVOCATION_FAILED")
+                    
+                    revoked_count = result['revoked_count']
+                    failed_count = result['failed_count']
                     
-                    revoked_count = session_domain.revoke_all_other_sessions(user_id, current_session_id)
+                    # some sessions are still alive - tell the caller so "log out everywhere" can be retried
+                    if failed_count:
+                        return format_response(500, {
+                            "success": False,
+                            "message": f"Revoked {revoked_count} sessions, {failed_count} could not be revoked",
+                            "error_code": "PARTIAL_REVOCATION",
+                            "data": {
+                                "revoked_count": revoked_count,
+                                "failed_count": failed_count,
+                                "failed_session_ids": result['failed_session_ids'],
+                                "action": "revoke_all_others"
+                            }
+                        })
                     
                     return success_response({
                         "message": f"Successfully revoked {revoked_count} sessions",
                         "revoked_count": revoked_count,
+                        "failed_count": 0,
                         "action": "revoke_all_others"
                     })
                 else:
-                    return error_response("Invalid action for bulk operation", 400)
+                    return error_response(400, "Invalid action for bulk operation")
                     
             except json.JSONDecodeError:
-                return error_response("Invalid JSON in request body", 400)
+                return error_response(400, "Invalid JSON in request body")
         else:
             # Handle single session revocation
             try:
@@ -101,16 +130,16 @@ def lambda_handler(event, context):
                         "action": "revoke_single"
                     })
                 else:
-                    return error_response("Failed to revoke session", 500)
+                    return error_response(500, "Failed to revoke session")
                     
             except ValueError as e:
                 if "not found" in str(e):
-                    return error_response("Session not found", 404)
+                    return error_response(404, "Session not found")
                 elif "unauthorized" in str(e):
-                    return error_response("Unauthorized to revoke this session", 403)
+                    return error_response(403, "Unauthorized to revoke this session")
                 else:
-                    return error_response(str(e), 400)
+                    return error_response(400, str(e))
         
     except Exception as e:
-        print(f"Error in revoke_user_session: {str(e)}")
-        return error_response("Internal server error", 500) 
\ No newline at end of file
+        logger.error("Error in revoke_user_session: %s", e)
+        return error_response(500, "Internal server error") 
\ No newline at end of file
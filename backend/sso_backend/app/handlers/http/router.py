@@ -0,0 +1,74 @@
+import os
+import sys
+import importlib
+
+# Add the parent directory to sys.path to allow importing from app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.response_formatter import error_response
+from utils.logger import get_logger
+from services.warmup import warm_start
+
+logger = get_logger(__name__)
+
+# HTTP API route key -> (handler module in this package, function)
+# keep in sync with functions/http.router.yml and functions/http.per-function.yml
+ROUTES = {
+    'GET /validate-app-channel': ('validate_app_channel', 'handler'),
+    'GET /check-app-user': ('check_app_user', 'handler'),
+    'POST /init-session': ('init_session', 'handler'),
+    'GET /get-session': ('get_session', 'handler'),
+    'POST /authorize-application': ('authorize_application', 'handler'),
+    'GET /user-authorizations': ('get_user_authorizations', 'handler'),
+    'DELETE /user-authorizations/{application_id}': ('revoke_user_authorization', 'handler'),
+    'PATCH /user-profile': ('update_user_profile', 'handler'),
+    'GET /user-sessions': ('get_user_sessions', 'lambda_handler'),
+    'DELETE /user-sessions/{session_id}': ('revoke_user_session', 'lambda_handler')
+}
+
+# route key -> handler function, filled as routes are first hit
+_handlers = {}
+
+def get_route_handler(route_key):
+    """
+    get the handler function for a route, importing its module on first use
+    (a route that is never called never pays for its imports)
+
+    Args:
+        route_key (str): HTTP API route key like 'GET /get-session'
+
+    Returns:
+        callable: the handler, or None for an unknown route
+    """
+    route_handler = _handlers.get(route_key)
+    if route_handler is None and route_key in ROUTES:
+        module_name, function_name = ROUTES[route_key]
+        module = importlib.import_module(f".{module_name}", __package__)
+        route_handler = _handlers.setdefault(route_key, getattr(module, function_name))
+    return route_handler
+
+@warm_start
+def handler(event, context):
+    """
+    HTTP Handler for every SSO route when deployed as a single function
+    (serverless deploy --http-deployment router)
+    Dispatches on the event's routeKey to the same handler functions the
+    per-function deployment uses, so they keep their own logging and io
+    budgets while sharing one container's warm state - the service
+    registry, JWKS, verified tokens and repositories
+
+    Args:
+        event: API Gateway (HTTP API, payload v2) event
+        context: Lambda context
+
+    Returns:
+        dict: the route handler's response, 404 for an unknown route
+    """
+    route_key = (event or {}).get('routeKey')
+    route_handler = get_route_handler(route_key)
+
+    if route_handler is None:
+        logger.warning("no handler for route %s", route_key)
+        return error_response(404, "Route not found")
+
+    return route_handler(event, context)
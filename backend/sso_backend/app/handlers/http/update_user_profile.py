@@ -5,22 +5,28 @@ import os
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+from services import registry
 from utils.response_formatter import success_response, error_response
-from services.auth.jwt_service import JWTService
-from services.aws.cognito_user_service import CognitoUserService
-from services.aws.dynamodb_service import DynamoDBService
 from services.repositories.user_repository import UserRepository
 from services.repositories.application_repository import ApplicationRepository
 from domains.user_profile_domain import UserProfileDomain
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and domain
-jwt_service = JWTService()
-cognito_user_service = CognitoUserService()
-dynamodb_service = DynamoDBService()
+jwt_service = registry.jwt_service()
+cognito_user_service = registry.cognito_user_service()
+dynamodb_service = registry.dynamodb_service()
 user_repository = UserRepository(dynamodb_service)
 application_repository = ApplicationRepository(dynamodb_service)
 user_profile_domain = UserProfileDomain(cognito_user_service, user_repository)
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 5, 'cognito': 2, 'forbid': ['Scan']})
 def handler(event, context):
     """
     HTTP Handler for PATCH /user-profile
@@ -34,8 +40,6 @@ def handler(event, context):
         API Gateway response with updated profile status
     """
     try:
-        print("Update user profile request received:", json.dumps(event))
-        
         # Extract and validate Authorization header
         headers = event.get('headers', {})
         auth_header = headers.get('authorization') or headers.get('Authorization')
@@ -65,21 +69,21 @@ def handler(event, context):
         user = application_repository.find_user_by_sub(cognito_sub)
         
         # Debug: Print user lookup details
-        print(f"Looking for user with sub: {cognito_sub}")
+        logger.debug("Looking for user with sub %s", cognito_sub)
         
         # If not found by sub directly, try to find by email (for OAuth users)
         if not user and 'email' in user_info:
-            print(f"User not found by sub, trying email lookup: {user_info['email']}")
+            logger.debug("User not found by sub %s, trying email lookup", cognito_sub)
             user = user_repository.find_user_by_email(user_info['email'])
             
             if user:
-                print(f"Found user by email: {user_info['email']}")
+                logger.debug("Found user by email", cognito_sub=cognito_sub)
                 # Update the user's sub to match the current one
                 user['sub'] = cognito_sub
                 user_repository.update_user(user)
         
         if not user:
-            print(f"User not found in DynamoDB with sub: {cognito_sub} or email: {user_info.get('email', 'N/A')}")
+            logger.warning("User not found in DynamoDB with sub %s or their email", cognito_sub)
             return error_response(
                 status_code=404,
                 message="User not found in system",
@@ -87,7 +91,7 @@ def handler(event, context):
             )
         
         user_id = user['PK']  # Extract user_id from DynamoDB
-        print(f"Found user with ID: {user_id}")
+        logger.debug("Found user with ID %s", user_id)
         
         # Extract request body
         body = event.get('body')
@@ -142,7 +146,7 @@ def handler(event, context):
                 error_code="VALIDATION_ERROR"
             )
         except Exception as e:
-            print(f"Unexpected error updating profile: {str(e)}")
+            logger.error("Unexpected error updating profile: %s", e)
             return error_response(
                 status_code=500,
                 message="Internal server error",
@@ -150,7 +154,7 @@ def handler(event, context):
             )
     
     except Exception as e:
-        print(f"Unexpected error in update_user_profile handler: {str(e)}")
+        logger.error("Unexpected error in update_user_profile handler: %s", e)
         return error_response(
             status_code=500,
             message="Internal server error",
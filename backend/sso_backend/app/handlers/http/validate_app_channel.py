@@ -1,20 +1,27 @@
-import json
 import os
 import sys
 
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.application_repository import ApplicationRepository
 from domains.application_domain import ApplicationDomain
 from utils.response_formatter import success_response, error_response
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
+from services.warmup import warm_start
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 application_repository = ApplicationRepository(dynamodb_service)
 application_domain = ApplicationDomain(application_repository)
 
+logger = get_logger(__name__)
+
+@warm_start
+@log_request
+@track_io({'dynamodb': 1, 'forbid': ['Scan']})
 def handler(event, context):
     """
     HTTP Handler for GET /validate-app-channel
@@ -28,8 +35,6 @@ def handler(event, context):
         API Gateway response with validation result
     """
     try:
-        print("Validate app channel request received:", json.dumps(event))
-        
         # Extract query parameters
         query_params = event.get('queryStringParameters') or {}
         application_id = query_params.get('application_id')
@@ -64,7 +69,7 @@ def handler(event, context):
             )
         
     except Exception as e:
-        print(f"Error in validate app channel handler: {str(e)}")
+        logger.error("Error in validate app channel handler: %s", e)
         return error_response(
             status_code=500,
             message="Internal server error",
@@ -0,0 +1,93 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to sys.path to allow importing from app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services import registry
+from services.repositories.session_repository import SessionRepository
+from domains.session_domain import SessionDomain
+from utils.rate_limiter import RateLimiter
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request, add_request_fields
+
+# Refresh sessions whose tokens expire within this many minutes (keep it above the schedule
+# interval plus SessionDomain.REFRESH_WINDOW so sessions are refreshed before a request has to)
+HORIZON_MINUTES = int(os.environ.get('SESSION_REFRESH_HORIZON_MINUTES', '15'))
+# Cognito InitiateAuth calls per second across all workers
+RATE_PER_SECOND = float(os.environ.get('SESSION_REFRESH_RATE_PER_SECOND', '10'))
+MAX_WORKERS = int(os.environ.get('SESSION_REFRESH_MAX_WORKERS', '8'))
+# Sessions older than this are left to refresh on use (or expire), so abandoned
+# sessions aren't kept alive for the whole refresh token lifetime
+MAX_SESSION_AGE_HOURS = int(os.environ.get('SESSION_REFRESH_MAX_AGE_HOURS', '24'))
+# Stop handing out work when less than this much of the invocation is left
+SAFETY_MARGIN_MS = 15000
+
+# Initialize services and repositories
+dynamodb_service = registry.dynamodb_service()
+session_repository = SessionRepository(dynamodb_service)
+session_domain = SessionDomain(session_repository, None, None, registry.cognito_user_service())
+
+logger = get_logger(__name__)
+
+@log_request
+@track_io()
+def handler(event, context):
+    """
+    Scheduled handler that refreshes session tokens before they expire
+    Finds sessions expiring within the horizon through the GSI2 expiry buckets and
+    refreshes them in parallel batches under a rate limit, so /get-session rarely
+    has to call Cognito inline
+
+    Args:
+        event: EventBridge schedule event
+        context: Lambda context
+
+    Returns:
+        dict: Counts of refreshed / skipped / failed / aged out sessions
+    """
+    now = datetime.now()
+    oldest_created_at = (now - timedelta(hours=MAX_SESSION_AGE_HOURS)).isoformat()
+    limiter = RateLimiter(RATE_PER_SECOND)
+    summary = {'found': 0, 'refreshed': 0, 'skipped': 0, 'failed': 0, 'aged_out': 0, 'deferred': 0}
+
+    def refresh(session):
+        limiter.acquire()
+        try:
+            return session_domain.refresh_session_tokens(session)
+        except Exception as e:
+            logger.error("Error refreshing session %s: %s", session.get('PK'), e)
+            return 'failed'
+
+    sessions = session_repository.iter_sessions_expiring_between(now, now + timedelta(minutes=HORIZON_MINUTES))
+    batch = []
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for session in sessions:
+            summary['found'] += 1
+
+            if session.get('created_at', '') < oldest_created_at:
+                summary['aged_out'] += 1
+                continue
+
+            batch.append(session)
+            if len(batch) < MAX_WORKERS * 4:
+                continue
+
+            if context and context.get_remaining_time_in_millis() < SAFETY_MARGIN_MS:
+                # the next run (or the user's own request) picks up the rest
+                summary['deferred'] += len(batch)
+                batch = []
+                break
+
+            for outcome in executor.map(refresh, batch):
+                summary[outcome] += 1
+            batch = []
+
+        for outcome in executor.map(refresh, batch):
+            summary[outcome] += 1
+
+    add_request_fields(outcomes=summary)
+    return summary
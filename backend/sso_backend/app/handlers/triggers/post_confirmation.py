@@ -1,21 +1,26 @@
-import json
 import os
 import sys
 
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.user_repository import UserRepository
 from services.repositories.application_repository import ApplicationRepository
 from domains.user_domain import UserDomain
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 user_repository = UserRepository(dynamodb_service)
 application_repository = ApplicationRepository(dynamodb_service)
 user_domain = UserDomain(user_repository, application_repository)
 
+logger = get_logger(__name__)
+
+@log_request
+@track_io({'dynamodb': 2, 'forbid': ['Scan']})
 def handler(event, context):
     """
     Post-confirmation Lambda trigger for Cognito.
@@ -30,15 +35,13 @@ def handler(event, context):
         The event object to be passed back to Cognito
     """
     try:
-        print("Post confirmation trigger received event:", json.dumps(event))
-        
         # Extract user attributes from Cognito event
         user_attributes = event['request']['userAttributes']
         
         # Check if this is a password reset event
         trigger_source = event.get('triggerSource', '')
         if trigger_source == 'PostConfirmation_ConfirmForgotPassword':
-            print("This is a password reset event. Skipping user creation.")
+            logger.info("Password reset event, skipping user creation")
             return event
         
         # Get application context from ClientMetadata
@@ -49,28 +52,28 @@ def handler(event, context):
         # Use application_name as application_id (or fallback to default for testing)
         application_id = application_name if application_name else "default_app"
         
-        print(f"Registration context - Application: {application_name}, Channel: {channel_id}")
+        logger.debug("Registration context - application: %s, channel: %s", application_name, channel_id)
         
         # Check if user already exists with this email
         email = user_attributes.get('email')
         if email:
             existing_user = user_repository.find_user_by_email(email)
             if existing_user:
-                print(f"User with email {email} already exists. Updating sub.")
+                logger.debug("User with this email already exists, updating sub")
                 existing_user['sub'] = user_attributes.get('sub')
                 user_repository.update_user(existing_user)
-                print(f"Updated existing user {existing_user['PK']} with new sub")
+                logger.info("Updated existing user %s with new sub", existing_user['PK'])
                 return event
         
         # Register the user using the domain layer
         user_id, user_item = user_domain.register_user(user_attributes, application_id)
         
-        print(f"Successfully created user {user_id} - will require consent for application {application_id}")
+        logger.info("Created user %s - will require consent for application %s", user_id, application_id)
         
         # Return the event to Cognito
         return event
         
     except Exception as e:
-        print(f"Error in post confirmation trigger: {str(e)}")
+        logger.error("Error in post confirmation trigger: %s", e)
         # In case of error, we still return the event to not block the user confirmation
         return event
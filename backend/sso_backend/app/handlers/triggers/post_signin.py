@@ -1,19 +1,24 @@
-import json
 import os
 import sys
 
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.application_repository import ApplicationRepository
 from domains.application_domain import ApplicationDomain
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 application_repository = ApplicationRepository(dynamodb_service)
 application_domain = ApplicationDomain(application_repository)
 
+logger = get_logger(__name__)
+
+@log_request
+@track_io({'dynamodb': 4, 'cognito': 1, 'forbid': ['Scan']})
 def handler(event, context):
     """
     PostSignIn Lambda trigger for Cognito.
@@ -28,8 +33,6 @@ def handler(event, context):
         The event object to be passed back to Cognito
     """
     try:
-        print("PostSignIn trigger received event:", json.dumps(event))
-        
         # Extract user attributes from Cognito event
         user_attributes = event['request']['userAttributes']
         cognito_sub = user_attributes.get('sub')
@@ -38,17 +41,17 @@ def handler(event, context):
         client_metadata = event['request'].get('clientMetadata', {})
         application_name = client_metadata.get('application_name', '')
         
-        print(f"PostSignIn - User: {cognito_sub}, Application: {application_name}")
+        logger.debug("PostSignIn - user: %s, application: %s", cognito_sub, application_name)
         
         # If no application context, this is just a regular sign-in
         if not application_name:
-            print("No application context found, allowing regular sign-in")
+            logger.debug("No application context found, allowing regular sign-in")
             return event
         
         # Find user by Cognito sub
         user = application_repository.find_user_by_sub(cognito_sub)
         if not user:
-            print(f"User with sub {cognito_sub} not found in system")
+            logger.warning("User with sub %s not found in system", cognito_sub)
             # This shouldn't happen if PostConfirmation worked properly
             return event
         
@@ -58,12 +61,12 @@ def handler(event, context):
         is_authorized = application_repository.check_app_user_authorization(application_name, user_id)
         
         if is_authorized:
-            print(f"User {user_id} already authorized for application {application_name}")
+            logger.debug("User %s already authorized for application %s", user_id, application_name)
             return event
         
         # User needs to authorize this application
         # Set a flag in the response that frontend can detect
-        print(f"User {user_id} needs to authorize application {application_name}")
+        logger.info("User %s needs to authorize application %s", user_id, application_name)
         
         # We can't directly redirect from PostSignIn trigger, but we can set custom attributes
         # The frontend will need to check for authorization status after login
@@ -75,6 +78,6 @@ def handler(event, context):
         return event
         
     except Exception as e:
-        print(f"Error in PostSignIn trigger: {str(e)}")
+        logger.error("Error in PostSignIn trigger: %s", e)
         # In case of error, we still return the event to not block the user sign-in
         return event 
\ No newline at end of file
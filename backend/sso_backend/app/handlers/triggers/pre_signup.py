@@ -1,26 +1,31 @@
-import json
 import os
 import sys
 
 # Add the parent directory to sys.path to allow importing from app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from services.aws.dynamodb_service import DynamoDBService
+from services import registry
 from services.repositories.user_repository import UserRepository
 from services.repositories.application_repository import ApplicationRepository
 from domains.user_domain import UserDomain
+from services.aws.io_budget import track_io
+from utils.logger import get_logger, log_request
 import uuid
 
 # Initialize services and repositories
-dynamodb_service = DynamoDBService()
+dynamodb_service = registry.dynamodb_service()
 user_repository = UserRepository(dynamodb_service)
 application_repository = ApplicationRepository(dynamodb_service)
 user_domain = UserDomain(user_repository, application_repository)
 
+logger = get_logger(__name__)
+
 def create_uuid():
     """Generate a unique identifier for users"""
     return f"user-{str(uuid.uuid4())[:8]}"
 
+@log_request
+@track_io({'dynamodb': 2, 'forbid': ['Scan']})
 def handler(event, context):
     """
     PreSignUp Lambda trigger for Cognito.
@@ -35,24 +40,22 @@ def handler(event, context):
         The event object to be passed back to Cognito
     """
     try:
-        print("PreSignUp trigger received event:", json.dumps(event))
-        
         # Only auto-confirm users for external providers (social logins)
         if event["triggerSource"] == "PreSignUp_ExternalProvider":
-            print("External provider signup detected, auto-confirming user.")
+            logger.debug("External provider signup detected, auto-confirming user")
             event["response"]["autoConfirmUser"] = True
         else:
-            print("Regular signup flow detected, NOT auto-confirming user.")
+            logger.debug("Regular signup flow detected, NOT auto-confirming user")
             event["response"]["autoConfirmUser"] = False
         
         # If the signup was from AdminCreateUser, just return
         if event["triggerSource"] == "PreSignUp_AdminCreateUser":
-            print("AdminCreateUser flow detected, allowing without changes")
+            logger.debug("AdminCreateUser flow detected, allowing without changes")
             return event
 
         # Handle social provider signup (Google, Facebook, etc.)
         if event["triggerSource"] == "PreSignUp_ExternalProvider":
-            print('Social login detected')
+            logger.debug("Social login detected")
             
             # Auto-confirm and auto-verify the user
             event['response']['autoConfirmUser'] = True
@@ -61,28 +64,28 @@ def handler(event, context):
             # Social logins will be redirected to profile completion based on missing phone_number
             
             # Log all user attributes for debugging
-            print(f"User attributes before modification: {event['request']['userAttributes']}")
+            logger.debug("User attributes before modification", attributes=event['request']['userAttributes'])
             
             # Remove phone_number if it exists to force profile completion
             if 'phone_number' in event['request']['userAttributes']:
-                print('[PreSignUp] Removing phone_number to ensure profile completion')
+                logger.debug("Removing phone_number to ensure profile completion")
                 del event['request']['userAttributes']['phone_number']
                 
             # Force email_verified to true for social logins
             # This is critical for Google OAuth users
-            print('[PreSignUp] Setting email_verified to true')
+            logger.debug("Setting email_verified to true")
             event['response']['autoVerifyEmail'] = True
             
             # Log all user attributes for debugging
-            print(f"User attributes after modification: {event['request']['userAttributes']}")
+            logger.debug("User attributes after modification", attributes=event['request']['userAttributes'])
             
             # Extract identity provider information
             provider = event['request'].get('userAttributes', {}).get('identities')
-            print(f'Identity provider info: {provider}')
+            logger.debug("Identity provider info", provider=provider)
             
             # Extract email from user attributes
             user_email = event["request"]["userAttributes"]["email"]
-            print(f"Social login with email: {user_email}")
+            logger.debug("Social login detected for an email user")
             
             # Check if there's an existing user with this email
             existing_user = user_repository.find_user_by_email(user_email)
@@ -99,7 +102,7 @@ def handler(event, context):
             else:
                 formatted_provider = provider_name.title()
                 
-            print(f"Provider: {formatted_provider}, ID: {provider_id}")
+            logger.debug("Provider: %s, ID: %s", formatted_provider, provider_id)
             
             # Prepare provider data structure
             provider_data = {
@@ -111,7 +114,7 @@ def handler(event, context):
             
             # If there's an existing user with this email
             if existing_user:
-                print(f"Found existing user with email {user_email}")
+                logger.debug("Found existing user with this email")
                 
                 # Get the user_id from the existing user
                 user_id = existing_user.get("PK")
@@ -121,7 +124,7 @@ def handler(event, context):
                 
                 # Use the existing user's ID for this login
                 event["userName"] = user_id
-                print(f"Linked social account to existing user: {user_id}")
+                logger.info("Linked social account to existing user %s", user_id)
                 
                 # Set a custom attribute to indicate this is a linked account
                 if "custom:is_linked_account" not in event["request"]["userAttributes"]:
@@ -129,30 +132,30 @@ def handler(event, context):
             
             # If no existing user, create a new one
             else:
-                print(f"No existing user found for email {user_email}, creating new user")
+                logger.debug("No existing user found for this email, creating new user")
                 
                 # Generate a username for the new user
                 event["request"]["userAttributes"]["user_name"] = create_uuid()
                 
                 # We'll let post_confirmation handle the actual user creation
-                print(f"New user will be created with ID: {event['request']['userAttributes']['user_name']}")
+                logger.info("New user will be created with ID %s", event['request']['userAttributes']['user_name'])
         
         # Handle regular signup
         elif event["triggerSource"] == "PreSignUp_SignUp":
-            print("Regular signup flow detected")
+            logger.debug("Regular signup flow detected")
             
             # Check for duplicate email
             user_email = event["request"]["userAttributes"]["email"]
             existing_user = user_repository.find_user_by_email(user_email)
             
             if existing_user:
-                print(f"User with email {user_email} already exists")
+                logger.info("User with this email already exists")
                 raise Exception("A user with this email already exists")
             
         
         return event
         
     except Exception as e:
-        print(f"Error in PreSignUp trigger: {str(e)}")
+        logger.error("Error in PreSignUp trigger: %s", e)
         # Re-raise the exception to prevent signup if there's an error
         raise e
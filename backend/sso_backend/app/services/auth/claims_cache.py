@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+class VerifiedClaimsCache:
+    """
+    in-process lru cache of claims from tokens we already verified
+    keyed by a sha256 of the raw token, each entry dies at the token's exp
+    the frontends resend the same id token until it expires, so a warm
+    container only pays for the rsa signature check once per token
+    """
+
+    # one cache per (issuer, audience) so a token verified for one app client
+    # is never served to a JWTService configured for another
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    # rough per-entry overhead on top of the claims themselves (digest, tuple, dict slot)
+    ENTRY_OVERHEAD_BYTES = 200
+
+    @classmethod
+    def shared(cls, issuer, audience):
+        """get the shared cache for an issuer + audience (created on first use)"""
+        namespace = (issuer, audience)
+        with cls._instances_lock:
+            cache = cls._instances.get(namespace)
+            if cache is None:
+                cache = cls()
+                cls._instances[namespace] = cache
+            return cache
+
+    def __init__(self, max_bytes=None, max_entries=None):
+        """
+        set up an empty cache
+
+        args:
+            max_bytes (int): memory budget for cached claims (env JWT_CLAIMS_CACHE_MAX_BYTES, default 1 MB)
+            max_entries (int): hard cap on entries (env JWT_CLAIMS_CACHE_MAX_ENTRIES, default 1000)
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.environ.get('JWT_CLAIMS_CACHE_MAX_BYTES', 1024 * 1024))
+        self.max_entries = max_entries if max_entries is not None else int(os.environ.get('JWT_CLAIMS_CACHE_MAX_ENTRIES', 1000))
+
+        self._entries = OrderedDict()  # digest -> (claims, exp, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(token):
+        """hash the token so raw tokens never sit in memory as dict keys"""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token):
+        """
+        get the cached claims for a token
+
+        args:
+            token (str): the raw jwt
+
+        returns:
+            dict: a copy of the verified claims, or none on a miss / expired entry
+        """
+        key = self.digest(token)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            claims, exp, size = entry
+            if exp <= time.time():
+                # token expired - drop it and let the caller re-verify (which will reject it)
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(claims)
+
+    def put(self, token, claims):
+        """
+        remember the claims of a token that just passed verification
+
+        args:
+            token (str): the raw jwt
+            claims (dict): the verified claims (must include a numeric exp)
+        """
+        exp = claims.get('exp')
+        if not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+
+        size = len(json.dumps(claims, default=str)) + self.ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        key = self.digest(token)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            # evict least recently used entries until the new one fits the budget
+            while self._entries and (self.current_bytes + size > self.max_bytes or len(self._entries) >= self.max_entries):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+            self._entries[key] = (dict(claims), exp, size)
+            self.current_bytes += size
+
+    def clear(self):
+        """drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """
+        get hit/miss counters and memory usage
+
+        returns:
+            dict: hits, misses, evictions, entries, bytes and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0
+            }
+
+    def _remove(self, key):
+        """drop one entry and release its bytes (caller holds the lock)"""
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
@@ -1,6 +1,9 @@
 import os
-import boto3
 from botocore.exceptions import ClientError
+from services.aws.io_budget import instrument_client
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class CognitoUserService:
     """
@@ -9,13 +12,22 @@ class CognitoUserService:
     
     def __init__(self):
         """Initialize Cognito client with environment configuration"""
-        self.cognito_client = boto3.client('cognito-idp', region_name=os.environ.get('AWS_REGION', 'ap-southeast-2'))
+        self._cognito_client = None
         self.user_pool_id = os.environ.get('COGNITO_USER_POOL_ID')
         self.client_id = os.environ.get('COGNITO_APP_CLIENT_ID') 
         
         if not self.user_pool_id:
             raise ValueError("COGNITO_USER_POOL_ID environment variable is required")
     
+    @property
+    def cognito_client(self):
+        """Cognito client, created on first use so importing a handler doesn't pay for boto3"""
+        if self._cognito_client is None:
+            import boto3
+            client = boto3.client('cognito-idp', region_name=os.environ.get('AWS_REGION', 'ap-southeast-2'))
+            self._cognito_client = instrument_client(client)
+        return self._cognito_client
+    
     def update_user_attributes(self, access_token, attributes):
         """
         Update user attributes in Cognito
@@ -54,58 +66,57 @@ class CognitoUserService:
             try:
                 user_info = self.get_user_info(access_token)
                 user_sub = user_info.get('sub')
-                print(f"Token is valid. User sub: {user_sub}")
-                print(f"Token scopes may be insufficient for direct attribute updates")
+                logger.debug("Token is valid. User sub: %s", user_sub)
                 
                 # Also try to extract cognito:username from JWT for potential admin API use
                 try:
-                    from jose import jwt
-                    decoded_token = jwt.get_unverified_claims(access_token)
+                    from services.auth.verifiers import get_verifier
+                    decoded_token = get_verifier().get_unverified_claims(access_token)
                     cognito_username = decoded_token.get('cognito:username')
-                    print(f"Extracted cognito:username: {cognito_username}")
+                    logger.debug("Extracted cognito:username: %s", cognito_username)
                 except Exception:
                     pass  # cognito_username remains None
                     
             except Exception as info_err:
-                print(f"Error getting user info: {str(info_err)}")
+                logger.warning("Error getting user info: %s", info_err)
                 # Try to extract user info from JWT token directly
                 try:
-                    from jose import jwt
+                    from services.auth.verifiers import get_verifier
                     
                     # Decode JWT without verification to extract claims
-                    decoded_token = jwt.get_unverified_claims(access_token)
+                    decoded_token = get_verifier().get_unverified_claims(access_token)
                     user_sub = decoded_token.get('sub')
                     cognito_username = decoded_token.get('cognito:username')
-                    print(f"Extracted from JWT - sub: {user_sub}, username: {cognito_username}")
+                    logger.debug("Extracted from JWT - sub: %s, username: %s", user_sub, cognito_username)
                 except Exception as jwt_err:
-                    print(f"Failed to decode JWT: {str(jwt_err)}")
+                    logger.warning("Failed to decode JWT: %s", jwt_err)
                     user_sub = None
                     cognito_username = None
             
             # Try direct update with access token
             try:
-                print(f"Attempting to update attributes: {user_attributes}")
+                logger.debug("Attempting to update attributes", attributes=list(attributes.keys()))
                 response = self.cognito_client.update_user_attributes(
                     AccessToken=access_token,
                     UserAttributes=user_attributes
                 )
                 
-                print(f"Successfully updated user attributes: {list(attributes.keys())}")
-                print(f"Response from Cognito: {response}")
+                logger.info("Updated user attributes", attributes=list(attributes.keys()))
+                logger.debug("Response from Cognito", response=response)
                 return True
                 
             except ClientError as token_err:
                 error_code = token_err.response['Error']['Code']
                 error_message = token_err.response['Error']['Message']
                 
-                print(f"Direct update failed: {error_code} - {error_message}")
+                logger.warning("Direct update failed: %s - %s", error_code, error_message)
                 
                 # If we have user info from the token and it's an authorization error,
                 # try admin update as a fallback
                 if user_sub and error_code in ['NotAuthorizedException', 'AccessDeniedException']:
                     # For admin API, we need to use the cognito:username, not the sub
                     username_for_admin = cognito_username if cognito_username else user_sub
-                    print(f"Attempting admin update as fallback for user {username_for_admin}")
+                    logger.info("Attempting admin update as fallback for user %s", username_for_admin)
                     
                     try:
                         # For Google OAuth users, we need to use the email as username
@@ -131,18 +142,18 @@ class CognitoUserService:
                         
                         for username in possible_usernames:
                             try:
-                                print(f"Attempting admin update with username: {username}")
+                                logger.debug("Attempting admin update with username %s", username)
                                 admin_response = self.cognito_client.admin_update_user_attributes(
                                     UserPoolId=self.user_pool_id,
                                     Username=username,
                                     UserAttributes=user_attributes
                                 )
-                                print(f"Successfully updated user attributes via admin API: {list(attributes.keys())}")
-                                print(f"Admin response: {admin_response}")
+                                logger.info("Updated user attributes via admin API", attributes=list(attributes.keys()))
+                                logger.debug("Admin response", response=admin_response)
                                 break  # Success, exit the loop
                             except ClientError as username_err:
                                 last_error = username_err
-                                print(f"Failed with username {username}: {username_err.response['Error']['Code']} - {username_err.response['Error']['Message']}")
+                                logger.warning("Failed with username %s: %s - %s", username, username_err.response['Error']['Code'], username_err.response['Error']['Message'])
                         
                         # If we tried all usernames and still failed, raise the last error
                         if not admin_response:
@@ -156,7 +167,7 @@ class CognitoUserService:
                         admin_error_code = admin_err.response['Error']['Code']
                         admin_error_message = admin_err.response['Error']['Message']
                         
-                        print(f"Admin update failed: {admin_error_code} - {admin_error_message}")
+                        logger.error("Admin update failed: %s - %s", admin_error_code, admin_error_message)
                         raise ValueError(f"Failed to update attributes: {admin_error_message}")
                 else:
                     # Re-raise with more specific error messages
@@ -171,7 +182,7 @@ class CognitoUserService:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             
-            print(f"Failed to update user attributes: {error_code} - {error_message}")
+            logger.error("Failed to update user attributes: %s - %s", error_code, error_message)
             
             # Re-raise with more specific error messages
             if error_code == 'NotAuthorizedException':
@@ -218,7 +229,7 @@ class CognitoUserService:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             
-            print(f"Failed to get user info: {error_code} - {error_message}")
+            logger.error("Failed to get user info: %s - %s", error_code, error_message)
             
             if error_code == 'NotAuthorizedException':
                 raise ValueError("Invalid or expired access token")
@@ -265,14 +276,14 @@ class CognitoUserService:
                 
                 return user_info
             
-            print(f"No user found with sub: {cognito_sub}")
+            logger.info("No user found with sub %s", cognito_sub)
             return None
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             
-            print(f"Failed to get user by sub: {error_code} - {error_message}")
+            logger.error("Failed to get user by sub: %s - %s", error_code, error_message)
             raise ClientError(e.response, e.operation_name)
     
     def refresh_tokens(self, refresh_token):
@@ -319,14 +330,14 @@ class CognitoUserService:
             else:
                 tokens['refresh_token'] = refresh_token
                 
-            print("Successfully refreshed tokens")
+            logger.debug("Refreshed tokens")
             return tokens
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             
-            print(f"Failed to refresh tokens: {error_code} - {error_message}")
+            logger.warning("Failed to refresh tokens: %s - %s", error_code, error_message)
             
             if error_code == 'NotAuthorizedException':
                 raise ValueError("Invalid or expired refresh token")
@@ -1,6 +1,15 @@
 import os
-import boto3
+import time
+import random
+import threading
+from services.aws.io_budget import instrument_client
 from datetime import datetime
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# guards the first boto3.resource call when requests share a container's service from threads
+_resource_lock = threading.Lock()
 
 class DynamoDBService:
     """
@@ -8,11 +17,53 @@ class DynamoDBService:
     Provides methods to interact with DynamoDB tables.
     """
     
+    # BatchGetItem accepts at most 100 keys per request
+    BATCH_GET_CHUNK_SIZE = 100
+    # Attempts at re-requesting keys DynamoDB left unprocessed (throttling / 16 MB limit)
+    BATCH_GET_MAX_RETRIES = 5
+    BATCH_GET_BASE_DELAY_SECONDS = 0.05
+    # BatchWriteItem accepts at most 25 requests
+    BATCH_WRITE_CHUNK_SIZE = 25
+    BATCH_WRITE_MAX_RETRIES = 5
+    BATCH_WRITE_BASE_DELAY_SECONDS = 0.05
+    # Chunks sent at the same time by batch_delete_items
+    BATCH_WRITE_MAX_WORKERS = 4
+    
     def __init__(self):
-        """Initialize the DynamoDB service with the main table name from environment variables."""
-        self.dynamodb = boto3.resource('dynamodb')
+        """
+        Initialize the DynamoDB service with the main table name from environment variables.
+        The boto3 resource and table are created on first use (see dynamodb).
+        """
         self.main_table_name = os.environ.get('MAIN_TABLE', 'matt-cognito-hop-main')
-        self.main_table = self.dynamodb.Table(self.main_table_name)
+        self._dynamodb = None
+        self._main_table = None
+
+    @property
+    def dynamodb(self):
+        """The boto3 DynamoDB resource, created on first use so importing a handler doesn't pay for boto3."""
+        if self._dynamodb is None:
+            with _resource_lock:
+                if self._dynamodb is None:
+                    import boto3
+                    dynamodb = boto3.resource('dynamodb')
+                    instrument_client(dynamodb.meta.client)
+                    self._dynamodb = dynamodb
+        return self._dynamodb
+    
+    @dynamodb.setter
+    def dynamodb(self, resource):
+        self._dynamodb = resource
+
+    @property
+    def main_table(self):
+        """The main table, bound to the resource on first use."""
+        if self._main_table is None:
+            self._main_table = self.dynamodb.Table(self.main_table_name)
+        return self._main_table
+    
+    @main_table.setter
+    def main_table(self, table):
+        self._main_table = table
     
     def put_item(self, item):
         """
@@ -26,20 +77,192 @@ class DynamoDBService:
         """
         return self.main_table.put_item(Item=item)
     
-    def get_item(self, key):
+    def get_item(self, key, consistent_read=False):
         """
         Get an item from the main table.
         
         Args:
             key (dict): The key to get the item
+            consistent_read (bool): Use a strongly consistent read (optional)
             
         Returns:
             dict: The item from DynamoDB
         """
-        response = self.main_table.get_item(Key=key)
+        params = {'Key': key}
+        if consistent_read:
+            params['ConsistentRead'] = True
+        
+        response = self.main_table.get_item(**params)
         return response.get('Item')
     
-    def update_item(self, key, update_expression, expression_attribute_values, expression_attribute_names=None):
+    def batch_get_items(self, keys, projection_expression=None, expression_attribute_names=None):
+        """
+        Get many items from the main table with BatchGetItem.
+        Keys are de-duplicated and sent in chunks of 100; keys DynamoDB returns as
+        unprocessed are retried with exponential backoff.
+        
+        Args:
+            keys (list): The keys of the items to get
+            projection_expression (str): Attributes to return (optional)
+            expression_attribute_names (dict): Names for the projection (optional)
+            
+        Returns:
+            list: The items found (in no particular order, missing keys are skipped)
+        """
+        unique_keys = list({tuple(sorted(key.items())): key for key in keys}.values())
+        items = []
+        
+        for start in range(0, len(unique_keys), self.BATCH_GET_CHUNK_SIZE):
+            request = {'Keys': unique_keys[start:start + self.BATCH_GET_CHUNK_SIZE]}
+            
+            if projection_expression:
+                request['ProjectionExpression'] = projection_expression
+            
+            if expression_attribute_names:
+                request['ExpressionAttributeNames'] = expression_attribute_names
+            
+            items.extend(self._batch_get_chunk(request))
+        
+        return items
+    
+    def _batch_get_chunk(self, request):
+        """
+        Run one BatchGetItem request, retrying unprocessed keys with backoff.
+        
+        Args:
+            request (dict): The per-table request (Keys plus optional projection)
+            
+        Returns:
+            list: The items returned across all attempts
+        """
+        items = []
+        
+        for attempt in range(self.BATCH_GET_MAX_RETRIES + 1):
+            response = self.dynamodb.batch_get_item(RequestItems={self.main_table_name: request})
+            items.extend(response.get('Responses', {}).get(self.main_table_name, []))
+            
+            unprocessed = response.get('UnprocessedKeys', {}).get(self.main_table_name)
+            if not unprocessed or not unprocessed.get('Keys'):
+                return items
+            
+            if attempt == self.BATCH_GET_MAX_RETRIES:
+                logger.warning("BatchGetItem gave up on %d unprocessed keys", len(unprocessed['Keys']))
+                return items
+            
+            # Exponential backoff with jitter before asking for the leftovers again
+            time.sleep(self.BATCH_GET_BASE_DELAY_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5))
+            request = unprocessed
+        
+        return items
+    
+    def delete_item(self, key):
+        """
+        Delete an item from the main table.
+        
+        Args:
+            key (dict): The key of the item to delete
+            
+        Returns:
+            dict: The response from DynamoDB
+        """
+        return self.main_table.delete_item(Key=key)
+    
+    def batch_write_items(self, put_items=None, delete_keys=None):
+        """
+        Put and delete several items in the main table with BatchWriteItem.
+        The batch writer splits the requests into chunks of 25 and resends unprocessed ones.
+        
+        Args:
+            put_items (list): Items to put (optional)
+            delete_keys (list): Keys of items to delete (optional)
+        """
+        with self.main_table.batch_writer() as batch:
+            for item in put_items or []:
+                batch.put_item(Item=item)
+            
+            for key in delete_keys or []:
+                batch.delete_item(Key=key)
+    
+    def batch_delete_items(self, keys, max_workers=None):
+        """
+        Delete many items from the main table with parallel BatchWriteItem calls.
+        Keys are sent in chunks of 25 from a small thread pool (through the
+        thread-safe low-level client); unprocessed deletes are retried with
+        exponential backoff, so the call finishes in bounded time.
+        
+        Args:
+            keys (list): The keys of the items to delete
+            max_workers (int): Chunks in flight at once (default BATCH_WRITE_MAX_WORKERS)
+            
+        Returns:
+            dict: {'deleted': [keys], 'failed': [keys]} - every key lands in exactly one list
+        """
+        unique_keys = list({tuple(sorted(key.items())): key for key in keys}.values())
+        chunks = [
+            unique_keys[start:start + self.BATCH_WRITE_CHUNK_SIZE]
+            for start in range(0, len(unique_keys), self.BATCH_WRITE_CHUNK_SIZE)
+        ]
+        result = {'deleted': [], 'failed': []}
+        
+        if not chunks:
+            return result
+        
+        from concurrent.futures import ThreadPoolExecutor
+        
+        workers = min(max_workers or self.BATCH_WRITE_MAX_WORKERS, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for deleted, failed in executor.map(self._batch_delete_chunk, chunks):
+                result['deleted'].extend(deleted)
+                result['failed'].extend(failed)
+        
+        return result
+    
+    def _batch_delete_chunk(self, keys):
+        """
+        Delete up to 25 items, retrying unprocessed ones with backoff.
+        
+        Args:
+            keys (list): The keys to delete
+            
+        Returns:
+            tuple: (deleted keys, failed keys)
+        """
+        from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+        
+        serializer = TypeSerializer()
+        deserializer = TypeDeserializer()
+        client = self.dynamodb.meta.client
+        
+        pending = [
+            {'DeleteRequest': {'Key': {name: serializer.serialize(value) for name, value in key.items()}}}
+            for key in keys
+        ]
+        
+        for attempt in range(self.BATCH_WRITE_MAX_RETRIES + 1):
+            try:
+                response = client.batch_write_item(RequestItems={self.main_table_name: pending})
+            except Exception as e:
+                logger.error("BatchWriteItem failed for %d deletes: %s", len(pending), e)
+                break
+            
+            pending = response.get('UnprocessedItems', {}).get(self.main_table_name, [])
+            if not pending or attempt == self.BATCH_WRITE_MAX_RETRIES:
+                break
+            
+            # Exponential backoff with jitter before resending the leftovers
+            time.sleep(self.BATCH_WRITE_BASE_DELAY_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5))
+        
+        failed = [
+            {name: deserializer.deserialize(value) for name, value in request['DeleteRequest']['Key'].items()}
+            for request in pending
+        ]
+        failed_set = {tuple(sorted(key.items())) for key in failed}
+        deleted = [key for key in keys if tuple(sorted(key.items())) not in failed_set]
+        
+        return deleted, failed
+    
+    def update_item(self, key, update_expression, expression_attribute_values, expression_attribute_names=None,
+                    condition_expression=None):
         """
         Update an item in the main table.
         
@@ -48,9 +271,13 @@ class DynamoDBService:
             update_expression (str): The update expression
             expression_attribute_values (dict): Values for the expression
             expression_attribute_names (dict): Names for the expression (optional)
+            condition_expression (str): Condition the item must meet for the update to apply (optional)
             
         Returns:
             dict: The response from DynamoDB
+            
+        Raises:
+            ClientError: ConditionalCheckFailedException if the condition is not met
         """
         params = {
             'Key': key,
@@ -61,12 +288,16 @@ class DynamoDBService:
         
         if expression_attribute_names:
             params['ExpressionAttributeNames'] = expression_attribute_names
+        
+        if condition_expression:
+            params['ConditionExpression'] = condition_expression
             
         return self.main_table.update_item(**params)
     
     def query(self, key_condition_expression, expression_attribute_values=None, expression_attribute_names=None):
         """
         Query items from the main table.
+        Follows LastEvaluatedKey so results larger than one 1 MB page are complete.
         
         Args:
             key_condition_expression (str): The key condition expression
@@ -86,12 +317,13 @@ class DynamoDBService:
         if expression_attribute_names:
             query_params['ExpressionAttributeNames'] = expression_attribute_names
             
-        response = self.main_table.query(**query_params)
-        return response.get('Items', [])
+        return list(self.iter_query(query_params))
     
     def query_index(self, params):
         """
         Query items from a GSI.
+        Follows LastEvaluatedKey and returns every page, unless the caller set a
+        Limit, in which case only that single page is returned.
         
         Args:
             params (dict): Query parameters including IndexName and KeyConditionExpression
@@ -99,13 +331,16 @@ class DynamoDBService:
         Returns:
             dict: The response from DynamoDB including Items
         """
-        # Make sure we're using the main table
-        response = self.main_table.query(**params)
-        return response
+        if 'Limit' in params:
+            return self.main_table.query(**params)
+        
+        items = list(self.iter_query(params))
+        return {'Items': items, 'Count': len(items)}
         
     def scan(self, params):
         """
         Scan the main table with optional filters.
+        Follows LastEvaluatedKey so the whole table is covered, not just the first 1 MB.
         
         Args:
             params (dict): Scan parameters including FilterExpression and ExpressionAttributeValues
@@ -113,5 +348,86 @@ class DynamoDBService:
         Returns:
             list: The items from DynamoDB
         """
-        response = self.main_table.scan(**params)
-        return response.get('Items', [])
+        return list(self.iter_scan(params))
+    
+    def iter_query(self, params, page_size=None, projection=None, max_items=None):
+        """
+        Lazily query the main table (or a GSI via IndexName), one page at a time.
+        The next page is only requested once the caller has consumed the current one,
+        so breaking out of the loop stops further reads.
+        
+        Args:
+            params (dict): Query parameters including KeyConditionExpression
+            page_size (int): Items DynamoDB evaluates per request (optional)
+            projection (list): Attribute names to return (optional)
+            max_items (int): Stop after yielding this many items (optional)
+            
+        Yields:
+            dict: Items from DynamoDB
+        """
+        return self._iter_pages(self.main_table.query, params, page_size, projection, max_items)
+    
+    def iter_scan(self, params=None, page_size=None, projection=None, max_items=None):
+        """
+        Lazily scan the main table, one page at a time.
+        
+        Args:
+            params (dict): Scan parameters such as FilterExpression (optional)
+            page_size (int): Items DynamoDB evaluates per request (optional)
+            projection (list): Attribute names to return (optional)
+            max_items (int): Stop after yielding this many items (optional)
+            
+        Yields:
+            dict: Items from DynamoDB
+        """
+        return self._iter_pages(self.main_table.scan, params or {}, page_size, projection, max_items)
+    
+    def _iter_pages(self, operation, params, page_size, projection, max_items):
+        """
+        Drive a query/scan operation across pages.
+        
+        Args:
+            operation (callable): Table.query or Table.scan
+            params (dict): Parameters for the operation (not modified)
+            page_size (int): Limit per request
+            projection (list): Attribute names to return
+            max_items (int): Item budget
+            
+        Yields:
+            dict: Items from DynamoDB
+        """
+        request = dict(params)
+        
+        if projection:
+            # Placeholders so reserved words like name / status / ttl can be projected
+            names = dict(request.get('ExpressionAttributeNames', {}))
+            placeholders = []
+            for index, attribute in enumerate(projection):
+                placeholder = f"#p{index}"
+                names[placeholder] = attribute
+                placeholders.append(placeholder)
+            request['ProjectionExpression'] = ', '.join(placeholders)
+            request['ExpressionAttributeNames'] = names
+        
+        if page_size:
+            request['Limit'] = page_size
+        
+        yielded = 0
+        while max_items is None or yielded < max_items:
+            # Without a filter every evaluated item is returned, so don't read past the budget
+            if max_items is not None and 'FilterExpression' not in request:
+                remaining = max_items - yielded
+                request['Limit'] = min(page_size, remaining) if page_size else remaining
+            
+            response = operation(**request)
+            
+            for item in response.get('Items', []):
+                yield item
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+            
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            request['ExclusiveStartKey'] = last_key
@@ -0,0 +1,196 @@
+import os
+import time
+import threading
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Version stamp of the application catalog, bump it whenever an application item changes:
+# aws dynamodb update-item --table-name <main table> --key '{"PK":{"S":"catalog-version"},"SK":{"S":"version"}}'
+#     --update-expression "ADD version :one" --expression-attribute-values '{":one":{"N":"1"}}'
+# Kept outside the application- key prefix, so no application id can collide with it
+VERSION_KEY = {"PK": "catalog-version", "SK": "version"}
+APPLICATION_PREFIX = "application-"
+
+class ApplicationCatalog:
+    """
+    Read-through, process wide cache of application items.
+    Applications almost never change, so a warm container answers lookups from
+    memory. Once every ttl_seconds the catalog version item is read (one GetItem,
+    or folded into the read of applications that aren't cached yet), and every
+    cached application is dropped when its version has moved.
+    Channels are indexed as (application_id, channel_id) -> return_url, so
+    validating a channel is a dict lookup. Unknown applications are not cached.
+    Items are shared between callers, treat them as read-only.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, dynamodb_service):
+        """
+        Get the catalog for a DynamoDB service's main table (created on first use).
+
+        Args:
+            dynamodb_service: An instance of DynamoDBService
+
+        Returns:
+            ApplicationCatalog: The shared catalog
+        """
+        with cls._instances_lock:
+            catalog = cls._instances.get(dynamodb_service.main_table_name)
+            if catalog is None:
+                catalog = cls(dynamodb_service)
+                cls._instances[dynamodb_service.main_table_name] = catalog
+            return catalog
+
+    def __init__(self, dynamodb_service, ttl_seconds=None):
+        """
+        Set up an empty catalog.
+
+        Args:
+            dynamodb_service: An instance of DynamoDBService
+            ttl_seconds (float): How long cached applications are served before the
+                version is checked again (env APPLICATION_CATALOG_TTL_SECONDS, default 60)
+        """
+        self.dynamodb_service = dynamodb_service
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.environ.get('APPLICATION_CATALOG_TTL_SECONDS', 60)
+        )
+        self.version = None
+        self.checked_at = None
+        self._applications = {}
+        self._return_urls = {}
+        self._lock = threading.Lock()
+
+    def get_application(self, application_id):
+        """
+        Get an application by ID.
+
+        Args:
+            application_id (str): The application ID
+
+        Returns:
+            dict: The application item, None if it doesn't exist
+        """
+        return self.get_applications([application_id]).get(application_id)
+
+    def get_applications(self, application_ids):
+        """
+        Get several applications by ID. Cached ones cost nothing; the rest (plus the
+        version stamp, when it is due) are read with a single request.
+
+        Args:
+            application_ids (list): The application IDs
+
+        Returns:
+            dict: Application items keyed by application ID (unknown IDs are left out)
+        """
+        requested = list(dict.fromkeys(application_ids))
+        revalidate = self._revalidation_due()
+        missing = [application_id for application_id in requested if application_id not in self._applications]
+
+        if not revalidate and not missing:
+            return {application_id: self._applications[application_id] for application_id in requested}
+
+        keys = [{"PK": f"{APPLICATION_PREFIX}{application_id}", "SK": "application"} for application_id in missing]
+        if revalidate:
+            keys.append(VERSION_KEY)
+
+        if len(keys) == 1:
+            item = self.dynamodb_service.get_item(keys[0])
+            items = [item] if item else []
+        else:
+            items = self.dynamodb_service.batch_get_items(keys)
+
+        version_item = next((item for item in items if item['PK'] == VERSION_KEY['PK']), None)
+        applications = {
+            item['PK'][len(APPLICATION_PREFIX):]: item
+            for item in items if item['PK'].startswith(APPLICATION_PREFIX)
+        }
+
+        with self._lock:
+            changed = revalidate and self._apply_version(version_item)
+            for application in applications.values():
+                self._store(application)
+
+        # entries served from before a version change are gone, read them again (once)
+        if changed and any(application_id not in applications for application_id in requested if application_id not in missing):
+            return self.get_applications(requested)
+
+        found = {application_id: self._applications.get(application_id) for application_id in requested}
+        found.update(applications)
+        return {application_id: item for application_id, item in found.items() if item is not None}
+
+    def validate_app_channel(self, application_id, channel_id):
+        """
+        Validate if an application and channel combination exists.
+
+        Args:
+            application_id (str): The application ID
+            channel_id (str): The channel ID
+
+        Returns:
+            tuple: (bool, str) - (is_valid, return_url)
+        """
+        application = self.get_application(application_id)
+        if not application:
+            return False, None
+
+        key = (application_id, channel_id)
+        if key in self._return_urls:
+            return True, self._return_urls[key]
+
+        # the index can be cleared by a version change in another thread, fall back to the item
+        for channel in application.get('channels', []):
+            if channel.get('channel_id') == channel_id:
+                return True, channel.get('return_url')
+
+        return False, None
+
+    def preload(self, application_ids=()):
+        """
+        Check the version and load applications ahead of the first request (container priming).
+
+        Args:
+            application_ids (list): Applications to load (optional)
+
+        Returns:
+            int: Number of applications cached
+        """
+        self.checked_at = None
+        self.get_applications(list(application_ids))
+        return len(self._applications)
+
+    def _revalidation_due(self):
+        """True when the version hasn't been checked within ttl_seconds"""
+        return self.checked_at is None or time.monotonic() - self.checked_at >= self.ttl_seconds
+
+    def _apply_version(self, version_item):
+        """
+        Record a freshly read version stamp, dropping every cached application if it moved
+        (caller holds the lock).
+
+        Returns:
+            bool: True if cached applications were dropped
+        """
+        version = version_item.get('version') if version_item else None
+        changed = version != self.version and bool(self._applications)
+        if changed:
+            logger.info("application catalog version %s -> %s, dropping %d cached applications",
+                        self.version, version, len(self._applications))
+            self._applications = {}
+            self._return_urls = {}
+
+        self.version = version
+        self.checked_at = time.monotonic()
+        return changed
+
+    def _store(self, application):
+        """Cache an application item and index its channels (caller holds the lock)"""
+        application_id = application['PK'][len(APPLICATION_PREFIX):]
+        self._applications[application_id] = application
+        for channel in application.get('channels', []):
+            if channel.get('channel_id'):
+                self._return_urls[(application_id, channel['channel_id'])] = channel.get('return_url')
@@ -1,4 +1,8 @@
 from datetime import datetime
+from services.repositories.application_catalog import ApplicationCatalog
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class ApplicationRepository:
     """
@@ -14,10 +18,21 @@ class ApplicationRepository:
             dynamodb_service: An instance of DynamoDBService
         """
         self.dynamodb_service = dynamodb_service
+        self._user_repository = None
+        # Application items and channels, cached for the whole container
+        self.catalog = ApplicationCatalog.shared(dynamodb_service)
+    
+    @property
+    def user_repository(self):
+        """UserRepository on the same DynamoDB service (built on first use, then reused)"""
+        if self._user_repository is None:
+            from services.repositories.user_repository import UserRepository
+            self._user_repository = UserRepository(self.dynamodb_service)
+        return self._user_repository
     
     def get_application(self, application_id):
         """
-        Get an application by ID.
+        Get an application by ID (served from the application catalog cache).
         
         Args:
             application_id (str): The application ID
@@ -25,17 +40,33 @@ class ApplicationRepository:
         Returns:
             dict: The application item
         """
-        key = {
-            "PK": f"application-{application_id}",
-            "SK": "application"
-        }
-        return self.dynamodb_service.get_item(key)
+        return self.catalog.get_application(application_id)
+    
+    def get_applications(self, application_ids):
+        """
+        Get several applications by ID. Cached ones cost no read, the rest are
+        fetched with a single batched read.
+        
+        Args:
+            application_ids (list): The application IDs
+            
+        Returns:
+            dict: Application items keyed by application ID (unknown IDs are left out)
+        """
+        if not application_ids:
+            return {}
+        
+        return self.catalog.get_applications(application_ids)
     
     def create_app_user_relationship(self, application_id, user_id):
         """
         Create an application-user relationship record in DynamoDB.
         This authorizes a user for an application.
         
+        Two items are written: PK = application-{app_id}, SK = user_id for
+        "is this user authorized for this app" lookups, and the mirrored
+        PK = user_id, SK = application-{app_id} so a user's apps are a single Query.
+        
         Args:
             application_id (str): The application ID
             user_id (str): The user ID
@@ -55,11 +86,30 @@ class ApplicationRepository:
             "created_at": timestamp
         }
         
-        # Save to DynamoDB
-        self.dynamodb_service.put_item(app_user_item)
+        # Save both directions to DynamoDB
+        self.dynamodb_service.batch_write_items(
+            put_items=[app_user_item, self._user_app_item(app_user_item)]
+        )
         
         return app_user_item
     
+    @staticmethod
+    def _user_app_item(app_user_item):
+        """
+        Build the mirrored user -> application item for a relationship record.
+        
+        Args:
+            app_user_item (dict): The PK = application-{app_id}, SK = user_id item
+            
+        Returns:
+            dict: The PK = user_id, SK = application-{app_id} item
+        """
+        return {
+            **app_user_item,
+            "PK": app_user_item["user_id"],
+            "SK": f"application-{app_user_item['application_id']}"
+        }
+    
     def check_app_user_authorization(self, application_id, user_id):
         """
         Check if a user is authorized for an application.
@@ -81,6 +131,8 @@ class ApplicationRepository:
     def validate_app_channel(self, application_id, channel_id):
         """
         Validate if an application and channel combination exists.
+        Looked up in the catalog's (application_id, channel_id) -> return_url index,
+        so a warm container answers without reading DynamoDB.
         
         Args:
             application_id (str): The application ID
@@ -89,24 +141,12 @@ class ApplicationRepository:
         Returns:
             tuple: (bool, str) - (is_valid, return_url)
         """
-        # Get the application
-        application = self.get_application(application_id)
-        
-        if not application:
-            return False, None
-        
-        # Check if the channel exists
-        channels = application.get('channels', [])
-        for channel in channels:
-            if channel.get('channel_id') == channel_id:
-                return True, channel.get('return_url')
-        
-        return False, None
+        return self.catalog.validate_app_channel(application_id, channel_id)
     
     def find_user_by_sub(self, cognito_sub):
         """
         Find a user by their Cognito sub.
-        First tries direct lookup by sub, then falls back to email lookup if available.
+        First tries the GSI3 sub lookup, then falls back to email lookup if available.
         
         Args:
             cognito_sub (str): The Cognito sub
@@ -114,57 +154,46 @@ class ApplicationRepository:
         Returns:
             dict: The user item if found, None otherwise
         """
-        from services.repositories.user_repository import UserRepository
-        
         try:
-            # First attempt: direct lookup by sub (still using scan as there's no GSI for sub)
-            import boto3
-            from boto3.dynamodb.conditions import Key, Attr
-            
-            # Scan for user records with matching sub
-            response = self.dynamodb_service.dynamodb.Table(self.dynamodb_service.main_table_name).scan(
-                FilterExpression=Attr('SK').eq("user") & Attr('sub').eq(cognito_sub),
-                Limit=1  # We only need one match
-            )
+            user_repo = self.user_repository
             
-            items = response.get('Items', [])
-            if items:
-                print(f"Found user directly by sub: {cognito_sub}")
-                return items[0]
+            # First attempt: direct lookup by sub using GSI3
+            user_item = user_repo.get_user_by_sub(cognito_sub)
+            if user_item:
+                logger.debug("Found user directly by sub %s", cognito_sub)
+                return user_item
             
             # Second attempt: If user not found by sub, try to get their email from Cognito
             # and use the GSI to find them by email
             try:
-                from services.aws.cognito_user_service import CognitoUserService
-                cognito_service = CognitoUserService()
+                from services import registry
+                cognito_service = registry.cognito_user_service()
                 
                 # Get user attributes from Cognito using the sub
                 user_attributes = cognito_service.get_user_by_sub(cognito_sub)
                 if user_attributes and 'email' in user_attributes:
                     email = user_attributes['email']
-                    print(f"Looking for user by email: {email} using GSI")
+                    logger.debug("Looking for user by email using GSI1", cognito_sub=cognito_sub)
                     
                     # Use UserRepository to find by email using GSI1
-                    user_repo = UserRepository(self.dynamodb_service)
                     user_item = user_repo.find_user_by_email(email)
                     
                     if user_item:
-                        print(f"Found user by email GSI: {email}")
+                        logger.debug("Found user by email GSI", cognito_sub=cognito_sub)
                         # Update the user's sub to match the new one
                         user_item['sub'] = cognito_sub
                         
-                        # Save the updated user item
-                        self.dynamodb_service.put_item(user_item)
-                        return user_item
+                        # Save the updated user item (re-links the GSI3 sub lookup)
+                        return user_repo.update_user(user_item)
                     else:
-                        print(f"No user found with email: {email}")
+                        logger.info("No user found for the email of sub %s", cognito_sub)
             except Exception as email_error:
-                print(f"Error finding user by email: {str(email_error)}")
+                logger.warning("Error finding user by email: %s", email_error)
             
             return None
             
         except Exception as e:
-            print(f"Error finding user by sub: {str(e)}")
+            logger.error("Error finding user by sub: %s", e)
             return None
     
     def get_user_authorization(self, application_id, user_id):
@@ -262,7 +291,8 @@ class ApplicationRepository:
     def get_user_authorizations(self, user_id):
         """
         Get all applications that a user has authorized.
-        Uses the simple jambyref schema where PK = application-{app_id} and SK = user_id
+        Queries the mirrored PK = user_id, SK = application-{app_id} items
+        written by create_app_user_relationship.
         
         Args:
             user_id (str): The user ID
@@ -270,22 +300,25 @@ class ApplicationRepository:
         Returns:
             list: List of authorized applications with details
         """
-        import boto3
-        from boto3.dynamodb.conditions import Key, Attr
-        
         try:
-            # Query for all items where SK = user_id and PK starts with "application-"
-            response = self.dynamodb_service.dynamodb.Table(self.dynamodb_service.main_table_name).scan(
-                FilterExpression=Attr('SK').eq(user_id) & Attr('PK').begins_with('application-')
+            relationships = self.dynamodb_service.query(
+                key_condition_expression="PK = :user_id AND begins_with(SK, :prefix)",
+                expression_attribute_values={
+                    ":user_id": user_id,
+                    ":prefix": "application-"
+                }
+            )
+            
+            # Load every authorized application in one batched read instead of a GetItem each
+            applications = self.get_applications(
+                [item['SK'].replace('application-', '') for item in relationships]
             )
             
             authorizations = []
-            for item in response.get('Items', []):
-                # Extract application_id from PK
-                app_id = item['PK'].replace('application-', '')
-                
-                # Get application details
-                application = self.get_application(app_id)
+            for item in relationships:
+                # Extract application_id from SK
+                app_id = item['SK'].replace('application-', '')
+                application = applications.get(app_id)
                 
                 authorization_info = {
                     "application_id": app_id,
@@ -300,28 +333,28 @@ class ApplicationRepository:
             return authorizations
             
         except Exception as e:
-            print(f"Error getting user authorizations: {str(e)}")
+            logger.error("Error getting user authorizations: %s", e)
             return []
     
     def revoke_app_user_authorization(self, application_id, user_id):
         """
         Revoke user authorization for an application using the simple jambyref schema.
-        Simply deletes the application-user relationship record.
+        Simply deletes the application-user relationship record and its mirror.
         
         Args:
             application_id (str): The application ID
             user_id (str): The user ID
         """
         try:
-            key = {
-                "PK": f"application-{application_id}",
-                "SK": user_id
-            }
+            keys = [
+                {"PK": f"application-{application_id}", "SK": user_id},
+                {"PK": user_id, "SK": f"application-{application_id}"}
+            ]
             
-            # Delete the authorization record
-            self.dynamodb_service.dynamodb.Table(self.dynamodb_service.main_table_name).delete_item(Key=key)
-            print(f"Revoked authorization for user {user_id} and application {application_id}")
+            # Delete the authorization record and its user -> application mirror
+            self.dynamodb_service.batch_write_items(delete_keys=keys)
+            logger.info("Revoked authorization for user %s and application %s", user_id, application_id)
             
         except Exception as e:
-            print(f"Error revoking authorization: {str(e)}")
+            logger.error("Error revoking authorization: %s", e)
             raise
\ No newline at end of file
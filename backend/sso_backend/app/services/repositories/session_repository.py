@@ -1,5 +1,9 @@
 import uuid
+import time
 from datetime import datetime, timedelta
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class SessionRepository:
     """
@@ -7,6 +11,27 @@ class SessionRepository:
     sessions store cognito tokens so client apps can get them later
     """
     
+    # numeric epoch-seconds copy of expires_at, dynamodb's ttl deletes the item once it passes
+    # (enable it once per table: scripts/backfill_session_ttl.py --enable-ttl)
+    TTL_ATTRIBUTE = "ttl"
+    
+    # what the sessions page needs - the listing never reads the (multi-kb) tokens,
+    # those are only returned by get_session
+    SESSION_METADATA_ATTRIBUTES = [
+        "PK", "SK", "user_id", "application_id", "token_type", "expires_in",
+        "expires_at", TTL_ATTRIBUTE, "created_at", "updated_at", "device_info", "user_agent"
+    ]
+    # just enough to pick the sessions to revoke
+    SESSION_KEY_ATTRIBUTES = ["PK", "SK", "expires_at", TTL_ATTRIBUTE]
+    
+    # how long one caller may hold the token refresh for a session before others can take over
+    REFRESH_LEASE_SECONDS = 15
+    
+    # sessions are also indexed on GSI2 by when their tokens expire, in buckets of this many
+    # minutes, so the background refresher can find the ones about to expire
+    EXPIRY_BUCKET_MINUTES = 5
+    EXPIRY_BUCKET_PREFIX = "session-expiry#"
+    
     def __init__(self, dynamodb_service):
         """initialize with dynamodb service"""
         self.dynamodb_service = dynamodb_service
@@ -44,13 +69,16 @@ class SessionRepository:
             "token_type": cognito_tokens.get('token_type', 'Bearer'),
             "expires_in": cognito_tokens.get('expires_in'),
             "expires_at": expires_at,
+            self.TTL_ATTRIBUTE: self.to_epoch(expires_at),
             "created_at": timestamp,
             # GSI3 for session lookups
             "GSI3-PK": f"session-{session_id}",
             "GSI3-SK": "session",
             # GSI1 for user sessions lookups
             "GSI1-PK": f"user-{user_id}",
-            "GSI1-SK": f"session#{timestamp}"
+            "GSI1-SK": f"session#{timestamp}",
+            # GSI2 for finding sessions by expiry
+            **self.expiry_index_keys(expires_at)
         }
         
         # Add device info if provided
@@ -67,19 +95,20 @@ class SessionRepository:
             session_item["device_info"] = safe_device_info
             
             # Log device info for debugging (without sensitive data)
-            print(f"Storing device info for session {session_id}: {safe_device_info}")
+            logger.debug("Storing device info for session %s", session_id, device_info=safe_device_info)
         
         # save to dynamodb
         self.dynamodb_service.put_item(session_item)
         
         return session_id
     
-    def get_session(self, session_id):
+    def get_session(self, session_id, consistent_read=False):
         """
         get session data by session_id
         
         args:
             session_id (str): the session id
+            consistent_read (bool): read the latest write (used while waiting on another caller's refresh)
             
         returns:
             dict: session data with tokens, or none if not found/expired
@@ -89,21 +118,92 @@ class SessionRepository:
             "SK": "session"
         }
         
-        session = self.dynamodb_service.get_item(key)
+        session = self.dynamodb_service.get_item(key, consistent_read=consistent_read)
         
         if not session:
             return None
             
-        # check if session is expired
-        expires_at = session.get('expires_at')
-        if expires_at:
-            expiry_time = datetime.fromisoformat(expires_at)
-            if datetime.now() > expiry_time:
-                print(f"session {session_id} is expired")
-                return None
+        # dynamodb ttl deletes lazily (can take a while), so expired items may still be returned
+        if self.is_expired(session):
+            logger.debug("session %s is expired", session_id)
+            return None
         
         return session
     
+    @staticmethod
+    def to_epoch(expires_at):
+        """
+        convert an iso expires_at string to the epoch seconds stored in the ttl attribute
+        
+        args:
+            expires_at (str): iso timestamp (naive, same clock as datetime.now())
+            
+        returns:
+            int: epoch seconds
+        """
+        return int(datetime.fromisoformat(expires_at).timestamp())
+    
+    @classmethod
+    def expiry_bucket(cls, expires_at):
+        """
+        GSI2 partition key for the bucket an expiry time falls in
+        
+        args:
+            expires_at (datetime|str): the expiry time
+            
+        returns:
+            str: e.g. session-expiry#2025-01-01T10:05
+        """
+        if isinstance(expires_at, str):
+            expires_at = datetime.fromisoformat(expires_at)
+        
+        minute = expires_at.minute - expires_at.minute % cls.EXPIRY_BUCKET_MINUTES
+        return f"{cls.EXPIRY_BUCKET_PREFIX}{expires_at.replace(minute=minute).strftime('%Y-%m-%dT%H:%M')}"
+    
+    @classmethod
+    def expiry_index_keys(cls, expires_at):
+        """
+        GSI2 attributes that index a session by expiry
+        
+        args:
+            expires_at (str): iso expiry timestamp
+            
+        returns:
+            dict: GSI2-PK (expiry bucket) and GSI2-SK (the exact expiry)
+        """
+        return {
+            "GSI2-PK": cls.expiry_bucket(expires_at),
+            "GSI2-SK": expires_at
+        }
+    
+    def is_expired(self, session, now=None):
+        """
+        check a session's expiry using the numeric ttl
+        falls back to parsing expires_at for sessions written before the ttl existed
+        
+        args:
+            session (dict): the session item
+            now (float): epoch seconds to compare against (default: current time)
+            
+        returns:
+            bool: true if the session is expired
+        """
+        now = time.time() if now is None else now
+        
+        ttl = session.get(self.TTL_ATTRIBUTE)
+        if ttl is not None:
+            return int(ttl) <= now
+        
+        expires_at = session.get('expires_at')
+        if not expires_at:
+            return False
+        
+        try:
+            return self.to_epoch(expires_at) <= now
+        except ValueError:
+            # invalid date format, consider expired
+            return True
+    
     def delete_session(self, session_id):
         """
         delete a session (for logout)
@@ -117,30 +217,31 @@ class SessionRepository:
                 "SK": "session"
             }
             
-            # Use the main_table_name from dynamodb_service instead of self.table_name
-            self.dynamodb_service.dynamodb.Table(self.dynamodb_service.main_table_name).delete_item(Key=key)
+            self.dynamodb_service.delete_item(key)
             return True
         except Exception as e:
-            print(f"Error deleting session {session_id}: {str(e)}")
+            logger.error("Error deleting session %s: %s", session_id, e)
             return False
         
-    def update_session_tokens(self, session_id, tokens, expires_at=None):
+    def update_session_tokens(self, session_id, tokens, expires_at=None, lease_owner=None):
         """
         update tokens for an existing session
+        every update bumps token_version, so callers waiting on a refresh can tell it landed
         
         args:
             session_id (str): the session id
             tokens (dict): new tokens from cognito
             expires_at (str): optional new expiration timestamp
+            lease_owner (str): refresh lease from acquire_refresh_lease - the write only applies
+                while that lease is still held, and releases it
         
         returns:
             bool: success status
         """
-        from datetime import datetime
-        
         # Prepare update expression and attributes
         update_expression = "SET "
         expression_attribute_values = {}
+        expression_attribute_names = {}
         expression_parts = []
         
         # Add token fields to update
@@ -156,117 +257,268 @@ class SessionRepository:
             expression_parts.append("refresh_token = :refresh_token")
             expression_attribute_values[":refresh_token"] = tokens.get('refresh_token')
         
-        # Add expires_at if provided
+        if tokens.get('expires_in'):
+            expression_parts.append("expires_in = :expires_in")
+            expression_attribute_values[":expires_in"] = tokens.get('expires_in')
+        
+        # Add expires_at if provided (and move the ttl along with it)
         if expires_at:
             expression_parts.append("expires_at = :expires_at")
             expression_attribute_values[":expires_at"] = expires_at
+            expression_parts.append("#ttl = :ttl")
+            expression_attribute_values[":ttl"] = self.to_epoch(expires_at)
+            expression_attribute_names["#ttl"] = self.TTL_ATTRIBUTE
+            # move the session to its new expiry bucket
+            for index, (name, value) in enumerate(self.expiry_index_keys(expires_at).items()):
+                expression_parts.append(f"#gsi2_{index} = :gsi2_{index}")
+                expression_attribute_names[f"#gsi2_{index}"] = name
+                expression_attribute_values[f":gsi2_{index}"] = value
         
-        # Add updated_at timestamp
+        # Add updated_at timestamp and move the version on
         expression_parts.append("updated_at = :updated_at")
         expression_attribute_values[":updated_at"] = datetime.now().isoformat()
+        expression_parts.append("token_version = if_not_exists(token_version, :zero) + :one")
+        expression_attribute_values[":zero"] = 0
+        expression_attribute_values[":one"] = 1
         
         # Build the final update expression
         update_expression += ", ".join(expression_parts)
         
+        # never recreate a session that was revoked in the meantime
+        condition_expression = "attribute_exists(PK)"
+        if lease_owner:
+            update_expression += " REMOVE refresh_lease_until, refresh_lease_owner"
+            condition_expression += " AND refresh_lease_owner = :lease_owner"
+            expression_attribute_values[":lease_owner"] = lease_owner
+        
         try:
             # Update the session in DynamoDB
             self.dynamodb_service.update_item(
                 key={"PK": session_id, "SK": "session"},
                 update_expression=update_expression,
-                expression_attribute_values=expression_attribute_values
+                expression_attribute_values=expression_attribute_values,
+                expression_attribute_names=expression_attribute_names or None,
+                condition_expression=condition_expression
             )
             return True
         except Exception as e:
-            print(f"Error updating session tokens: {str(e)}")
+            logger.error("Error updating session tokens: %s", e)
             return False
     
-    def get_user_sessions(self, user_id, include_expired=False):
+    def acquire_refresh_lease(self, session_id, token_version=0):
         """
-        get all sessions for a specific user using GSI1
+        try to become the one caller that refreshes this session's tokens
+        conditional write: succeeds only if the tokens are still at token_version
+        (nobody refreshed them since we read the session) and no other lease is live
         
         args:
-            user_id (str): the user id
-            include_expired (bool): whether to include expired sessions
+            session_id (str): the session id
+            token_version (int): token_version of the session as read by the caller
             
         returns:
-            dict: {'active': [...], 'expired': [...]}
+            str: lease owner id to pass to update_session_tokens, or none if another caller holds it
         """
-        from boto3.dynamodb.conditions import Key
+        from botocore.exceptions import ClientError
+        
+        now = int(time.time())
+        lease_owner = uuid.uuid4().hex
         
         try:
-            # Use GSI1 to query all sessions for this user
-            key_condition = Key('GSI1-PK').eq(f"user-{user_id}")
-            
-            # Query the GSI
-            response = self.dynamodb_service.query_index({
-                'IndexName': 'GSI1',
-                'KeyConditionExpression': key_condition,
-                'FilterExpression': Key('SK').eq('session')
-            })
-            
-            sessions = response.get('Items', [])
-            active_sessions = []
-            expired_sessions = []
-            
-            current_time = datetime.now()
-            
-            for session in sessions:
-                # check if session is expired
-                expires_at = session.get('expires_at')
-                is_expired = False
-                
-                if expires_at:
-                    try:
-                        expiry_time = datetime.fromisoformat(expires_at)
-                        is_expired = current_time > expiry_time
-                    except ValueError:
-                        # invalid date format, consider expired
-                        is_expired = True
-                
-                # categorize session
-                if is_expired:
-                    if include_expired:
-                        expired_sessions.append(session)
-                else:
-                    active_sessions.append(session)
+            self.dynamodb_service.update_item(
+                key={"PK": session_id, "SK": "session"},
+                update_expression="SET refresh_lease_until = :until, refresh_lease_owner = :owner",
+                expression_attribute_values={
+                    ":until": now + self.REFRESH_LEASE_SECONDS,
+                    ":owner": lease_owner,
+                    ":now": now,
+                    ":version": int(token_version)
+                },
+                condition_expression=(
+                    "attribute_exists(PK)"
+                    " AND (attribute_not_exists(token_version) OR token_version = :version)"
+                    " AND (attribute_not_exists(refresh_lease_until) OR refresh_lease_until < :now)"
+                )
+            )
+            return lease_owner
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return None
+            raise
+    
+    def release_refresh_lease(self, session_id, lease_owner):
+        """
+        give up a refresh lease without new tokens (refresh failed), so the next caller can retry
+        
+        args:
+            session_id (str): the session id
+            lease_owner (str): lease owner id from acquire_refresh_lease
             
-            return {
-                'active': active_sessions,
-                'expired': expired_sessions
-            }
+        returns:
+            bool: true if the lease was still ours and is now released
+        """
+        try:
+            self.dynamodb_service.update_item(
+                key={"PK": session_id, "SK": "session"},
+                update_expression="REMOVE refresh_lease_until, refresh_lease_owner",
+                expression_attribute_values={":owner": lease_owner},
+                condition_expression="refresh_lease_owner = :owner"
+            )
+            return True
+        except Exception as e:
+            logger.warning("Error releasing refresh lease for %s: %s", session_id, e)
+            return False
+    
+    def get_user_sessions(self, user_id, include_expired=False, attributes=None):
+        """
+        get all sessions for a specific user using GSI1
+        only the metadata attributes are read back (ProjectionExpression), never the tokens
+        
+        args:
+            user_id (str): the user id
+            include_expired (bool): whether to include expired sessions
+            attributes (list): attributes to return (default: SESSION_METADATA_ATTRIBUTES)
             
+        returns:
+            dict: {'active': [...], 'expired': [...]}, both empty if the query failed
+        """
+        try:
+            return self._query_user_sessions(user_id, include_expired, attributes)
         except Exception as e:
-            print(f"error getting user sessions: {str(e)}")
+            logger.error("error getting user sessions: %s", e)
             return {'active': [], 'expired': []}
     
+    def _query_user_sessions(self, user_id, include_expired=False, attributes=None):
+        """
+        get_user_sessions without the error handling - query errors (throttling etc.) propagate,
+        for callers that must not mistake a failed listing for a user with no sessions
+        """
+        from boto3.dynamodb.conditions import Key, Attr
+        
+        now = int(time.time())
+        
+        # Use GSI1 to query all sessions for this user (session sort keys only)
+        key_condition = Key('GSI1-PK').eq(f"user-{user_id}") & Key('GSI1-SK').begins_with('session#')
+        filter_expression = Attr('SK').eq('session')
+        
+        # let dynamodb drop expired rows server side unless the caller wants them
+        if not include_expired:
+            filter_expression = filter_expression & (
+                Attr(self.TTL_ATTRIBUTE).not_exists() | Attr(self.TTL_ATTRIBUTE).gt(now)
+            )
+        
+        # Query the GSI (the filter still sees the full item, only the response is slimmed)
+        sessions = self.dynamodb_service.iter_query({
+            'IndexName': 'GSI1',
+            'KeyConditionExpression': key_condition,
+            'FilterExpression': filter_expression
+        }, projection=attributes or self.SESSION_METADATA_ATTRIBUTES)
+        
+        active_sessions = []
+        expired_sessions = []
+        
+        for session in sessions:
+            # sessions without a ttl yet (pre-backfill) still need the expires_at check
+            if self.is_expired(session, now):
+                if include_expired:
+                    expired_sessions.append(session)
+            else:
+                active_sessions.append(session)
+        
+        return {
+            'active': active_sessions,
+            'expired': expired_sessions
+        }
+    
+    def iter_sessions_expiring_between(self, start, end, attributes=None):
+        """
+        yield sessions whose tokens expire between start and end, one GSI2 expiry bucket at a time
+        only the keys come from GSI2 (so it works with any projection type, KEYS_ONLY included),
+        the sessions themselves are read from the table with BatchGetItem, up to 100 per request
+        
+        args:
+            start (datetime): earliest expiry (naive, same clock as datetime.now())
+            end (datetime): latest expiry
+            attributes (list): attributes to return (default: everything the refresher needs)
+            
+        yields:
+            dict: session items, in expiry order (sessions deleted since the query are skipped)
+        """
+        attributes = attributes or [
+            "PK", "SK", "user_id", "created_at", "expires_at", "refresh_token", "token_version"
+        ]
+        keys = []
+        
+        for key in self._iter_expiring_session_keys(start, end):
+            keys.append(key)
+            if len(keys) == self.dynamodb_service.BATCH_GET_CHUNK_SIZE:
+                yield from self._get_sessions_in_order(keys, attributes)
+                keys = []
+        
+        if keys:
+            yield from self._get_sessions_in_order(keys, attributes)
+    
+    def _iter_expiring_session_keys(self, start, end):
+        """table keys of the sessions expiring between start and end, from GSI2, in expiry order"""
+        from boto3.dynamodb.conditions import Key, Attr
+        
+        bucket_start = datetime.fromisoformat(self.expiry_bucket(start)[len(self.EXPIRY_BUCKET_PREFIX):])
+        
+        while bucket_start < end:
+            yield from self.dynamodb_service.iter_query({
+                'IndexName': 'GSI2',
+                'KeyConditionExpression': Key('GSI2-PK').eq(self.expiry_bucket(bucket_start)) &
+                                          Key('GSI2-SK').between(start.isoformat(), end.isoformat()),
+                'FilterExpression': Attr('SK').eq('session')
+            }, projection=["PK", "SK"])
+            bucket_start += timedelta(minutes=self.EXPIRY_BUCKET_MINUTES)
+    
+    def _get_sessions_in_order(self, keys, attributes):
+        """read sessions by key with one BatchGetItem, returned in the order of keys (missing ones skipped)"""
+        names = {f"#p{index}": attribute for index, attribute in enumerate(attributes)}
+        sessions = {
+            session['PK']: session
+            for session in self.dynamodb_service.batch_get_items(
+                keys, projection_expression=', '.join(names), expression_attribute_names=names
+            )
+        }
+        return [sessions[key['PK']] for key in keys if key['PK'] in sessions]
+    
     def revoke_all_user_sessions(self, user_id, except_session_id=None):
         """
         revoke all sessions for a user (useful for security)
+        deletes go out as parallel chunked BatchWriteItem calls, so even users
+        with hundreds of sessions are logged out well inside the lambda timeout
         
         args:
             user_id (str): the user id
             except_session_id (str): session to keep active (current session)
             
         returns:
-            int: number of sessions revoked
+            dict: {'revoked_count': int, 'failed_count': int, 'failed_session_ids': [...]}
+            
+        raises:
+            Exception: if the user's sessions couldn't be listed (nothing was revoked)
         """
-        sessions_data = self.get_user_sessions(user_id, include_expired=False)
-        active_sessions = sessions_data['active']
+        # a failed listing must not look like "0 sessions revoked"
+        sessions_data = self._query_user_sessions(user_id, include_expired=False, attributes=self.SESSION_KEY_ATTRIBUTES)
         
-        revoked_count = 0
+        # skip the current session if specified
+        session_ids = [
+            session['PK'] for session in sessions_data['active']
+            if not (except_session_id and session['PK'] == except_session_id)
+        ]
         
-        for session in active_sessions:
-            session_id = session['PK']
-            
-            # skip the current session if specified
-            if except_session_id and session_id == except_session_id:
-                continue
-            
-            try:
-                self.delete_session(session_id)
-                revoked_count += 1
-                print(f"revoked session: {session_id}")
-            except Exception as e:
-                print(f"failed to revoke session {session_id}: {str(e)}")
-        
-        return revoked_count 
\ No newline at end of file
+        result = self.dynamodb_service.batch_delete_items(
+            [{"PK": session_id, "SK": "session"} for session_id in session_ids]
+        )
+        failed_session_ids = [key['PK'] for key in result['failed']]
+        
+        logger.info("revoked %d sessions for %s, %d failed", len(result['deleted']), user_id, len(failed_session_ids))
+        if failed_session_ids:
+            logger.warning("failed to revoke sessions", session_ids=failed_session_ids)
+        
+        return {
+            'revoked_count': len(result['deleted']),
+            'failed_count': len(failed_session_ids),
+            'failed_session_ids': failed_session_ids
+        }
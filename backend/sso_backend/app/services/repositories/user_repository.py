@@ -1,13 +1,11 @@
 import uuid
 from datetime import datetime
-import boto3
-from boto3.dynamodb.conditions import Key
 
 class UserRepository:
     """
     Repository class for User entity operations.
     Handles CRUD operations for users in DynamoDB.
-    Uses GSIs for efficient lookups by email, phone, and session ID.
+    Uses GSIs for efficient lookups by email, phone, and Cognito sub.
     """
     
     def __init__(self, dynamodb_service):
@@ -63,6 +61,9 @@ class UserRepository:
             "GSI1-SK": "user",
         }
         
+        # GSI3 for sub lookups
+        self._apply_sub_index(user_item)
+        
         # Add phone number GSI if phone is provided
         if phone_number:
             user_item["GSI2-PK"] = f"phone-{phone_number}"
@@ -91,23 +92,29 @@ class UserRepository:
     
     def get_user_by_sub(self, cognito_sub):
         """
-        Get a user by Cognito sub.
+        Get a user by Cognito sub using GSI3.
         
         Args:
             cognito_sub (str): The Cognito sub
             
         Returns:
-            dict: The user item
+            dict: The user item or None if not found
         """
-        # For sub lookups, we still need to scan since we don't have a GSI for it
-        # In a production environment, we would add a GSI for sub lookups
-        items = self.dynamodb_service.scan({
-            'FilterExpression': 'sub = :sub',
-            'ExpressionAttributeValues': {':sub': cognito_sub}
-        })
+        if not cognito_sub:
+            return None
+        
+        # Use GSI3 to query by sub
+        from boto3.dynamodb.conditions import Key
+        key_condition = Key('GSI3-PK').eq(f"sub-{cognito_sub}") & Key('GSI3-SK').eq("user")
+        
+        # Query the GSI, stopping at the first match
+        items = self.dynamodb_service.iter_query({
+            'IndexName': 'GSI3',
+            'KeyConditionExpression': key_condition
+        }, max_items=1)
         
         # Return the first matching item or None
-        return items[0] if items else None
+        return next(items, None)
         
     def find_user_by_email(self, email):
         """
@@ -120,17 +127,17 @@ class UserRepository:
             dict: The user item or None if not found
         """
         # Use GSI1 to query by email
+        from boto3.dynamodb.conditions import Key
         key_condition = Key('GSI1-PK').eq(f"email-{email}") & Key('GSI1-SK').eq("user")
         
-        # Query the GSI
-        response = self.dynamodb_service.query_index({
+        # Query the GSI, stopping at the first match
+        items = self.dynamodb_service.iter_query({
             'IndexName': 'GSI1',
             'KeyConditionExpression': key_condition
-        })
+        }, max_items=1)
         
         # Return the first matching item or None
-        items = response.get('Items', [])
-        return items[0] if items else None
+        return next(items, None)
     
     def find_user_by_phone(self, phone_number):
         """
@@ -143,21 +150,22 @@ class UserRepository:
             dict: The user item or None if not found
         """
         # Use GSI2 to query by phone number
+        from boto3.dynamodb.conditions import Key
         key_condition = Key('GSI2-PK').eq(f"phone-{phone_number}") & Key('GSI2-SK').eq("user")
         
-        # Query the GSI
-        response = self.dynamodb_service.query_index({
+        # Query the GSI, stopping at the first match
+        items = self.dynamodb_service.iter_query({
             'IndexName': 'GSI2',
             'KeyConditionExpression': key_condition
-        })
+        }, max_items=1)
         
         # Return the first matching item or None
-        items = response.get('Items', [])
-        return items[0] if items else None
+        return next(items, None)
     
     def update_user(self, user_item):
         """
         Update an existing user record.
+        Keeps the GSI3 sub lookup in sync when the sub has been re-linked.
         
         Args:
             user_item (dict): The user item to update
@@ -165,9 +173,23 @@ class UserRepository:
         Returns:
             dict: The updated user item
         """
+        self._apply_sub_index(user_item)
+        
         # Update the item in DynamoDB
         self.dynamodb_service.put_item(user_item)
         return user_item
+    
+    def _apply_sub_index(self, user_item):
+        """
+        Set the GSI3 attributes that index a user record by its Cognito sub.
+        
+        Args:
+            user_item (dict): The user item, modified in place
+        """
+        cognito_sub = user_item.get('sub')
+        if cognito_sub:
+            user_item["GSI3-PK"] = f"sub-{cognito_sub}"
+            user_item["GSI3-SK"] = "user"
         
     def link_social_provider(self, user_item, provider_name, provider_user_id):
         """
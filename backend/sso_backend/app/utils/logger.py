@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+from functools import wraps
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+REDACTED = '[redacted]'
+# field names whose values never reach the logs (compared lowercased, '-' and '_' ignored)
+SENSITIVE_KEYS = frozenset([
+    'authorization', 'cookie', 'setcookie', 'password', 'newpassword', 'secret',
+    'clientsecret', 'secrethash', 'code', 'xapikey', 'token'
+])
+# anything that looks like a jwt, wherever it shows up in a string
+JWT_PATTERN = re.compile(r'eyJ[\w-]+(?:\.[\w-]*){2,4}')
+
+class _InvocationState:
+    """per invocation logging state, shared by every logger in the container"""
+
+    def __init__(self):
+        self.threshold = LEVELS.get(os.environ.get('LOG_LEVEL', 'INFO').upper(), LEVELS['INFO'])
+        self.sample_rate = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0'))
+        self.sampled = False
+        self.context = {}
+        self.request_fields = {}
+        self.lock = threading.Lock()
+
+_state = _InvocationState()
+_loggers = {}
+
+def get_logger(name):
+    """
+    get the logger for a module (one per name)
+
+    args:
+        name (str): usually __name__
+
+    returns:
+        Logger: shared logger
+    """
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers.setdefault(name, Logger(name.rsplit('.', 1)[-1]))
+    return logger
+
+def set_level(level, sample_rate=None):
+    """change the level (and debug sample rate) at runtime, mainly for scripts and tests"""
+    _state.threshold = LEVELS[level.upper()]
+    if sample_rate is not None:
+        _state.sample_rate = float(sample_rate)
+
+def add_request_fields(**fields):
+    """add fields to the one line log_request writes at the end of the invocation"""
+    with _state.lock:
+        _state.request_fields.update(fields)
+
+def redact(value):
+    """
+    copy of a value with secrets replaced, nested dicts / lists included
+
+    args:
+        value: anything json serializable
+
+    returns:
+        the value with sensitive fields and jwt-looking strings redacted
+    """
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if _is_sensitive(key) and item not in (None, '') else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        if value.startswith('{'):
+            # api gateway bodies are json strings, redact their fields too
+            try:
+                return json.dumps(redact(json.loads(value)))
+            except ValueError:
+                pass
+        if 'eyJ' in value:
+            return JWT_PATTERN.sub(REDACTED, value)
+    return value
+
+def _is_sensitive(key):
+    """true for keys like Authorization, id_token, refreshToken or password"""
+    normalized = str(key).lower().replace('-', '').replace('_', '')
+    return normalized in SENSITIVE_KEYS or normalized.endswith('token')
+
+class Logger:
+    """
+    level gated json logger writing one line per message to stdout (cloudwatch)
+    messages use lazy %-formatting and keyword fields, nothing is formatted,
+    redacted or serialized unless the level is enabled; callables passed as
+    field values are only called then too
+
+        logger.debug("session %s refreshed", session_id, tokens=lambda: expensive())
+
+    debug lines are written when LOG_LEVEL=DEBUG, or for the share of
+    invocations picked by LOG_DEBUG_SAMPLE_RATE (all debug lines of a sampled
+    invocation, so a request can be followed end to end)
+    """
+
+    def __init__(self, name):
+        """set up a logger named after its module"""
+        self.name = name
+
+    def is_enabled_for(self, level):
+        """check if a level would be written for the current invocation"""
+        return level >= _state.threshold or (level == LEVELS['DEBUG'] and _state.sampled)
+
+    def debug(self, msg, *args, **fields):
+        """log a debug message (payloads, per step detail)"""
+        self._log(LEVELS['DEBUG'], msg, args, fields)
+
+    def info(self, msg, *args, **fields):
+        """log an info message"""
+        self._log(LEVELS['INFO'], msg, args, fields)
+
+    def warning(self, msg, *args, **fields):
+        """log a warning"""
+        self._log(LEVELS['WARNING'], msg, args, fields)
+
+    def error(self, msg, *args, **fields):
+        """log an error"""
+        self._log(LEVELS['ERROR'], msg, args, fields)
+
+    def _log(self, level, msg, args, fields):
+        if not self.is_enabled_for(level):
+            return
+        if args:
+            msg = msg % args
+        line = {'level': _level_name(level), 'logger': self.name, 'msg': redact(msg)}
+        line.update(_state.context)
+        for key, value in fields.items():
+            line[key] = redact(value() if callable(value) else value)
+        print(json.dumps(line, separators=(',', ':'), default=str))
+
+def _level_name(level):
+    """name for a numeric level"""
+    for name, value in LEVELS.items():
+        if value == level:
+            return name
+    return str(level)
+
+def log_request(handler):
+    """
+    decorator for lambda handlers, sets up the invocation (request id, debug
+    sampling), logs the redacted event at debug level and writes one info line
+    per request with the status and duration (plus anything added through
+    add_request_fields, like the aws call summary from track_io)
+
+    args:
+        handler: the lambda handler function
+
+    returns:
+        wrapped handler
+    """
+    name = handler.__module__.rsplit('.', 1)[-1]
+    logger = get_logger(handler.__module__)
+
+    @wraps(handler)
+    def wrapper(event, context):
+        _state.sampled = _state.sample_rate > 0 and random.random() < _state.sample_rate
+        _state.context = {'handler': name}
+        request_id = getattr(context, 'aws_request_id', None)
+        if request_id:
+            _state.context['request_id'] = request_id
+        with _state.lock:
+            _state.request_fields = {}
+
+        logger.debug("event received", event=event)
+        started = time.perf_counter()
+        try:
+            response = handler(event, context)
+        except Exception as e:
+            logger.error("request failed", error=f"{type(e).__name__}: {e}",
+                         duration_ms=round((time.perf_counter() - started) * 1000, 1))
+            raise
+
+        fields = {'duration_ms': round((time.perf_counter() - started) * 1000, 1)}
+        if isinstance(response, dict) and 'statusCode' in response:
+            fields['status'] = response['statusCode']
+        with _state.lock:
+            fields.update(_state.request_fields)
+        logger.info("request", **fields)
+        return response
+
+    return wrapper
@@ -0,0 +1,39 @@
+import time
+import threading
+
+class RateLimiter:
+    """
+    Token bucket shared between threads.
+    Keeps calls to a rate-limited API (like Cognito's InitiateAuth quota)
+    under a fixed number of requests per second.
+    """
+
+    def __init__(self, rate_per_second, burst=None):
+        """
+        Initialize the bucket full.
+
+        Args:
+            rate_per_second (float): Requests allowed per second
+            burst (float): Requests allowed back to back (default: one second's worth)
+        """
+        self.rate = float(rate_per_second)
+        self.capacity = float(burst) if burst else self.rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made, then take its token"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                delay = (1 - self.tokens) / self.rate
+
+            time.sleep(delay)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Script to backfill the numeric `ttl` attribute on existing session records
+and (optionally) turn on DynamoDB Time to Live for it.
+Sessions written before the ttl existed only carry the ISO `expires_at`
+string, so DynamoDB never expires them and they keep being read by the
+user-sessions query.
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from parallel_scan import ParallelScanner, add_scan_arguments
+
+TTL_ATTRIBUTE = 'ttl'
+
+# Parse command-line arguments
+parser = argparse.ArgumentParser(description='Backfill the ttl attribute on session records')
+parser.add_argument('--table', default='matt-cognito-hop-main', help='Main DynamoDB table name')
+parser.add_argument('--region', default='ap-southeast-2', help='AWS region')
+parser.add_argument('--dry-run', action='store_true', help='Only report the records that would be updated')
+parser.add_argument('--enable-ttl', action='store_true', help=f"Enable Time to Live on the '{TTL_ATTRIBUTE}' attribute")
+add_scan_arguments(parser)
+args = parser.parse_args()
+
+# Initialize DynamoDB client
+dynamodb = boto3.resource('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+table = dynamodb.Table(args.table)
+
+def enable_ttl():
+    """Turn on TTL for the table (no-op if it is already enabled on the same attribute)"""
+    client = dynamodb.meta.client
+    description = client.describe_time_to_live(TableName=args.table)['TimeToLiveDescription']
+
+    if description.get('TimeToLiveStatus') in ('ENABLED', 'ENABLING') and description.get('AttributeName') == TTL_ATTRIBUTE:
+        print(f"TTL already {description['TimeToLiveStatus'].lower()} on '{TTL_ATTRIBUTE}'")
+        return
+
+    if args.dry_run:
+        print(f"Would enable TTL on '{TTL_ATTRIBUTE}'")
+        return
+
+    client.update_time_to_live(
+        TableName=args.table,
+        TimeToLiveSpecification={'Enabled': True, 'AttributeName': TTL_ATTRIBUTE}
+    )
+    print(f"✅ Enabled TTL on '{TTL_ATTRIBUTE}'")
+
+def iter_sessions_without_ttl():
+    """Scan the whole table with parallel segments and yield session records that have no ttl."""
+    scanner = ParallelScanner(
+        args.table,
+        total_segments=args.segments,
+        rcu_per_second=args.rcu,
+        page_size=args.page_size,
+        scan_params={
+            'FilterExpression': Attr('SK').eq('session') & Attr(TTL_ATTRIBUTE).not_exists(),
+            'ProjectionExpression': 'PK, SK, expires_at'
+        },
+        # a dry run must not mark pages as handled
+        checkpoint_path=None if args.dry_run else args.checkpoint,
+        region=args.region,
+        endpoint_url=args.endpoint_url
+    )
+    yield from scanner.iter_items()
+    print(f"Scan stats: {scanner.stats()}")
+
+def ttl_for(item):
+    """Epoch seconds for a session's expires_at (sessions with a missing or bad value expire now)"""
+    try:
+        return int(datetime.fromisoformat(item['expires_at']).timestamp())
+    except (KeyError, TypeError, ValueError):
+        return int(time.time())
+
+def backfill_session_ttl():
+    """Set ttl from expires_at on every session record that is missing it"""
+    scanned = 0
+    updated = 0
+
+    for item in iter_sessions_without_ttl():
+        scanned += 1
+        ttl = ttl_for(item)
+
+        if args.dry_run:
+            print(f"Would set {item['PK']} {TTL_ATTRIBUTE} = {ttl}")
+            updated += 1
+            continue
+
+        try:
+            table.update_item(
+                Key={'PK': item['PK'], 'SK': item['SK']},
+                UpdateExpression='SET #ttl = :ttl',
+                # don't resurrect a session that was deleted while we were scanning
+                ConditionExpression='attribute_exists(PK)',
+                ExpressionAttributeNames={'#ttl': TTL_ATTRIBUTE},
+                ExpressionAttributeValues={':ttl': ttl}
+            )
+            updated += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+    print(f"Scanned {scanned} session records without ttl, {'would update' if args.dry_run else 'updated'} {updated}")
+
+if __name__ == "__main__":
+    if args.enable_ttl:
+        enable_ttl()
+    print(f"Backfilling session ttl on table {args.table}...")
+    backfill_session_ttl()
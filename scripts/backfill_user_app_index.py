@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Script to backfill the mirrored user -> application relationship items.
+Relationships created before the mirror existed only have the
+PK = application-{app_id}, SK = user_id item, so they don't show up in the
+PK = user_id, SK begins_with application- query used to list a user's apps.
+"""
+
+import argparse
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from parallel_scan import ParallelScanner, add_scan_arguments
+
+# Parse command-line arguments
+parser = argparse.ArgumentParser(description='Backfill PK=user_id, SK=application-{id} items for existing relationships')
+parser.add_argument('--table', default='matt-cognito-hop-main', help='Main DynamoDB table name')
+parser.add_argument('--region', default='ap-southeast-2', help='AWS region')
+parser.add_argument('--dry-run', action='store_true', help='Only report the items that would be created')
+add_scan_arguments(parser)
+args = parser.parse_args()
+
+# Initialize DynamoDB client
+dynamodb = boto3.resource('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+table = dynamodb.Table(args.table)
+
+def iter_relationship_records():
+    """Scan the whole table with parallel segments and yield application -> user relationship records."""
+    scanner = ParallelScanner(
+        args.table,
+        total_segments=args.segments,
+        rcu_per_second=args.rcu,
+        page_size=args.page_size,
+        scan_params={
+            'FilterExpression': Attr('PK').begins_with('application-') & Attr('SK').begins_with('user-')
+        },
+        # a dry run must not mark pages as handled
+        checkpoint_path=None if args.dry_run else args.checkpoint,
+        region=args.region,
+        endpoint_url=args.endpoint_url
+    )
+    yield from scanner.iter_items()
+    print(f"Scan stats: {scanner.stats()}")
+
+def mirror_item(item):
+    """Build the PK = user_id, SK = application-{app_id} item for a relationship record"""
+    application_id = item.get('application_id') or item['PK'].replace('application-', '', 1)
+    user_id = item.get('user_id') or item['SK']
+
+    return {
+        **item,
+        'PK': user_id,
+        'SK': f"application-{application_id}",
+        'application_id': application_id,
+        'user_id': user_id
+    }
+
+def backfill_user_app_index():
+    """Create the missing mirror items (existing ones are left untouched, so reruns are safe)"""
+    scanned = 0
+    created = 0
+
+    for item in iter_relationship_records():
+        scanned += 1
+        mirror = mirror_item(item)
+
+        if args.dry_run:
+            existing = table.get_item(Key={'PK': mirror['PK'], 'SK': mirror['SK']}).get('Item')
+            if not existing:
+                print(f"Would create {mirror['PK']} / {mirror['SK']}")
+                created += 1
+            continue
+
+        try:
+            table.put_item(Item=mirror, ConditionExpression='attribute_not_exists(PK)')
+            print(f"✅ Created {mirror['PK']} / {mirror['SK']}")
+            created += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+    print(f"Scanned {scanned} relationship records, {'would create' if args.dry_run else 'created'} {created} mirror items")
+
+if __name__ == "__main__":
+    print(f"Backfilling user -> application items on table {args.table}...")
+    backfill_user_app_index()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Script to backfill the GSI3 sub lookup attributes on existing user records.
+User records created before the sub index existed only carry a plain `sub`
+attribute, so they cannot be found by UserRepository.get_user_by_sub.
+"""
+
+import argparse
+import boto3
+from boto3.dynamodb.conditions import Attr
+
+from parallel_scan import ParallelScanner, add_scan_arguments
+
+# Parse command-line arguments
+parser = argparse.ArgumentParser(description='Backfill GSI3-PK/GSI3-SK on user records for sub lookups')
+parser.add_argument('--table', default='matt-cognito-hop-main', help='Main DynamoDB table name')
+parser.add_argument('--region', default='ap-southeast-2', help='AWS region')
+parser.add_argument('--dry-run', action='store_true', help='Only report the records that would be updated')
+add_scan_arguments(parser)
+args = parser.parse_args()
+
+# Initialize DynamoDB client
+dynamodb = boto3.resource('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+table = dynamodb.Table(args.table)
+
+def iter_user_records():
+    """Scan the whole table with parallel segments and yield user records that have a sub."""
+    scanner = ParallelScanner(
+        args.table,
+        total_segments=args.segments,
+        rcu_per_second=args.rcu,
+        page_size=args.page_size,
+        scan_params={
+            'FilterExpression': Attr('SK').eq('user') & Attr('sub').exists(),
+            'ProjectionExpression': 'PK, SK, #sub, #gsi3pk',
+            'ExpressionAttributeNames': {'#sub': 'sub', '#gsi3pk': 'GSI3-PK'}
+        },
+        # a dry run must not mark pages as handled
+        checkpoint_path=None if args.dry_run else args.checkpoint,
+        region=args.region,
+        endpoint_url=args.endpoint_url
+    )
+    yield from scanner.iter_items()
+    print(f"Scan stats: {scanner.stats()}")
+
+def backfill_sub_index():
+    """Set GSI3-PK = sub-{sub} and GSI3-SK = user on every user record that is missing them"""
+    scanned = 0
+    updated = 0
+
+    for item in iter_user_records():
+        scanned += 1
+        expected_pk = f"sub-{item['sub']}"
+
+        if item.get('GSI3-PK') == expected_pk:
+            continue
+
+        if args.dry_run:
+            print(f"Would update {item['PK']} -> {expected_pk}")
+        else:
+            table.update_item(
+                Key={'PK': item['PK'], 'SK': item['SK']},
+                UpdateExpression='SET #gsi3pk = :pk, #gsi3sk = :sk',
+                ExpressionAttributeNames={'#gsi3pk': 'GSI3-PK', '#gsi3sk': 'GSI3-SK'},
+                ExpressionAttributeValues={':pk': expected_pk, ':sk': 'user'}
+            )
+            print(f"✅ Updated {item['PK']} -> {expected_pk}")
+        updated += 1
+
+    print(f"Scanned {scanned} user records, {'would update' if args.dry_run else 'updated'} {updated}")
+
+if __name__ == "__main__":
+    print(f"Backfilling sub index on table {args.table}...")
+    backfill_sub_index()
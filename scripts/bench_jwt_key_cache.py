@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for JWTService token validation.
+Compares the old per-token key lookup (linear scan over the JWKS + passing the
+raw JWK dict to the verifier, which rebuilds the RSA key every time) with the prebuilt
+kid -> key map. Uses locally generated RSA keys, no AWS access needed.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Parse command-line arguments
+parser = argparse.ArgumentParser(description='Benchmark per-validation time of JWTService')
+parser.add_argument('--iterations', type=int, default=500, help='Validations per variant')
+parser.add_argument('--keys', type=int, default=2, help='Number of keys in the generated JWKS')
+parser.add_argument('--key-size', type=int, default=2048, help='RSA key size in bits')
+parser.add_argument('--backend', choices=['sso_backend', 'client_backend'], default='sso_backend',
+                    help='Which backend JWTService to benchmark')
+args = parser.parse_args()
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER_POOL_ID = 'ap-southeast-2_benchmark'
+APP_CLIENT_ID = 'benchmark-client'
+REGION = 'ap-southeast-2'
+
+# JWTService reads its configuration from the environment
+os.environ['COGNITO_USER_POOL_ID'] = USER_POOL_ID
+os.environ['COGNITO_APP_CLIENT_ID'] = APP_CLIENT_ID
+os.environ['AWS_REGION'] = REGION
+sys.path.insert(0, os.path.join(REPO_ROOT, 'backend', args.backend, 'app'))
+
+import rsa
+from jose import jwk, jwt
+from services.auth.jwt_service import JWTService
+from services.auth.claims_cache import VerifiedClaimsCache
+
+class LegacyKeyLookupJWTService(JWTService):
+    """JWTService with the original key lookup: linear scan, key rebuilt from the raw JWK every time"""
+
+    def _get_key_for_token(self, token_header):
+        for key in self._get_jwks()['keys']:
+            if key['kid'] == token_header['kid']:
+                return self.verifier.construct_key(key)
+        raise ValueError("can't find the key for this token - might be fake?")
+
+def generate_key_set():
+    """Generate RSA key pairs and the matching JWKS document"""
+    private_keys = {}
+    public_jwks = []
+
+    for index in range(args.keys):
+        kid = f"bench-key-{index}"
+        public_key, private_key = rsa.newkeys(args.key_size)
+        private_keys[kid] = private_key.save_pkcs1().decode('utf-8')
+
+        public_jwk = jwk.construct(public_key.save_pkcs1().decode('utf-8'), 'RS256').to_dict()
+        public_jwk.update({'kid': kid, 'alg': 'RS256', 'use': 'sig'})
+        public_jwks.append(public_jwk)
+
+    return private_keys, {'keys': public_jwks}
+
+def make_service(service_class, jwks):
+    """Build a JWTService with the generated key set installed and the claims cache disabled"""
+    service = service_class()
+    service.jwks_cache._install(jwks, time.time())
+    # every iteration must do the full signature check
+    service.claims_cache = VerifiedClaimsCache(max_entries=0)
+    return service
+
+def time_validations(service, token):
+    """Return the mean seconds per validate_id_token call"""
+    # warm up once so one-time work (key compilation) isn't the only thing measured
+    with contextlib.redirect_stdout(io.StringIO()):
+        service.validate_id_token(token)
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            service.validate_id_token(token)
+        elapsed = time.perf_counter() - start
+
+    return elapsed / args.iterations
+
+if __name__ == "__main__":
+    print(f"Generating {args.keys} RSA-{args.key_size} keys...")
+    private_keys, jwks = generate_key_set()
+
+    # sign with the last key so the legacy linear scan has to walk the whole list
+    kid = jwks['keys'][-1]['kid']
+    token = jwt.encode(
+        {
+            'sub': 'benchmark-user',
+            'aud': APP_CLIENT_ID,
+            'iss': f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}",
+            'token_use': 'id',
+            'exp': int(time.time()) + 3600
+        },
+        private_keys[kid],
+        algorithm='RS256',
+        headers={'kid': kid}
+    )
+
+    before = time_validations(make_service(LegacyKeyLookupJWTService, jwks), token)
+    after = time_validations(make_service(JWTService, jwks), token)
+
+    print(f"\nBackend: {args.backend}, iterations: {args.iterations}")
+    print(f"{'variant':<28}{'per validation':>16}{'validations/s':>16}")
+    print(f"{'before (raw JWK dict)':<28}{before * 1e6:>13.1f} us{1 / before:>16.0f}")
+    print(f"{'after (prebuilt key map)':<28}{after * 1e6:>13.1f} us{1 / after:>16.0f}")
+    print(f"\nSpeedup: {before / after:.2f}x")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the pluggable JWT verifier backends (services/auth/verifiers.py).
+For every backend it checks correctness (valid, tampered, wrong aud/iss, expired,
+alg=none and HS256 key-confusion tokens), measures RS256 verification throughput
+with a prebuilt key, and measures cold import cost + memory growth in a fresh
+interpreter - the numbers that matter on a 128 MB Lambda cold start.
+Uses locally generated RSA keys, no AWS access needed.
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Parse command-line arguments
+parser = argparse.ArgumentParser(description='Benchmark RS256 verification per JWT verifier backend')
+parser.add_argument('--iterations', type=int, default=2000, help='Verifications per backend')
+parser.add_argument('--key-size', type=int, default=2048, help='RSA key size in bits')
+parser.add_argument('--import-runs', type=int, default=5, help='Fresh interpreters per backend for import timing')
+parser.add_argument('--backend', choices=['sso_backend', 'client_backend', 'admin_backend'], default='sso_backend',
+                    help='Which backend copy of verifiers.py to benchmark')
+args = parser.parse_args()
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VERIFIERS_PATH = os.path.join(REPO_ROOT, 'backend', args.backend, 'app', 'services', 'auth', 'verifiers.py')
+AUDIENCE = 'benchmark-client'
+ISSUER = 'https://cognito-idp.ap-southeast-2.amazonaws.com/ap-southeast-2_benchmark'
+KID = 'bench-key'
+
+# pure-python rsa is what python-jose falls back to when cryptography isn't installed
+# (the current lambda packages), so it is measured as its own variant
+PURE_PYTHON_JOSE = 'jose-purepython'
+
+def load_verifiers():
+    """Load verifiers.py straight from its file so this works for every backend layout"""
+    spec = importlib.util.spec_from_file_location('bench_verifiers', VERIFIERS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+verifiers = load_verifiers()
+
+class PurePythonJoseVerifier(verifiers.JoseVerifier):
+    """python-jose forced onto its pure-python rsa key implementation"""
+    name = PURE_PYTHON_JOSE
+
+    def construct_key(self, jwk_data):
+        from jose.backends.rsa_backend import RSAKey
+        return RSAKey(jwk_data, 'RS256')
+
+def b64url(data):
+    """Base64url without padding, as used in JWTs"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def generate_key():
+    """Generate an RSA key pair, returning the private PEM and the public JWK"""
+    import rsa
+    from jose import jwk
+
+    public_key, private_key = rsa.newkeys(args.key_size)
+    public_jwk = jwk.construct(public_key.save_pkcs1().decode('utf-8'), 'RS256').to_dict()
+    public_jwk.update({'kid': KID, 'alg': 'RS256', 'use': 'sig'})
+    return private_key.save_pkcs1().decode('utf-8'), public_key.save_pkcs1(format='PEM'), public_jwk
+
+def build_tokens(private_pem, public_pem):
+    """Build the valid token plus one token for every way a token should be rejected"""
+    from jose import jwt
+
+    now = int(time.time())
+    claims = {'sub': 'benchmark-user', 'aud': AUDIENCE, 'iss': ISSUER, 'token_use': 'id', 'exp': now + 3600}
+
+    def sign(payload):
+        return jwt.encode(payload, private_pem, algorithm='RS256', headers={'kid': KID})
+
+    valid = sign(claims)
+    header, payload, signature = valid.split('.')
+    flipped = ('A' if signature[0] != 'A' else 'B') + signature[1:]
+
+    # alg confusion: HS256 "signed" with the public key as the hmac secret
+    confusion_header = b64url(json.dumps({'alg': 'HS256', 'typ': 'JWT', 'kid': KID}).encode())
+    confusion_signing_input = f"{confusion_header}.{payload}".encode()
+    confusion = f"{confusion_header}.{payload}." + b64url(hmac.new(public_pem, confusion_signing_input, hashlib.sha256).digest())
+
+    none_header = b64url(json.dumps({'alg': 'none', 'typ': 'JWT', 'kid': KID}).encode())
+
+    rejected = {
+        'tampered signature': (f"{header}.{payload}.{flipped}", verifiers.TokenVerificationError),
+        'tampered payload': (f"{header}.{b64url(json.dumps(dict(claims, sub='someone-else')).encode())}.{signature}",
+                             verifiers.TokenVerificationError),
+        'wrong audience': (sign(dict(claims, aud='another-client')), verifiers.TokenVerificationError),
+        'wrong issuer': (sign(dict(claims, iss='https://evil.example.com')), verifiers.TokenVerificationError),
+        'expired': (sign(dict(claims, exp=now - 60)), verifiers.ExpiredTokenError),
+        'alg none': (f"{none_header}.{payload}.", verifiers.TokenVerificationError),
+        'hs256 key confusion': (confusion, verifiers.TokenVerificationError),
+        'garbage': ('not-a-jwt', verifiers.TokenVerificationError)
+    }
+    return valid, claims, rejected
+
+def check_correctness(verifier, key, valid, claims, rejected):
+    """Return the list of checks the verifier got wrong (empty means correct)"""
+    failures = []
+
+    try:
+        if verifier.get_unverified_header(valid).get('kid') != KID:
+            failures.append('header kid')
+        decoded = verifier.decode(valid, key, audience=AUDIENCE, issuer=ISSUER)
+        if decoded.get('sub') != claims['sub']:
+            failures.append('valid token claims')
+    except Exception as e:
+        failures.append(f"valid token ({type(e).__name__}: {e})")
+
+    for label, (token, expected_error) in rejected.items():
+        try:
+            verifier.decode(token, key, audience=AUDIENCE, issuer=ISSUER)
+            failures.append(f"{label} accepted")
+        except expected_error:
+            pass
+        except Exception as e:
+            failures.append(f"{label} ({type(e).__name__} instead of {expected_error.__name__})")
+
+    return failures
+
+def time_verifications(verifier, key, token):
+    """Return the mean seconds per decode call"""
+    verifier.decode(token, key, audience=AUDIENCE, issuer=ISSUER)
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        verifier.decode(token, key, audience=AUDIENCE, issuer=ISSUER)
+    return (time.perf_counter() - start) / args.iterations
+
+# runs in a fresh interpreter: import the library, build one key, report time and rss growth
+# (rss comes from /proc because ru_maxrss carries the parent's peak across fork + exec)
+IMPORT_PROBE = """
+import sys, time, json, importlib.util
+if {block_cryptography!r}:
+    sys.modules['cryptography'] = None
+def rss_kb():
+    with open('/proc/self/status') as f:
+        return int(next(line for line in f if line.startswith('VmRSS:')).split()[1])
+baseline_kb = rss_kb()
+spec = importlib.util.spec_from_file_location('bench_verifiers', {path!r})
+verifiers = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(verifiers)
+start = time.perf_counter()
+verifier = verifiers.VERIFIERS[{name!r}]()
+verifier.construct_key(json.loads({jwk!r}))
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'rss_kb': rss_kb() - baseline_kb}}))
+"""
+
+def measure_import(name, public_jwk):
+    """Median import + first-key time and rss growth across fresh interpreters"""
+    probe = IMPORT_PROBE.format(
+        block_cryptography=(name == PURE_PYTHON_JOSE),
+        path=VERIFIERS_PATH,
+        name=verifiers.JoseVerifier.name if name == PURE_PYTHON_JOSE else name,
+        jwk=json.dumps(public_jwk)
+    )
+
+    seconds, rss = [], []
+    for _ in range(args.import_runs):
+        result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, None
+        measured = json.loads(result.stdout.strip().splitlines()[-1])
+        seconds.append(measured['seconds'])
+        rss.append(measured['rss_kb'])
+
+    return statistics.median(seconds), statistics.median(rss) / 1024
+
+if __name__ == "__main__":
+    print(f"Generating an RSA-{args.key_size} key...")
+    private_pem, public_pem, public_jwk = generate_key()
+    valid, claims, rejected = build_tokens(private_pem, public_pem)
+
+    candidates = dict(verifiers.VERIFIERS)
+    candidates[PURE_PYTHON_JOSE] = PurePythonJoseVerifier
+
+    results = []
+    for name, verifier_class in candidates.items():
+        try:
+            verifier = verifier_class()
+        except ImportError as e:
+            print(f"skipping {name}: {e}")
+            continue
+
+        key = verifier.construct_key(public_jwk)
+        failures = check_correctness(verifier, key, valid, claims, rejected)
+        per_verify = time_verifications(verifier, key, valid)
+        import_seconds, import_mb = measure_import(name, public_jwk)
+        results.append((name, failures, per_verify, import_seconds, import_mb))
+
+    print(f"\nBackend: {args.backend}, iterations: {args.iterations}, import runs: {args.import_runs}")
+    print(f"{'verifier':<18}{'correct':>9}{'per verify':>14}{'verifies/s':>12}{'cold import':>14}{'import rss':>12}")
+    for name, failures, per_verify, import_seconds, import_mb in results:
+        cold = f"{import_seconds * 1000:.1f} ms" if import_seconds is not None else 'n/a'
+        rss = f"{import_mb:.1f} MB" if import_mb is not None else 'n/a'
+        print(f"{name:<18}{'yes' if not failures else 'NO':>9}{per_verify * 1e6:>11.1f} us{1 / per_verify:>12.0f}{cold:>14}{rss:>12}")
+
+    for name, failures, *_ in results:
+        for failure in failures:
+            print(f"  {name}: {failure}")
+
+    # only backends JWT_VERIFIER_BACKEND can select are eligible
+    eligible = [r for r in results if not r[1] and r[0] in verifiers.VERIFIERS]
+    if eligible:
+        fastest = min(eligible, key=lambda r: r[2])
+        print(f"\nFastest correct backend: {fastest[0]} (JWT_VERIFIER_BACKEND={fastest[0]})")
+    else:
+        print("\nNo backend passed every correctness check")
+        sys.exit(1)
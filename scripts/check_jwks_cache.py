@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+End-to-end check of JWKSCache and JWTService against a local stand-in for
+Cognito's jwks endpoint (http.server on 127.0.0.1 serving generated RSA keys).
+Counts the downloads the server sees while it walks through a cold start, the
+/tmp copy, single-flight refreshes, a key rotation, and an outage with and
+without cached keys (failed downloads back off instead of every request
+waiting out the timeout). Exits 1 if any check fails. No AWS access needed.
+
+    python check_jwks_cache.py
+    python check_jwks_cache.py --backend client_backend
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Parse command-line arguments
+parser = argparse.ArgumentParser(description='Check the JWKS cache against a local jwks endpoint')
+parser.add_argument('--backend', choices=['sso_backend', 'client_backend'], default='sso_backend',
+                    help='Which backend JWKSCache / JWTService to check')
+parser.add_argument('--key-size', type=int, default=1024, help='RSA key size in bits')
+parser.add_argument('--threads', type=int, default=16, help='Concurrent callers in the single-flight check')
+args = parser.parse_args()
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER_POOL_ID = 'ap-southeast-2_jwkscheck'
+APP_CLIENT_ID = 'jwks-check-client'
+REGION = 'ap-southeast-2'
+# download timeout for the cache, the outage checks make the server slower than this
+FETCH_TIMEOUT_SECONDS = 1
+
+# JWTService reads its configuration from the environment
+os.environ['COGNITO_USER_POOL_ID'] = USER_POOL_ID
+os.environ['COGNITO_APP_CLIENT_ID'] = APP_CLIENT_ID
+os.environ['AWS_REGION'] = REGION
+sys.path.insert(0, os.path.join(REPO_ROOT, 'backend', args.backend, 'app'))
+
+import rsa
+from jose import jwk, jwt
+from services.auth.jwks_cache import JWKSCache
+from services.auth.jwt_service import JWTService
+from services.auth.claims_cache import VerifiedClaimsCache
+
+class JWKSHandler(BaseHTTPRequestHandler):
+    """Serves server.jwks, after server.delay seconds, with server.status"""
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.delay)
+
+        body = json.dumps(self.server.jwks).encode('utf-8')
+        try:
+            self.send_response(self.server.status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # the client gave up (timeout) before we answered
+            pass
+
+    def log_message(self, format, *log_args):
+        pass
+
+def start_server(jwks):
+    """Start the jwks endpoint on a free port, healthy and without delay"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), JWKSHandler)
+    server.daemon_threads = True
+    server.jwks = jwks
+    server.status = 200
+    server.delay = 0.0
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def generate_key(kid):
+    """Generate an RSA key pair, returning (private PEM, public JWK)"""
+    public_key, private_key = rsa.newkeys(args.key_size)
+    public_jwk = jwk.construct(public_key.save_pkcs1().decode('utf-8'), 'RS256').to_dict()
+    public_jwk.update({'kid': kid, 'alg': 'RS256', 'use': 'sig'})
+    return private_key.save_pkcs1().decode('utf-8'), public_jwk
+
+def sign(private_key, kid):
+    """Sign an id token like Cognito would"""
+    return jwt.encode(
+        {
+            'sub': 'jwks-check-user',
+            'aud': APP_CLIENT_ID,
+            'iss': f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}",
+            'token_use': 'id',
+            'exp': int(time.time()) + 3600
+        },
+        private_key,
+        algorithm='RS256',
+        headers={'kid': kid}
+    )
+
+def make_service(cache):
+    """JWTService on a given cache, with the claims cache disabled so every token hits the keys"""
+    service = JWTService()
+    service.jwks_cache = cache
+    service.claims_cache = VerifiedClaimsCache(max_entries=0)
+    return service
+
+def is_valid(service, token):
+    """True if the service accepts the token"""
+    try:
+        service.validate_id_token(token)
+        return True
+    except ValueError:
+        return False
+
+def raises(call):
+    """True if call() raises"""
+    try:
+        call()
+        return False
+    except Exception:
+        return True
+
+class Checks:
+    """Runs named checks, measuring the downloads and time each one takes"""
+
+    def __init__(self, server):
+        self.server = server
+        self.failed = 0
+
+    def run(self, name, expected_downloads, check, max_seconds=None):
+        before = self.server.requests
+        started = time.perf_counter()
+        # the services log json lines to stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            passed = check()
+        elapsed = time.perf_counter() - started
+        downloads = self.server.requests - before
+
+        ok = passed and downloads == expected_downloads and (max_seconds is None or elapsed <= max_seconds)
+        self.failed += not ok
+        limit = f", limit {max_seconds:.2f}s" if max_seconds is not None else ''
+        print(f"{'ok' if ok else 'FAIL':<6}{name:<52}{downloads:>3} downloads (expected {expected_downloads})"
+              f"{elapsed:>8.2f}s{limit}")
+
+if __name__ == "__main__":
+    print(f"Generating RSA-{args.key_size} keys...")
+    first_private, first_jwk = generate_key('check-key-1')
+    second_private, second_jwk = generate_key('check-key-2')
+    first_token = sign(first_private, 'check-key-1')
+    rotated_token = sign(second_private, 'check-key-2')
+    # never published, like a forged token
+    unknown_private, _ = generate_key('check-key-unknown')
+    unknown_token = sign(unknown_private, 'check-key-unknown')
+
+    server = start_server({'keys': [first_jwk]})
+    jwks_url = f"http://127.0.0.1:{server.server_port}/{USER_POOL_ID}/.well-known/jwks.json"
+    cache_dir = tempfile.mkdtemp(prefix='jwks-check-')
+    checks = Checks(server)
+    print(f"Serving the key set at {jwks_url} ({args.backend})\n")
+
+    cache = JWKSCache(jwks_url, cache_dir=cache_dir, timeout=FETCH_TIMEOUT_SECONDS)
+    service = make_service(cache)
+
+    checks.run("cold start downloads the keys once", 1,
+               lambda: is_valid(service, first_token) and is_valid(service, first_token))
+
+    checks.run("next cold start reuses the /tmp copy", 0,
+               lambda: is_valid(make_service(JWKSCache(jwks_url, cache_dir=cache_dir)), first_token))
+
+    def concurrent_refresh():
+        cache.fetched_at -= cache.ttl_seconds
+        server.delay = 0.2
+        results = []
+        callers = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(args.threads)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+        server.delay = 0.0
+        return len(results) == args.threads and all(result is results[0] for result in results)
+
+    checks.run(f"expired keys are refetched once by {args.threads} callers", 1, concurrent_refresh)
+
+    def rotation():
+        # keys still within the ttl, but older than the kid-miss rate limit
+        cache.fetched_at -= cache.min_refresh_interval
+        server.jwks = {'keys': [first_jwk, second_jwk]}
+        # the unknown kid right after the refetch is rate limited, not downloaded again
+        return is_valid(service, rotated_token) and not is_valid(service, unknown_token)
+
+    checks.run("rotated kid triggers one refetch, unknown kid none", 1, rotation)
+
+    def outage_first_attempt():
+        cache.fetched_at -= cache.ttl_seconds
+        server.delay = FETCH_TIMEOUT_SECONDS + 1
+        return is_valid(service, first_token)
+
+    checks.run("outage: expired keys still served after the timeout", 1, outage_first_attempt,
+               max_seconds=FETCH_TIMEOUT_SECONDS + 0.5)
+
+    checks.run("outage: 200 more tokens back off instead of waiting", 0,
+               lambda: all(is_valid(service, first_token) for _ in range(200)), max_seconds=2.0)
+
+    server.delay = 0.0
+    server.status = 503
+    empty_cache = JWKSCache(jwks_url, cache_dir=tempfile.mkdtemp(prefix='jwks-check-'), min_refresh_interval=1,
+                            timeout=FETCH_TIMEOUT_SECONDS)
+
+    checks.run("outage without keys: first request fails", 1, lambda: raises(empty_cache.get))
+    checks.run("outage without keys: next requests fail fast", 0,
+               lambda: all(raises(empty_cache.get) for _ in range(50)), max_seconds=0.5)
+
+    def recovery():
+        server.status = 200
+        time.sleep(empty_cache.min_refresh_interval)
+        return empty_cache.get() == server.jwks
+
+    checks.run("recovers once the backoff is over", 1, recovery)
+
+    server.shutdown()
+    server.server_close()
+
+    if checks.failed:
+        print(f"\n{checks.failed} checks failed")
+        sys.exit(1)
+    print("\nAll checks passed")
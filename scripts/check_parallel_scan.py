@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+End-to-end check of ParallelScanner against the in-memory DynamoDB stand-in
+(LocalDynamoDB().meta.client, typed like the real low-level client). Seeds a
+table, then checks that a segmented scan returns every item exactly once,
+that the RCU limiter holds the consumed capacity to its budget, that a run
+resumes from its checkpoint without handing out finished pages again, and
+that closing iter_items early stops the workers. Exits 1 if any check fails.
+No AWS access needed.
+
+    python check_parallel_scan.py
+    python check_parallel_scan.py --items 20000 --segments 16 --rcu 400
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+# Parse command-line arguments
+parser = argparse.ArgumentParser(description='Check ParallelScanner against the local DynamoDB stand-in')
+parser.add_argument('--items', type=int, default=6000, help='Items to seed')
+parser.add_argument('--item-bytes', type=int, default=500, help='Approximate size of each item')
+parser.add_argument('--segments', type=int, default=8, help='Parallel scan segments')
+parser.add_argument('--page-size', type=int, default=50, help='Limit per Scan request')
+parser.add_argument('--rcu', type=float, default=150, help='Read capacity budget for the limiter check')
+parser.add_argument('--latency-ms', type=float, default=2, help='Simulated round trip per request')
+args = parser.parse_args()
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from local_dynamodb import LocalDynamoDB, LocalDynamoDBClient
+from parallel_scan import ParallelScanner
+
+TABLE_NAME = 'parallel-scan-check'
+
+class RecordingClient(LocalDynamoDBClient):
+    """Local client that remembers when each Scan page came back and what it consumed"""
+
+    def __init__(self, db):
+        super().__init__(db)
+        self.pages = []
+        self._lock = threading.Lock()
+
+    def scan(self, TableName, **params):
+        response = super().scan(TableName, **params)
+        units = response.get('ConsumedCapacity', {}).get('CapacityUnits', 0.0)
+        with self._lock:
+            self.pages.append((time.monotonic(), units))
+        return response
+
+    def calls(self):
+        with self._lock:
+            return len(self.pages)
+
+def seed_table():
+    """Seed a table with --items items of about --item-bytes each"""
+    db = LocalDynamoDB(latency_ms=args.latency_ms, seed=1)
+    db.seed_items(TABLE_NAME, [
+        {'PK': f"item-{number:06d}", 'SK': 'item', 'number': number, 'payload': 'x' * args.item_bytes}
+        for number in range(args.items)
+    ])
+    return db, {f"item-{number:06d}" for number in range(args.items)}
+
+def make_scanner(client, **options):
+    return ParallelScanner(TABLE_NAME, total_segments=args.segments, page_size=args.page_size, client=client,
+                           scan_params={'ProjectionExpression': 'PK'}, **options)
+
+class Checks:
+    """Prints one line per check and counts the failures"""
+
+    def __init__(self):
+        self.failed = 0
+
+    def check(self, name, passed, detail):
+        self.failed += not passed
+        print(f"{'ok' if passed else 'FAIL':<6}{name:<56}{detail}")
+
+def check_exactly_once(checks, db, expected):
+    """Both ways of consuming a scan see every item once"""
+    counts = Counter(item['PK'] for item in make_scanner(RecordingClient(db)).iter_items())
+    duplicates = sum(count - 1 for count in counts.values())
+    checks.check("iter_items returns every item exactly once", set(counts) == expected and not duplicates,
+                 f"{len(counts)} of {len(expected)} items, {duplicates} duplicates")
+
+    seen = Counter()
+    lock = threading.Lock()
+
+    def collect(items, segment):
+        with lock:
+            seen.update(item['PK'] for item in items)
+
+    make_scanner(RecordingClient(db)).run(collect)
+    duplicates = sum(count - 1 for count in seen.values())
+    checks.check("run() hands every item to the callback exactly once", set(seen) == expected and not duplicates,
+                 f"{len(seen)} of {len(expected)} items, {duplicates} duplicates")
+
+def check_rate_limit(checks, db):
+    """
+    The limiter starts with one second of burst and charges a page after it
+    returns, so at most one page per worker can overshoot: over a run of t
+    seconds consumption stays under rcu * (t + 1) plus those pages
+    """
+    client = RecordingClient(db)
+    scanner = make_scanner(client, rcu_per_second=args.rcu)
+    started = time.monotonic()
+    scanner.run(lambda items, segment: None)
+    elapsed = time.monotonic() - started
+
+    consumed = sum(units for _, units in client.pages)
+    largest_page = max(units for _, units in client.pages)
+    allowed = args.rcu * (elapsed + 1) + scanner.max_workers * largest_page
+    # what the run averaged once the initial burst was spent
+    sustained = (consumed - args.rcu) / elapsed if elapsed else float('inf')
+
+    checks.check("scan needs more than the burst (check is meaningful)", consumed > 2 * args.rcu,
+                 f"{consumed:.1f} RCU consumed, budget {args.rcu:.0f}/s")
+    checks.check(f"consumed RCU stays within {args.rcu:.0f}/s", consumed <= allowed,
+                 f"{consumed:.1f} RCU in {elapsed:.2f}s (allowed {allowed:.1f}), ~{sustained:.0f}/s after the burst")
+
+def check_resume(checks, db, expected, checkpoint_dir):
+    """A run() stopped by a failing callback resumes without repeating handled pages"""
+    checkpoint_path = os.path.join(checkpoint_dir, 'run.checkpoint.json')
+    handled = []
+    lock = threading.Lock()
+    stop_after = max(1, (len(expected) // args.page_size) // 3)
+
+    def fail_part_way(items, segment):
+        with lock:
+            if len(handled) >= stop_after:
+                raise RuntimeError("simulated failure")
+            handled.append([item['PK'] for item in items])
+
+    interrupted = make_scanner(RecordingClient(db), checkpoint_path=checkpoint_path)
+    try:
+        interrupted.run(fail_part_way)
+        failed = False
+    except RuntimeError:
+        failed = True
+    handled_items = {pk for page in handled for pk in page}
+
+    resumed = Counter(item['PK'] for item in
+                      make_scanner(RecordingClient(db), checkpoint_path=checkpoint_path).iter_items())
+    repeated = handled_items & set(resumed)
+
+    checks.check("interrupted run() checkpoints only handled pages",
+                 failed and interrupted.checkpoint.total_items() == len(handled_items),
+                 f"{len(handled)} pages / {len(handled_items)} items handled, "
+                 f"{interrupted.checkpoint.total_items()} checkpointed")
+    checks.check("resumed run skips every handled page",
+                 not repeated and set(resumed) | handled_items == expected and max(resumed.values()) == 1,
+                 f"{len(resumed)} items on resume, {len(repeated)} repeated, "
+                 f"{len(set(resumed) | handled_items)} of {len(expected)} covered")
+
+def check_early_close(checks, db, expected, checkpoint_dir):
+    """Closing iter_items stops the workers; a resumed scan repeats only the page being consumed"""
+    checkpoint_path = os.path.join(checkpoint_dir, 'iter.checkpoint.json')
+    client = RecordingClient(db)
+    scanner = make_scanner(client, checkpoint_path=checkpoint_path)
+    threads_before = threading.active_count()
+
+    items = scanner.iter_items()
+    taken = []
+    for item in items:
+        taken.append(item['PK'])
+        # stop part way through a page
+        if len(taken) == len(expected) // 4 + args.page_size // 2:
+            break
+    items.close()
+
+    calls_at_close = client.calls()
+    time.sleep(0.3)
+    calls_after = client.calls()
+    checkpointed = scanner.checkpoint.total_items()
+
+    checks.check("closing iter_items stops the workers",
+                 threading.active_count() == threads_before and calls_after == calls_at_close
+                 and scanner.checkpoint.pending_segments(),
+                 f"{threading.active_count() - threads_before} threads left, "
+                 f"{calls_after - calls_at_close} scans after close, "
+                 f"{len(scanner.checkpoint.pending_segments())} segments pending")
+
+    resumed = Counter(item['PK'] for item in
+                      make_scanner(RecordingClient(db), checkpoint_path=checkpoint_path).iter_items())
+    repeated = set(taken) & set(resumed)
+    # only the items of the page that was being consumed weren't checkpointed
+    checks.check("resumed iter_items repeats only the unfinished page",
+                 len(repeated) == len(taken) - checkpointed and len(repeated) < args.page_size
+                 and set(resumed) | set(taken) == expected and max(resumed.values()) == 1,
+                 f"{len(taken)} taken, {checkpointed} checkpointed, {len(repeated)} repeated on resume")
+
+if __name__ == "__main__":
+    print(f"Seeding {args.items} items of ~{args.item_bytes} bytes "
+          f"({args.segments} segments, page size {args.page_size})...\n")
+    db, expected = seed_table()
+    checks = Checks()
+    checkpoint_dir = tempfile.mkdtemp(prefix='parallel-scan-check-')
+
+    check_exactly_once(checks, db, expected)
+    check_rate_limit(checks, db)
+    check_resume(checks, db, expected, checkpoint_dir)
+    check_early_close(checks, db, expected, checkpoint_dir)
+
+    if checks.failed:
+        print(f"\n{checks.failed} checks failed")
+        sys.exit(1)
+    print("\nAll checks passed")
@@ -0,0 +1,686 @@
+#!/usr/bin/env python3
+"""
+Load harness for the Lambda handlers, run entirely offline.
+Fills the in-memory DynamoDB stand-in (local_dynamodb.py) with a single-table
+dataset - users, applications with channels, authorizations, sessions and
+orders - through the backends' own repositories. It then calls the real
+handler functions of the SSO, client and admin backends from a thread pool.
+
+Tokens are signed with a locally generated RSA key whose JWKS is installed in
+each backend's JWKS cache. Cognito is replaced by a small in-process stand-in
+(token refresh, admin user lookups). boto3.resource / boto3.client are
+redirected to the stand-ins, so services the handlers create per call are
+covered too.
+
+For every endpoint it reports p50/p95/p99 latency, status codes, and the
+DynamoDB calls and simulated RCU/WCU per request, and how many requests went
+over the handler's io budget (@track_io), so an access pattern that turns
+into a scan shows up here instead of in production:
+
+    python load_harness.py --users 2000 --requests 500 --concurrency 16
+    python load_harness.py --endpoints get_session,get_orders --latency-ms 4 --json results.json
+    python load_harness.py --http-deployment router
+
+Requests run as threads in one process: they share the table and its
+simulated latency, but not CPU, so the numbers compare access patterns and
+relative cost, not absolute Lambda latency.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import boto3
+from botocore.exceptions import ClientError
+
+from local_dynamodb import LocalDynamoDB, MAX_PAGE_BYTES
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_ROOT = os.path.join(REPO_ROOT, 'backend')
+USER_POOL_ID = 'ap-southeast-2_loadtest'
+APP_CLIENT_ID = 'loadtest-client'
+REGION = 'ap-southeast-2'
+ISSUER = f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}"
+JWKS_URL = f"{ISSUER}/.well-known/jwks.json"
+KID = 'loadtest-key'
+MAIN_TABLE = 'matt-cognito-hop-main'
+ORDERS_TABLE = 'matt-cognito-hop-orders'
+
+# Where each backend's modules are imported from (admin imports them as app.*)
+BACKEND_PATHS = {
+    'sso_backend': os.path.join(BACKEND_ROOT, 'sso_backend', 'app'),
+    'client_backend': os.path.join(BACKEND_ROOT, 'client_backend', 'app'),
+    'admin_backend': os.path.join(BACKEND_ROOT, 'admin_backend')
+}
+JWKS_CACHE_MODULES = {
+    'sso_backend': 'services.auth.jwks_cache',
+    'client_backend': 'services.auth.jwks_cache',
+    'admin_backend': 'app.services.auth.jwks_cache'
+}
+
+class TokenFactory:
+    """Signs Cognito-shaped ID and access tokens with a local RSA key"""
+
+    def __init__(self, key_size=2048):
+        import rsa
+        from jose import jwk
+
+        public_key, private_key = rsa.newkeys(key_size)
+        # parse the private key once, jose would re-read the PEM for every token otherwise
+        self.signing_key = jwk.construct(private_key.save_pkcs1().decode('utf-8'), 'RS256')
+        public_jwk = jwk.construct(public_key.save_pkcs1().decode('utf-8'), 'RS256').to_dict()
+        public_jwk.update({'kid': KID, 'alg': 'RS256', 'use': 'sig'})
+        self.jwks = {'keys': [public_jwk]}
+
+    def _sign(self, claims):
+        from jose import jwt
+        return jwt.encode(claims, self.signing_key, algorithm='RS256', headers={'kid': KID})
+
+    def tokens_for(self, user, expires_in=3600):
+        """
+        Returns:
+            dict: id_token, access_token, refresh_token and expires_in, as Cognito hands them out
+        """
+        now = int(time.time())
+        id_claims = {
+            'sub': user['sub'],
+            'email': user['email'],
+            'name': user['name'],
+            'email_verified': True,
+            'aud': APP_CLIENT_ID,
+            'iss': ISSUER,
+            'token_use': 'id',
+            'cognito:username': user['username'],
+            'iat': now,
+            'exp': now + expires_in
+        }
+        if user.get('is_admin'):
+            id_claims['custom:is_admin'] = 'true'
+
+        return {
+            'id_token': self._sign(id_claims),
+            'access_token': self._sign({
+                'sub': user['sub'], 'client_id': APP_CLIENT_ID, 'iss': ISSUER,
+                'token_use': 'access', 'username': user['username'], 'iat': now, 'exp': now + expires_in
+            }),
+            'refresh_token': f"refresh-{user['sub']}",
+            'token_type': 'Bearer',
+            'expires_in': expires_in
+        }
+
+class LocalCognito:
+    """
+    Stand-in for boto3.client('cognito-idp') covering the calls the handlers make:
+    token refresh, admin user lookups and the admin user actions.
+    """
+
+    def __init__(self, token_factory, latency_ms=0):
+        self.token_factory = token_factory
+        self.latency_ms = latency_ms
+        self.users = {}
+        self.users_by_sub = {}
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._trackers = threading.local()
+
+        class UserNotFoundException(ClientError):
+            pass
+
+        self.exceptions = SimpleNamespace(UserNotFoundException=UserNotFoundException)
+
+    def add_user(self, user):
+        self.users[user['username']] = user
+        self.users_by_sub[user['sub']] = user
+
+    @contextlib.contextmanager
+    def track(self):
+        """Count the calls made by the current thread inside the block"""
+        counts = {}
+        self._trackers.active = counts
+        try:
+            yield counts
+        finally:
+            self._trackers.active = None
+
+    def call_counts(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def _call(self, operation):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        with self._lock:
+            self._counts[operation] = self._counts.get(operation, 0) + 1
+        active = getattr(self._trackers, 'active', None)
+        if active is not None:
+            active[operation] = active.get(operation, 0) + 1
+
+    def _user(self, username, operation):
+        user = self.users.get(username)
+        if user is None:
+            raise self.exceptions.UserNotFoundException(
+                {'Error': {'Code': 'UserNotFoundException', 'Message': 'User does not exist.'}}, operation
+            )
+        return user
+
+    @staticmethod
+    def _attributes(user):
+        return [
+            {'Name': 'sub', 'Value': user['sub']},
+            {'Name': 'email', 'Value': user['email']},
+            {'Name': 'name', 'Value': user['name']},
+            {'Name': 'email_verified', 'Value': 'true'}
+        ]
+
+    def _user_record(self, user, attributes_key):
+        return {
+            'Username': user['username'],
+            'UserStatus': 'CONFIRMED',
+            'Enabled': user.get('enabled', True),
+            'UserCreateDate': user['created_at'],
+            'UserLastModifiedDate': user['created_at'],
+            attributes_key: self._attributes(user)
+        }
+
+    def initiate_auth(self, ClientId, AuthFlow, AuthParameters, **kwargs):
+        self._call('InitiateAuth')
+        user = self.users_by_sub.get(AuthParameters.get('REFRESH_TOKEN', '').replace('refresh-', '', 1))
+        if AuthFlow != 'REFRESH_TOKEN_AUTH' or user is None:
+            raise ClientError({'Error': {'Code': 'NotAuthorizedException', 'Message': 'Invalid Refresh Token'}},
+                              'InitiateAuth')
+        # reuse the user's pre-signed tokens, so signing doesn't count as handler time
+        tokens = user.get('tokens') or self.token_factory.tokens_for(user)
+        return {'AuthenticationResult': {
+            'IdToken': tokens['id_token'],
+            'AccessToken': tokens['access_token'],
+            'TokenType': 'Bearer',
+            'ExpiresIn': tokens['expires_in']
+        }}
+
+    def list_users(self, UserPoolId, Limit=60, PaginationToken=None, Filter=None, **kwargs):
+        self._call('ListUsers')
+        usernames = sorted(self.users)
+        if Filter and Filter.startswith('sub = '):
+            user = self.users_by_sub.get(Filter.split('"')[1])
+            usernames = [user['username']] if user else []
+        start = int(PaginationToken or 0)
+        page = usernames[start:start + Limit]
+        response = {'Users': [self._user_record(self.users[username], 'Attributes') for username in page]}
+        if start + Limit < len(usernames):
+            response['PaginationToken'] = str(start + Limit)
+        return response
+
+    def admin_get_user(self, UserPoolId, Username):
+        self._call('AdminGetUser')
+        return self._user_record(self._user(Username, 'AdminGetUser'), 'UserAttributes')
+
+    def get_user(self, AccessToken):
+        self._call('GetUser')
+        raise ClientError({'Error': {'Code': 'NotAuthorizedException', 'Message': 'Not supported locally'}}, 'GetUser')
+
+    def admin_update_user_attributes(self, UserPoolId, Username, UserAttributes):
+        self._call('AdminUpdateUserAttributes')
+        self._user(Username, 'AdminUpdateUserAttributes')
+        return {}
+
+    def update_user_attributes(self, UserAttributes, AccessToken):
+        self._call('UpdateUserAttributes')
+        return {}
+
+    def admin_reset_user_password(self, UserPoolId, Username):
+        self._call('AdminResetUserPassword')
+        self._user(Username, 'AdminResetUserPassword')
+        return {}
+
+    def admin_disable_user(self, UserPoolId, Username):
+        self._call('AdminDisableUser')
+        self._user(Username, 'AdminDisableUser')['enabled'] = False
+        return {}
+
+    def admin_enable_user(self, UserPoolId, Username):
+        self._call('AdminEnableUser')
+        self._user(Username, 'AdminEnableUser')['enabled'] = True
+        return {}
+
+    def admin_delete_user(self, UserPoolId, Username):
+        self._call('AdminDeleteUser')
+        user = self._user(Username, 'AdminDeleteUser')
+        self.users.pop(Username, None)
+        self.users_by_sub.pop(user['sub'], None)
+        return {}
+
+@contextlib.contextmanager
+def local_aws(db, cognito):
+    """Make boto3.resource('dynamodb') and boto3.client('cognito-idp') return the stand-ins"""
+    original_resource, original_client = boto3.resource, boto3.client
+
+    def resource(service_name, *args, **kwargs):
+        return db if service_name == 'dynamodb' else original_resource(service_name, *args, **kwargs)
+
+    def client(service_name, *args, **kwargs):
+        return cognito if service_name == 'cognito-idp' else original_client(service_name, *args, **kwargs)
+
+    boto3.resource, boto3.client = resource, client
+    try:
+        yield
+    finally:
+        boto3.resource, boto3.client = original_resource, original_client
+
+def _purge_backend_modules():
+    """Forget every module imported from backend/, so the next backend's services/ etc. load cleanly"""
+    stale = []
+    for name, module in list(sys.modules.items()):
+        # namespace packages (no __init__.py) have no __file__, only a __path__
+        paths = [getattr(module, '__file__', None) or ''] + list(getattr(module, '__path__', None) or [])
+        if any(path.startswith(BACKEND_ROOT) for path in paths):
+            stale.append(name)
+    for name in stale:
+        del sys.modules[name]
+
+@contextlib.contextmanager
+def backend(name, token_factory):
+    """
+    Import modules from one backend for the duration of the block.
+    The backends share top-level package names (services, domains, utils), so
+    only one of them is importable at a time.
+
+    Yields:
+        callable: import_module for that backend, with the local JWKS installed
+    """
+    import importlib
+
+    _purge_backend_modules()
+    sys.path.insert(0, BACKEND_PATHS[name])
+
+    def import_module(module_name):
+        module = importlib.import_module(module_name)
+        # services are built lazily, so load the JWKS cache here even if the handler hasn't yet
+        jwks_cache = importlib.import_module(JWKS_CACHE_MODULES[name])
+        jwks_cache.JWKSCache.for_url(JWKS_URL)._install(token_factory.jwks, time.time())
+        return module
+
+    try:
+        yield import_module
+    finally:
+        sys.path.remove(BACKEND_PATHS[name])
+        _purge_backend_modules()
+
+class Dataset:
+    """The generated users, applications, sessions and orders, as the scenarios need them"""
+
+    def __init__(self):
+        self.users = []
+        self.applications = []
+        self.admin = None
+
+def generate_dataset(db, cognito, token_factory, args, rng):
+    """
+    Write the dataset through the backends' repositories, so it has exactly the
+    shape (keys, GSI attributes, ttl) the handlers expect.
+
+    Returns:
+        Dataset: What was generated
+    """
+    dataset = Dataset()
+
+    with backend('sso_backend', token_factory) as import_module:
+        dynamodb_module = import_module('services.aws.dynamodb_service')
+        user_repository_module = import_module('services.repositories.user_repository')
+        application_repository_module = import_module('services.repositories.application_repository')
+        session_repository_module = import_module('services.repositories.session_repository')
+
+        dynamodb_service = dynamodb_module.DynamoDBService()
+        user_repository = user_repository_module.UserRepository(dynamodb_service)
+        application_repository = application_repository_module.ApplicationRepository(dynamodb_service)
+        session_repository = session_repository_module.SessionRepository(dynamodb_service)
+
+        for number in range(args.applications):
+            application_id = f"app-{number:04d}"
+            channels = [
+                {'channel_id': f"channel-{channel}", 'return_url': f"https://{application_id}.example.com/callback/{channel}"}
+                for channel in range(args.channels)
+            ]
+            dynamodb_service.put_item({
+                'PK': f"application-{application_id}",
+                'SK': 'application',
+                'application_id': application_id,
+                'name': f"Application {number}",
+                'channels': channels,
+                'created_at': datetime.now().isoformat()
+            })
+            dataset.applications.append({'application_id': application_id, 'channels': channels})
+
+        for number in range(args.users + 1):
+            sub = str(uuid.UUID(int=rng.getrandbits(128)))
+            email = f"user{number}@loadtest.example.com"
+            user_id, _ = user_repository.create_user({'sub': sub, 'email': email, 'name': f"Load User {number}"})
+            user = {
+                'user_id': user_id,
+                'username': user_id.replace('user-', '', 1),
+                'sub': sub,
+                'email': email,
+                'name': f"Load User {number}",
+                'created_at': datetime.now(),
+                'is_admin': number == args.users
+            }
+            cognito.add_user(user)
+            user['tokens'] = token_factory.tokens_for(user)
+
+            if user['is_admin']:
+                # one extra user holds the admin token and stays out of the user scenarios
+                dataset.admin = user
+                continue
+
+            applications = rng.sample(dataset.applications, min(args.apps_per_user, len(dataset.applications)))
+            user['application_ids'] = [application['application_id'] for application in applications]
+            for application_id in user['application_ids']:
+                application_repository.create_app_user_relationship(application_id, user_id)
+                application_repository.create_user_authorization(application_id, user_id, ['openid', 'email', 'profile'])
+
+            user['session_ids'] = []
+            for _ in range(args.sessions_per_user):
+                session_id = session_repository.create_session(
+                    user_id, user['tokens'], rng.choice(user['application_ids']), {'user_agent': 'load-harness'}
+                )
+                if rng.random() < args.expiring_fraction:
+                    # about to expire, so /get-session has to refresh it through Cognito
+                    expires_at = (datetime.now() + timedelta(minutes=2)).isoformat()
+                    session_repository.update_session_tokens(session_id, user['tokens'], expires_at)
+                user['session_ids'].append(session_id)
+
+            dataset.users.append(user)
+
+    with backend('client_backend', token_factory) as import_module:
+        dynamodb_module = import_module('services.aws.dynamodb_service')
+        order_repository_module = import_module('services.repositories.order_repository')
+        order_repository = order_repository_module.OrderRepository(dynamodb_module.DynamoDBService())
+
+        for user in dataset.users:
+            for _ in range(args.orders_per_user):
+                order_repository.create_order(user['user_id'], {
+                    'item_name': rng.choice(['coffee', 'tea', 'bagel', 'muffin']),
+                    'quantity': rng.randint(1, 5),
+                    'price_per_item': rng.choice([120, 95.5, 150, 60])
+                })
+
+    return dataset
+
+def _auth_headers(user):
+    return {'Authorization': f"Bearer {user['tokens']['id_token']}", 'User-Agent': 'load-harness'}
+
+# endpoint -> (backend, handler path as in serverless.yml, event factory(dataset, rng))
+SCENARIOS = {
+    'validate_app_channel': ('sso_backend', 'handlers.http.validate_app_channel.handler', lambda dataset, rng: (
+        lambda application: {'queryStringParameters': {
+            'application_id': application['application_id'],
+            'channel_id': rng.choice(application['channels'])['channel_id']
+        }}
+    )(rng.choice(dataset.applications))),
+    'check_app_user': ('sso_backend', 'handlers.http.check_app_user.handler', lambda dataset, rng: (
+        lambda user: {'headers': _auth_headers(user),
+                      'queryStringParameters': {'application_id': rng.choice(user['application_ids'])}}
+    )(rng.choice(dataset.users))),
+    'init_session': ('sso_backend', 'handlers.http.init_session.handler', lambda dataset, rng: (
+        lambda user: {'headers': _auth_headers(user), 'body': json.dumps({
+            'tokens': user['tokens'], 'application_id': rng.choice(user['application_ids'])
+        })}
+    )(rng.choice(dataset.users))),
+    'get_session': ('sso_backend', 'handlers.http.get_session.handler', lambda dataset, rng: {
+        'queryStringParameters': {'session_id': rng.choice(rng.choice(dataset.users)['session_ids'])}
+    }),
+    'get_user_sessions': ('sso_backend', 'handlers.http.get_user_sessions.lambda_handler', lambda dataset, rng: {
+        'headers': _auth_headers(rng.choice(dataset.users)), 'queryStringParameters': None
+    }),
+    'get_user_authorizations': ('sso_backend', 'handlers.http.get_user_authorizations.handler', lambda dataset, rng: {
+        'headers': _auth_headers(rng.choice(dataset.users))
+    }),
+    'get_orders': ('client_backend', 'handlers.http.get_orders.handler', lambda dataset, rng: {
+        'headers': _auth_headers(rng.choice(dataset.users))
+    }),
+    'create_order': ('client_backend', 'handlers.http.create_order.handler', lambda dataset, rng: {
+        'headers': _auth_headers(rng.choice(dataset.users)),
+        'body': json.dumps({'item_name': 'coffee', 'quantity': 2, 'price_per_item': 120})
+    }),
+    'list_users': ('admin_backend', 'app.handlers.http.list_users.handler', lambda dataset, rng: {
+        'headers': _auth_headers(dataset.admin), 'queryStringParameters': {'limit': '25'}
+    }),
+    'get_user': ('admin_backend', 'app.handlers.http.get_user.handler', lambda dataset, rng: {
+        'headers': _auth_headers(dataset.admin),
+        'pathParameters': {'user_id': rng.choice(dataset.users)['username']}
+    })
+}
+
+class LambdaContext:
+    """Enough of the Lambda context object for the handlers"""
+
+    def __init__(self, function_name, timeout_ms=10000):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def budget_violations(budget, usage, cognito_calls):
+    """
+    Check one request against the handler's io budget (the @track_io argument).
+    The stand-ins have no botocore event hooks, so the handler's own recorder
+    sees nothing here - the counts come from the stand-ins instead.
+
+    Returns:
+        list: Violations, empty when the request stayed within budget
+    """
+    violations = []
+    if budget is None:
+        return violations
+    if usage.total['calls'] > budget.get('dynamodb', 0):
+        violations.append('dynamodb')
+    if sum(cognito_calls.values()) > budget.get('cognito', 0):
+        violations.append('cognito')
+    forbidden = set(budget.get('forbid', ()))
+    if any(key.rsplit('.', 1)[-1] in forbidden for key in usage.operations):
+        violations.append('forbidden')
+    return violations
+
+def through_router(router, module_name, function_name):
+    """
+    Send a scenario's events through the SSO router (--http-deployment router)
+    instead of calling its handler directly
+
+    Returns:
+        callable: Handler taking the scenario's events, with the route's io budget
+    """
+    route = (module_name.rsplit('.', 1)[1], function_name)
+    route_key = next(key for key, target in router.ROUTES.items() if target == route)
+
+    def handler(event, context):
+        return router.handler(dict(event, routeKey=route_key), context)
+
+    handler.io_budget = getattr(router.get_route_handler(route_key), 'io_budget', None)
+    return handler
+
+def run_endpoint(name, handler, dataset, db, cognito, args, seed):
+    """
+    Call one handler args.requests times from args.concurrency threads.
+
+    Returns:
+        dict: Latency percentiles, status codes and per-request DynamoDB / Cognito cost
+    """
+    _, _, make_event = SCENARIOS[name]
+    budget = getattr(handler, 'io_budget', None)
+    rng = random.Random(seed)
+    events = [make_event(dataset, rng) for _ in range(args.requests)]
+    results = []
+    results_lock = threading.Lock()
+
+    def invoke(event):
+        with db.track() as usage, cognito.track() as cognito_calls:
+            start = time.perf_counter()
+            try:
+                status = handler(event, LambdaContext(name)).get('statusCode', 0)
+            except Exception as e:
+                status = f"raised {type(e).__name__}"
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        with results_lock:
+            results.append((elapsed_ms, status, usage.total, sum(cognito_calls.values()),
+                            budget_violations(budget, usage, cognito_calls)))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(invoke, events))
+    wall_seconds = time.perf_counter() - started
+
+    latencies = sorted(result[0] for result in results)
+    statuses = {}
+    for result in results:
+        statuses[str(result[1])] = statuses.get(str(result[1]), 0) + 1
+    count = len(results)
+
+    return {
+        'requests': count,
+        'throughput_rps': round(count / wall_seconds, 1) if wall_seconds else None,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+        'status_codes': statuses,
+        'dynamodb_calls_per_request': round(sum(result[2]['calls'] for result in results) / count, 2),
+        'items_scanned_per_request': round(sum(result[2]['scanned'] for result in results) / count, 1),
+        'rcu_per_request': round(sum(result[2]['rcu'] for result in results) / count, 2),
+        'wcu_per_request': round(sum(result[2]['wcu'] for result in results) / count, 2),
+        'throttled': sum(result[2]['throttled'] for result in results),
+        'cognito_calls_per_request': round(sum(result[3] for result in results) / count, 2),
+        'io_budget': budget,
+        'over_budget': sum(1 for result in results if result[4])
+    }
+
+def print_report(report):
+    """Print the per-endpoint results as a table"""
+    columns = [
+        ('endpoint', 26), ('p50 ms', 9), ('p95 ms', 9), ('p99 ms', 9), ('req/s', 8),
+        ('ddb/req', 8), ('RCU/req', 9), ('WCU/req', 9), ('cognito', 8), ('over', 6), ('statuses', 20)
+    ]
+    print(''.join(f"{title:<{width}}" if index == 0 else f"{title:>{width}}"
+                  for index, (title, width) in enumerate(columns)))
+    for name, result in report['endpoints'].items():
+        statuses = ','.join(f"{code}x{count}" for code, count in sorted(result['status_codes'].items()))
+        values = [
+            name, result['p50_ms'], result['p95_ms'], result['p99_ms'], result['throughput_rps'],
+            result['dynamodb_calls_per_request'], result['rcu_per_request'], result['wcu_per_request'],
+            result['cognito_calls_per_request'], result['over_budget'] if result['io_budget'] else '-', statuses
+        ]
+        print(''.join(f"{value:<{width}}" if index == 0 else f"{value:>{width}}"
+                      for index, ((_, width), value) in enumerate(zip(columns, values))))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Drive the Lambda handlers against a local DynamoDB stand-in')
+    parser.add_argument('--users', type=int, default=500, help='Users to generate')
+    parser.add_argument('--applications', type=int, default=20, help='Applications to generate')
+    parser.add_argument('--channels', type=int, default=3, help='Channels per application')
+    parser.add_argument('--apps-per-user', type=int, default=3, help='Applications each user is authorized for')
+    parser.add_argument('--sessions-per-user', type=int, default=3, help='Sessions per user')
+    parser.add_argument('--orders-per-user', type=int, default=5, help='Orders per user')
+    parser.add_argument('--expiring-fraction', type=float, default=0.1,
+                        help='Share of sessions that expire within the refresh window')
+    parser.add_argument('--endpoints', default=','.join(SCENARIOS), help='Comma separated endpoints to run')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Simulated DynamoDB round trip')
+    parser.add_argument('--latency-jitter-ms', type=float, default=0, help='Random extra DynamoDB latency')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Chance a DynamoDB request is throttled')
+    parser.add_argument('--page-size-bytes', type=int, default=MAX_PAGE_BYTES, help='Query/Scan page size')
+    parser.add_argument('--cognito-latency-ms', type=float, default=0, help='Simulated Cognito round trip')
+    parser.add_argument('--key-size', type=int, default=2048, help='RSA key size for the signed tokens')
+    parser.add_argument('--http-deployment', choices=['per-function', 'router'], default='per-function',
+                        help='Call the SSO HTTP handlers directly or through the single-function router')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the dataset and requests')
+    parser.add_argument('--json', dest='json_path', default=None, help='Also write the report to this file')
+    parser.add_argument('--verbose', action='store_true', help="Show the handlers' own log output")
+    args = parser.parse_args()
+
+    endpoints = [name.strip() for name in args.endpoints.split(',') if name.strip()]
+    unknown = [name for name in endpoints if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    # The handlers read their configuration from the environment, like in the Lambdas
+    os.environ.update({
+        'COGNITO_USER_POOL_ID': USER_POOL_ID,
+        'COGNITO_APP_CLIENT_ID': APP_CLIENT_ID,
+        'COGNITO_CLIENT_ID': APP_CLIENT_ID,
+        'AWS_REGION': REGION,
+        'AWS_DEFAULT_REGION': REGION,
+        'MAIN_TABLE': MAIN_TABLE,
+        'ORDERS_TABLE': ORDERS_TABLE,
+        'JWKS_CACHE_DIR': tempfile.mkdtemp(prefix='load-harness-jwks-')
+    })
+
+    rng = random.Random(args.seed)
+    print(f"Generating RSA-{args.key_size} signing key...", file=sys.stderr)
+    token_factory = TokenFactory(args.key_size)
+    db = LocalDynamoDB(seed=args.seed)
+    cognito = LocalCognito(token_factory)
+    handler_output = sys.stdout if args.verbose else io.StringIO()
+
+    with local_aws(db, cognito):
+        print(f"Generating {args.users} users...", file=sys.stderr)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            dataset = generate_dataset(db, cognito, token_factory, args, rng)
+        print(f"Loaded {db.item_count(MAIN_TABLE)} main table and {db.item_count(ORDERS_TABLE)} orders items "
+              f"in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        # only the requests themselves pay simulated latency and throttling
+        db.latency_ms = args.latency_ms
+        db.latency_jitter_ms = args.latency_jitter_ms
+        db.throttle_rate = args.throttle_rate
+        db.page_size_bytes = args.page_size_bytes
+        cognito.latency_ms = args.cognito_latency_ms
+        db.reset_stats()
+
+        report = {'config': vars(args), 'endpoints': {}}
+        for backend_name in BACKEND_PATHS:
+            names = [name for name in endpoints if SCENARIOS[name][0] == backend_name]
+            if not names:
+                continue
+
+            with backend(backend_name, token_factory) as import_module:
+                for name in names:
+                    print(f"Running {name}...", file=sys.stderr)
+                    with contextlib.redirect_stdout(handler_output):
+                        module_name, function_name = SCENARIOS[name][1].rsplit('.', 1)
+                        handler = getattr(import_module(module_name), function_name)
+                        if args.http_deployment == 'router' and backend_name == 'sso_backend' \
+                                and module_name.startswith('handlers.http.'):
+                            handler = through_router(import_module('handlers.http.router'), module_name, function_name)
+                        report['endpoints'][name] = run_endpoint(
+                            name, handler, dataset, db, cognito, args, args.seed + list(SCENARIOS).index(name)
+                        )
+
+        report['dynamodb'] = db.stats()
+        report['cognito'] = cognito.call_counts()
+
+    print()
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nWrote {args.json_path}")
@@ -0,0 +1,1433 @@
+#!/usr/bin/env python3
+"""
+In-memory stand-in for DynamoDB, for running the repositories offline
+(benchmarks, capacity tests, load runs). It implements the part of the boto3
+DynamoDB resource that the DynamoDBService classes of all three backends call -
+Table.get_item / put_item / update_item / delete_item / query / scan /
+batch_writer, resource.batch_get_item and client.batch_write_item / scan - so the
+real DynamoDBService, every repository built on it and the maintenance scripts'
+ParallelScanner run unchanged on top of it:
+
+    from local_dynamodb import LocalDynamoDB, bind_service
+
+    db = LocalDynamoDB(latency_ms=5, throttle_rate=0.01, page_size_bytes=64 * 1024)
+    bind_service(session_repository.dynamodb_service, db)
+    ...
+    print(db.stats())
+
+Key conditions, filters, projections, update and condition expressions (strings
+or boto3 Key/Attr objects) are evaluated on the table and on GSI1/GSI2/GSI3.
+Every call records the capacity DynamoDB would charge for it: 4 KB read units
+(halved for eventually consistent reads) and 1 KB write units, plus the writes
+to each GSI the item is in. Queries and scans stop at page_size_bytes of
+evaluated data like the real 1 MB page limit.
+
+Not covered: transactions, streams, TTL deletion, LSIs and GSIs that do not
+project every attribute.
+
+Run it directly to compare the cost of a GSI query with a filtered scan:
+    python local_dynamodb.py --users 2000
+"""
+
+import argparse
+import bisect
+import copy
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from decimal import Decimal
+from functools import lru_cache
+from types import SimpleNamespace
+
+from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
+
+# The single-table layout every backend uses: PK/SK plus three overloaded GSIs
+DEFAULT_INDEXES = {
+    'GSI1': ('GSI1-PK', 'GSI1-SK'),
+    'GSI2': ('GSI2-PK', 'GSI2-SK'),
+    'GSI3': ('GSI3-PK', 'GSI3-SK')
+}
+
+READ_UNIT_BYTES = 4096
+WRITE_UNIT_BYTES = 1024
+MAX_PAGE_BYTES = 1024 * 1024
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_BYTES = 16 * 1024 * 1024
+BATCH_WRITE_MAX_REQUESTS = 25
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+# Marks an attribute path that is not in the item
+_MISSING = object()
+
+def client_error(code, message, operation):
+    """A botocore ClientError shaped like the one the real service raises"""
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+def _validation_error(message, operation='Expression'):
+    return client_error('ValidationException', message, operation)
+
+def normalize(value):
+    """
+    Round-trip a Python value through the DynamoDB type system, as a real write
+    and read would: ints become Decimal, floats are rejected, and the result is
+    a copy that shares nothing with the caller's value.
+    """
+    return _deserializer.deserialize(_serializer.serialize(value))
+
+def normalize_item(item):
+    """normalize() every attribute of an item"""
+    return {name: normalize(value) for name, value in item.items()}
+
+def value_size(value):
+    """Bytes a value counts for in DynamoDB's item size"""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, Decimal):
+        return (len(value.as_tuple().digits) + 1) // 2 + 1
+    if isinstance(value, Binary):
+        return len(value.value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return 3 + sum(len(name.encode('utf-8')) + value_size(member) + 1 for name, member in value.items())
+    if isinstance(value, list):
+        return 3 + sum(value_size(member) + 1 for member in value)
+    if isinstance(value, (set, frozenset)):
+        return sum(value_size(member) for member in value)
+    return len(str(value))
+
+def item_size(item):
+    """Bytes an item counts for: attribute names plus values"""
+    if not item:
+        return 0
+    return sum(len(name.encode('utf-8')) + value_size(value) for name, value in item.items())
+
+def read_units(size, consistent_read):
+    """Read capacity for reading size bytes (at least one 4 KB unit)"""
+    units = max(1, math.ceil(size / READ_UNIT_BYTES))
+    return units if consistent_read else units / 2
+
+def write_units(size):
+    """Write capacity for writing size bytes (at least one 1 KB unit)"""
+    return max(1, math.ceil(size / WRITE_UNIT_BYTES))
+
+def _kind(value):
+    """DynamoDB type of a value, for comparisons and attribute_type()"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'BOOL'
+    if isinstance(value, str):
+        return 'S'
+    if isinstance(value, Decimal):
+        return 'N'
+    if isinstance(value, (Binary, bytes, bytearray)):
+        return 'B'
+    if isinstance(value, dict):
+        return 'M'
+    if isinstance(value, list):
+        return 'L'
+    if isinstance(value, (set, frozenset)):
+        member = next(iter(value), '')
+        return {'S': 'SS', 'N': 'NS', 'B': 'BS'}.get(_kind(member), 'SS')
+    return 'S'
+
+def _sort_value(value):
+    """Order key values the way DynamoDB does: numbers numerically, strings and binary bytewise"""
+    if value is None:
+        return (0, b'')
+    if isinstance(value, Decimal):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value.encode('utf-8'))
+    if isinstance(value, Binary):
+        return (3, bytes(value.value))
+    return (3, bytes(value))
+
+def _hash_value(value):
+    """Stable partition hash, used for scan order and scan segments"""
+    return zlib.crc32(repr(_sort_value(value)).encode('utf-8'))
+
+# ---------------------------------------------------------------------------
+# Expressions
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<number>\d+)"
+    r"|(?P<name>#?[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<value>:[A-Za-z0-9_]+)"
+    r"|(?P<op><>|<=|>=|[=<>(),.\[\]+-]))"
+)
+_COMPARATORS = {'=', '<>', '<', '<=', '>', '>='}
+_CONDITION_FUNCTIONS = {'attribute_exists', 'attribute_not_exists', 'attribute_type', 'begins_with', 'contains'}
+_UPDATE_CLAUSES = {'SET', 'REMOVE', 'ADD', 'DELETE'}
+
+class _Parser:
+    """Recursive descent parser for condition, update and projection expressions"""
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = _TOKEN_RE.match(expression, position)
+            if not match or match.end() == position:
+                raise _validation_error(f"Invalid expression: unexpected character at {position}: {self.expression}")
+            self.tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            position = match.end()
+        self.position = 0
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise _validation_error(f"Invalid expression: unexpected end of expression: {self.expression}")
+        self.position += 1
+        return token
+
+    def expect(self, text):
+        kind, value = self.next()
+        if value != text:
+            raise _validation_error(f"Invalid expression: expected '{text}' but found '{value}': {self.expression}")
+
+    def at_keyword(self, *words):
+        kind, value = self.peek()
+        return kind == 'name' and value.upper() in words
+
+    def at_end(self):
+        return self.peek()[0] is None
+
+    def finish(self):
+        if not self.at_end():
+            raise _validation_error(f"Invalid expression: unexpected token '{self.peek()[1]}': {self.expression}")
+
+    def path(self):
+        kind, value = self.next()
+        if kind != 'name':
+            raise _validation_error(f"Invalid expression: expected an attribute name, found '{value}': {self.expression}")
+        segments = [value]
+        while self.peek()[1] in ('.', '['):
+            if self.next()[1] == '.':
+                kind, value = self.next()
+                if kind != 'name':
+                    raise _validation_error(f"Invalid document path: {self.expression}")
+                segments.append(value)
+            else:
+                kind, value = self.next()
+                if kind != 'number':
+                    raise _validation_error(f"Invalid list index: {self.expression}")
+                segments.append(int(value))
+                self.expect(']')
+        return ('path', tuple(segments))
+
+    def operand(self):
+        kind, value = self.peek()
+        if kind == 'value':
+            self.next()
+            return ('value', value)
+        if kind == 'name' and value.lower() == 'size' and self.peek(1)[1] == '(':
+            self.next()
+            self.expect('(')
+            path = self.path()
+            self.expect(')')
+            return ('size', path)
+        return self.path()
+
+    # condition := or ; or := and (OR and)* ; and := not (AND not)* ; not := NOT not | primary
+    def condition(self):
+        node = self.conjunction()
+        while self.at_keyword('OR'):
+            self.next()
+            node = ('or', node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.at_keyword('AND'):
+            self.next()
+            node = ('and', node, self.negation())
+        return node
+
+    def negation(self):
+        if self.at_keyword('NOT'):
+            self.next()
+            return ('not', self.negation())
+        return self.primary()
+
+    def primary(self):
+        kind, value = self.peek()
+        if value == '(':
+            self.next()
+            node = self.condition()
+            self.expect(')')
+            return node
+
+        if kind == 'name' and value in _CONDITION_FUNCTIONS and self.peek(1)[1] == '(':
+            self.next()
+            self.expect('(')
+            arguments = [self.operand()]
+            while self.peek()[1] == ',':
+                self.next()
+                arguments.append(self.operand())
+            self.expect(')')
+            return ('function', value, tuple(arguments))
+
+        left = self.operand()
+        if self.at_keyword('BETWEEN'):
+            self.next()
+            low = self.operand()
+            if not self.at_keyword('AND'):
+                raise _validation_error(f"Invalid expression: BETWEEN needs AND: {self.expression}")
+            self.next()
+            return ('between', left, low, self.operand())
+
+        if self.at_keyword('IN'):
+            self.next()
+            self.expect('(')
+            options = [self.operand()]
+            while self.peek()[1] == ',':
+                self.next()
+                options.append(self.operand())
+            self.expect(')')
+            return ('in', left, tuple(options))
+
+        kind, comparator = self.next()
+        if comparator not in _COMPARATORS:
+            raise _validation_error(f"Invalid expression: expected a comparator, found '{comparator}': {self.expression}")
+        return ('compare', comparator, left, self.operand())
+
+    # update := (SET action, ... | REMOVE path, ... | ADD path value, ... | DELETE path value, ...)+
+    def update(self):
+        actions = []
+        seen = set()
+        while not self.at_end():
+            if not self.at_keyword(*_UPDATE_CLAUSES):
+                raise _validation_error(f"Invalid UpdateExpression: expected SET, REMOVE, ADD or DELETE: {self.expression}")
+            clause = self.next()[1].upper()
+            if clause in seen:
+                raise _validation_error(f"Invalid UpdateExpression: the {clause} section can only be used once")
+            seen.add(clause)
+
+            while True:
+                path = self.path()
+                if clause == 'SET':
+                    self.expect('=')
+                    actions.append(('set', path, self.set_value()))
+                elif clause == 'REMOVE':
+                    actions.append(('remove', path))
+                else:
+                    actions.append((clause.lower(), path, self.operand()))
+
+                if self.peek()[1] != ',':
+                    break
+                self.next()
+        if not actions:
+            raise _validation_error("Invalid UpdateExpression: the expression is empty")
+        return tuple(actions)
+
+    def set_value(self):
+        node = self.set_term()
+        if self.peek()[1] in ('+', '-'):
+            operator = self.next()[1]
+            node = ('plus' if operator == '+' else 'minus', node, self.set_term())
+        return node
+
+    def set_term(self):
+        kind, value = self.peek()
+        if kind == 'name' and value in ('if_not_exists', 'list_append') and self.peek(1)[1] == '(':
+            self.next()
+            self.expect('(')
+            first = self.path() if value == 'if_not_exists' else self.set_value()
+            self.expect(',')
+            second = self.set_value()
+            self.expect(')')
+            return (value, first, second)
+        return self.operand()
+
+    def projection(self):
+        paths = [self.path()[1]]
+        while self.peek()[1] == ',':
+            self.next()
+            paths.append(self.path()[1])
+        return tuple(paths)
+
+@lru_cache(maxsize=1024)
+def parse_condition(expression):
+    parser = _Parser(expression)
+    node = parser.condition()
+    parser.finish()
+    return node
+
+@lru_cache(maxsize=1024)
+def parse_update(expression):
+    parser = _Parser(expression)
+    actions = parser.update()
+    parser.finish()
+    return actions
+
+@lru_cache(maxsize=1024)
+def parse_projection(expression):
+    parser = _Parser(expression)
+    paths = parser.projection()
+    parser.finish()
+    return paths
+
+class _Context:
+    """ExpressionAttributeNames / ExpressionAttributeValues of one request"""
+
+    def __init__(self, names, values):
+        self.names = names
+        self.values = values
+
+    def name(self, segment):
+        if isinstance(segment, int) or not segment.startswith('#'):
+            return segment
+        if segment not in self.names:
+            raise _validation_error(f"An expression attribute name used in the document path is not defined; attribute name: {segment}")
+        return self.names[segment]
+
+    def path(self, segments):
+        return tuple(self.name(segment) for segment in segments)
+
+    def value(self, placeholder):
+        if placeholder not in self.values:
+            raise _validation_error(f"An expression attribute value used in expression is not defined; attribute value: {placeholder}")
+        return self.values[placeholder]
+
+def _get_path(item, path):
+    current = item
+    for segment in path:
+        if isinstance(segment, int):
+            if not isinstance(current, list) or segment >= len(current):
+                return _MISSING
+        elif not isinstance(current, dict) or segment not in current:
+            return _MISSING
+        current = current[segment]
+    return current
+
+def _set_path(item, path, value):
+    parent = _get_path(item, path[:-1])
+    last = path[-1]
+    if isinstance(last, int) and isinstance(parent, list):
+        if last < len(parent):
+            parent[last] = value
+        else:
+            parent.append(value)
+    elif isinstance(last, str) and isinstance(parent, dict):
+        parent[last] = value
+    else:
+        raise _validation_error("The document path provided in the update expression is invalid for update", 'UpdateItem')
+
+def _remove_path(item, path):
+    parent = _get_path(item, path[:-1])
+    last = path[-1]
+    if isinstance(last, int) and isinstance(parent, list) and last < len(parent):
+        del parent[last]
+    elif isinstance(last, str) and isinstance(parent, dict):
+        parent.pop(last, None)
+
+def _operand(node, item, context):
+    if node[0] == 'value':
+        return context.value(node[1])
+    if node[0] == 'size':
+        value = _get_path(item, context.path(node[1][1]))
+        if value is _MISSING or isinstance(value, (Decimal, bool)) or value is None:
+            return _MISSING
+        return Decimal(len(value.value) if isinstance(value, Binary) else len(value))
+    return _get_path(item, context.path(node[1]))
+
+def _compare(left, comparator, right):
+    if left is _MISSING or right is _MISSING:
+        return comparator == '<>'
+    same_kind = _kind(left) == _kind(right)
+    if comparator == '=':
+        return same_kind and left == right
+    if comparator == '<>':
+        return not (same_kind and left == right)
+    if not same_kind or _kind(left) not in ('S', 'N', 'B'):
+        return False
+    left, right = _sort_value(left), _sort_value(right)
+    return {
+        '<': left < right,
+        '<=': left <= right,
+        '>': left > right,
+        '>=': left >= right
+    }[comparator]
+
+def evaluate_condition(node, item, context):
+    """True if the item satisfies a parsed condition"""
+    kind = node[0]
+    if kind == 'and':
+        return evaluate_condition(node[1], item, context) and evaluate_condition(node[2], item, context)
+    if kind == 'or':
+        return evaluate_condition(node[1], item, context) or evaluate_condition(node[2], item, context)
+    if kind == 'not':
+        return not evaluate_condition(node[1], item, context)
+    if kind == 'compare':
+        return _compare(_operand(node[2], item, context), node[1], _operand(node[3], item, context))
+    if kind == 'between':
+        value = _operand(node[1], item, context)
+        return (_compare(value, '>=', _operand(node[2], item, context)) and
+                _compare(value, '<=', _operand(node[3], item, context)))
+    if kind == 'in':
+        value = _operand(node[1], item, context)
+        return any(_compare(value, '=', _operand(option, item, context)) for option in node[2])
+
+    name, arguments = node[1], node[2]
+    value = _operand(arguments[0], item, context)
+    if name == 'attribute_exists':
+        return value is not _MISSING
+    if name == 'attribute_not_exists':
+        return value is _MISSING
+    if value is _MISSING:
+        return False
+    other = _operand(arguments[1], item, context)
+    if name == 'attribute_type':
+        return _kind(value) == other
+    if name == 'begins_with':
+        if isinstance(value, str) and isinstance(other, str):
+            return value.startswith(other)
+        if _kind(value) == 'B' and _kind(other) == 'B':
+            return _sort_value(value)[1].startswith(_sort_value(other)[1])
+        return False
+    # contains
+    if isinstance(value, str):
+        return isinstance(other, str) and other in value
+    if isinstance(value, (set, frozenset, list)):
+        return other in value
+    return False
+
+def _set_value(node, item, context):
+    kind = node[0]
+    if kind in ('plus', 'minus'):
+        left = _set_value(node[1], item, context)
+        right = _set_value(node[2], item, context)
+        if not isinstance(left, Decimal) or not isinstance(right, Decimal) or isinstance(left, bool):
+            raise _validation_error("An operand in the update expression has an incorrect data type", 'UpdateItem')
+        return left + right if kind == 'plus' else left - right
+    if kind == 'if_not_exists':
+        existing = _get_path(item, context.path(node[1][1]))
+        return existing if existing is not _MISSING else _set_value(node[2], item, context)
+    if kind == 'list_append':
+        first = _set_value(node[1], item, context)
+        second = _set_value(node[2], item, context)
+        if not isinstance(first, list) or not isinstance(second, list):
+            raise _validation_error("An operand in the update expression has an incorrect data type", 'UpdateItem')
+        return first + second
+    value = _operand(node, item, context)
+    if value is _MISSING:
+        raise _validation_error("The provided expression refers to an attribute that does not exist in the item", 'UpdateItem')
+    return copy.deepcopy(value)
+
+def apply_update(actions, item, context):
+    """
+    Apply parsed update actions to a copy of an item.
+    Every right-hand side is evaluated against the item as it was before the update.
+
+    Returns:
+        tuple: (updated item, names of the top-level attributes the update touched)
+    """
+    updated = copy.deepcopy(item)
+    touched = set()
+
+    for action in actions:
+        path = context.path(action[1][1])
+        touched.add(path[0])
+
+        if action[0] == 'set':
+            _set_path(updated, path, _set_value(action[2], item, context))
+        elif action[0] == 'remove':
+            _remove_path(updated, path)
+        else:
+            value = context.value(action[2][1])
+            existing = _get_path(updated, path)
+            if action[0] == 'add':
+                if existing is _MISSING:
+                    _set_path(updated, path, copy.deepcopy(value))
+                elif isinstance(existing, Decimal) and isinstance(value, Decimal):
+                    _set_path(updated, path, existing + value)
+                elif isinstance(existing, set) and isinstance(value, set):
+                    _set_path(updated, path, existing | value)
+                else:
+                    raise _validation_error("An operand in the update expression has an incorrect data type", 'UpdateItem')
+            elif existing is not _MISSING:
+                if not isinstance(existing, set) or not isinstance(value, set):
+                    raise _validation_error("An operand in the update expression has an incorrect data type", 'UpdateItem')
+                if existing - value:
+                    _set_path(updated, path, existing - value)
+                else:
+                    _remove_path(updated, path)
+
+    return updated, touched
+
+def project(item, paths, context):
+    """Copy only the projected attributes of an item (nested map paths are kept as nested maps)"""
+    result = {}
+    for segments in paths:
+        path = context.path(segments)
+        value = _get_path(item, path)
+        if value is _MISSING:
+            continue
+        if any(isinstance(segment, int) for segment in path):
+            # list elements: keep the whole top-level attribute
+            result[path[0]] = copy.deepcopy(item[path[0]])
+            continue
+        target = result
+        for segment in path[:-1]:
+            target = target.setdefault(segment, {})
+        target[path[-1]] = copy.deepcopy(value)
+    return result
+
+def _partition_value(node, hash_key, context):
+    """The value a key condition pins the partition key to (None if it doesn't)"""
+    if node[0] == 'and':
+        return _partition_value(node[1], hash_key, context) or _partition_value(node[2], hash_key, context)
+    if node[0] == 'compare' and node[1] == '=':
+        left, right = node[2], node[3]
+        if left[0] == 'value':
+            left, right = right, left
+        if left[0] == 'path' and right[0] == 'value' and context.path(left[1]) == (hash_key,):
+            return (context.value(right[1]),)
+    return None
+
+def _key_attributes(node, context):
+    """Every attribute a key condition refers to"""
+    if node[0] == 'and':
+        return _key_attributes(node[1], context) | _key_attributes(node[2], context)
+    if node[0] in ('or', 'not', 'in'):
+        raise _validation_error("Invalid operator used in KeyConditionExpression", 'Query')
+    operands = node[2] if node[0] == 'function' else node[2:] if node[0] == 'compare' else node[1:]
+    return {context.path(operand[1])[0] for operand in operands if operand[0] == 'path'}
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+class _TableData:
+    """Items of one table plus the GSI entries that point at them (caller holds the db lock)"""
+
+    def __init__(self, name, hash_key, range_key, indexes):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.indexes = dict(indexes)
+        self.partitions = {}
+        self.index_partitions = {index: {} for index in self.indexes}
+        self.version = 0
+        self._scan_orders = {}
+
+    def key_names(self, index_name=None):
+        if index_name is None:
+            return self.hash_key, self.range_key
+        if index_name not in self.indexes:
+            raise _validation_error(f"The table does not have the specified index: {index_name}", 'Query')
+        return self.indexes[index_name]
+
+    def key_of(self, key, operation):
+        """(partition value, sort value) of a key dict, validated against the key schema"""
+        expected = {self.hash_key} | ({self.range_key} if self.range_key else set())
+        if set(key) != expected:
+            raise _validation_error("The provided key element does not match the schema", operation)
+        return key[self.hash_key], key.get(self.range_key) if self.range_key else None
+
+    def key_dict(self, item, index_name=None):
+        """The key attributes DynamoDB returns in LastEvaluatedKey / UnprocessedKeys"""
+        names = [self.hash_key, self.range_key]
+        if index_name:
+            names.extend(self.indexes[index_name])
+        return {name: item[name] for name in names if name and name in item}
+
+    def get(self, key):
+        partition = self.partitions.get(key[0])
+        return partition.get(key[1]) if partition else None
+
+    def _index_key(self, index_name, item):
+        hash_key, range_key = self.indexes[index_name]
+        if item is None or hash_key not in item or (range_key and range_key not in item):
+            return None
+        return item[hash_key], item.get(range_key) if range_key else None
+
+    def write(self, key, item):
+        """
+        Store (or with item=None delete) an item and keep its GSI entries in step.
+
+        Returns:
+            float: Write units for the GSI updates
+        """
+        old = self.get(key)
+        if item is None:
+            partition = self.partitions.get(key[0], {})
+            partition.pop(key[1], None)
+            if not partition:
+                self.partitions.pop(key[0], None)
+        else:
+            self.partitions.setdefault(key[0], {})[key[1]] = item
+
+        index_units = 0
+        for index_name, entries in self.index_partitions.items():
+            old_key, new_key = self._index_key(index_name, old), self._index_key(index_name, item)
+            if old_key is not None:
+                partition = entries.get(old_key[0], {})
+                partition.pop(key, None)
+                if not partition:
+                    entries.pop(old_key[0], None)
+            if new_key is not None:
+                entries.setdefault(new_key[0], {})[key] = item
+
+            # a key change is a delete plus a put in the index
+            if old_key is not None and new_key is not None:
+                index_units += write_units(item_size(item)) * (1 if old_key == new_key else 2)
+            elif old_key is not None:
+                index_units += write_units(item_size(old))
+            elif new_key is not None:
+                index_units += write_units(item_size(item))
+
+        self.version += 1
+        return index_units
+
+    def order_key(self, item, index_name=None):
+        """Position of an item in query order (sort key, then the table key to break ties)"""
+        table_order = (_sort_value(item.get(self.hash_key)), _sort_value(item.get(self.range_key)))
+        if index_name is None:
+            return table_order[1:]
+        hash_key, range_key = self.indexes[index_name]
+        return (_sort_value(item.get(range_key)),) + table_order
+
+    def scan_key(self, item, index_name=None):
+        """Position of an item in scan order (partitions in hash order)"""
+        hash_key = self.indexes[index_name][0] if index_name else self.hash_key
+        return (_hash_value(item.get(hash_key)), _sort_value(item.get(hash_key))) + self.order_key(item, index_name)
+
+    def query_items(self, index_name, partition_value):
+        """Items in one partition of the table or an index, in sort key order"""
+        if index_name is None:
+            items = self.partitions.get(partition_value, {}).values()
+        else:
+            items = self.index_partitions[index_name].get(partition_value, {}).values()
+        return sorted(((self.order_key(item, index_name), item) for item in items), key=lambda entry: entry[0])
+
+    def scan_items(self, index_name):
+        """Every item of the table or an index in scan order (cached until the next write)"""
+        cached = self._scan_orders.get(index_name)
+        if cached and cached[0] == self.version:
+            return cached[1]
+
+        if index_name is None:
+            items = (item for partition in self.partitions.values() for item in partition.values())
+        else:
+            items = (item for partition in self.index_partitions[index_name].values() for item in partition.values())
+        ordered = sorted(((self.scan_key(item, index_name), item) for item in items), key=lambda entry: entry[0])
+        self._scan_orders[index_name] = (self.version, ordered)
+        return ordered
+
+# ---------------------------------------------------------------------------
+# Capacity accounting
+# ---------------------------------------------------------------------------
+
+def _empty_counters():
+    return {'calls': 0, 'throttled': 0, 'items': 0, 'scanned': 0, 'rcu': 0.0, 'wcu': 0.0}
+
+class Usage:
+    """Calls and capacity recorded while a LocalDynamoDB.track() block was active"""
+
+    def __init__(self):
+        self.total = _empty_counters()
+        self.operations = {}
+
+    def add(self, operation_key, counters):
+        for target in (self.total, self.operations.setdefault(operation_key, _empty_counters())):
+            for name, value in counters.items():
+                target[name] += value
+
+    def as_dict(self):
+        return {
+            'total': dict(self.total),
+            'operations': {key: dict(value) for key, value in sorted(self.operations.items())}
+        }
+
+# ---------------------------------------------------------------------------
+# Resource, table and client stand-ins
+# ---------------------------------------------------------------------------
+
+class LocalDynamoDB:
+    """
+    Stand-in for boto3.resource('dynamodb').
+    Tables are created on first use with the single-table key schema
+    (PK/SK plus GSI1-GSI3) unless create_table() set them up differently.
+    """
+
+    def __init__(self, latency_ms=0, latency_jitter_ms=0, throttle_rate=0.0, page_size_bytes=MAX_PAGE_BYTES,
+                 max_page_items=None, max_attempts=3, seed=None):
+        """
+        Args:
+            latency_ms (float): Added to every request, like the network round trip
+            latency_jitter_ms (float): Up to this much more, picked at random per request
+            throttle_rate (float): Chance a request (or each key of a batch request) is throttled
+            page_size_bytes (int): Data a query/scan evaluates per page (DynamoDB: 1 MB)
+            max_page_items (int): Items evaluated per page regardless of Limit (optional)
+            max_attempts (int): Attempts before a throttled single-item request raises,
+                like the SDK's own retries (batch requests return unprocessed keys instead)
+            seed (int): Seed for the latency jitter and throttling (optional)
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.throttle_rate = throttle_rate
+        self.page_size_bytes = page_size_bytes
+        self.max_page_items = max_page_items
+        self.max_attempts = max_attempts
+        self._random = random.Random(seed)
+        self._tables = {}
+        self._lock = threading.RLock()
+        self._usage = Usage()
+        self._trackers = threading.local()
+        self.meta = SimpleNamespace(client=LocalDynamoDBClient(self))
+
+    # -- tables -------------------------------------------------------------
+
+    def create_table(self, name, hash_key='PK', range_key='SK', indexes=None):
+        """
+        Create (or replace) a table.
+
+        Args:
+            name (str): Table name
+            hash_key (str): Partition key attribute
+            range_key (str): Sort key attribute (None for a hash-only table)
+            indexes (dict): GSI name -> (hash key, range key) (default: GSI1-GSI3)
+
+        Returns:
+            LocalTable: The table
+        """
+        with self._lock:
+            self._tables[name] = _TableData(name, hash_key, range_key,
+                                            DEFAULT_INDEXES if indexes is None else indexes)
+        return LocalTable(self, name)
+
+    def Table(self, name):
+        """The named table (created with the default schema if it doesn't exist yet)"""
+        self._table_data(name)
+        return LocalTable(self, name)
+
+    def _table_data(self, name):
+        with self._lock:
+            if name not in self._tables:
+                self._tables[name] = _TableData(name, 'PK', 'SK', DEFAULT_INDEXES)
+            return self._tables[name]
+
+    def seed_items(self, table_name, items):
+        """
+        Load items straight into a table: no latency, throttling or capacity is recorded.
+
+        Args:
+            table_name (str): Table to load into
+            items (iterable): Items to store (later ones overwrite earlier ones with the same key)
+
+        Returns:
+            int: Items loaded
+        """
+        data = self._table_data(table_name)
+        count = 0
+        with self._lock:
+            for item in items:
+                item = normalize_item(item)
+                data.write(data.key_of(data.key_dict(item), 'PutItem'), item)
+                count += 1
+        return count
+
+    def item_count(self, table_name):
+        """Items currently in a table"""
+        data = self._table_data(table_name)
+        with self._lock:
+            return sum(len(partition) for partition in data.partitions.values())
+
+    # -- accounting ---------------------------------------------------------
+
+    def stats(self):
+        """
+        Returns:
+            dict: 'total' and per '<table>.<operation>' counters - calls, throttled,
+                items returned, items scanned, rcu and wcu
+        """
+        with self._lock:
+            return self._usage.as_dict()
+
+    def reset_stats(self):
+        """Zero every counter"""
+        with self._lock:
+            self._usage = Usage()
+
+    @contextmanager
+    def track(self):
+        """
+        Collect the calls made by the current thread inside the block (calls from
+        worker threads it starts are only in stats()):
+
+            with db.track() as usage:
+                handler(event, None)
+            print(usage.as_dict())
+        """
+        usage = Usage()
+        active = getattr(self._trackers, 'active', None)
+        if active is None:
+            active = self._trackers.active = []
+        active.append(usage)
+        try:
+            yield usage
+        finally:
+            active.remove(usage)
+
+    def _record(self, table_name, operation, **counters):
+        counters = dict(_empty_counters(), **counters)
+        operation_key = f"{table_name}.{operation}"
+        with self._lock:
+            self._usage.add(operation_key, counters)
+        for usage in getattr(self._trackers, 'active', None) or []:
+            usage.add(operation_key, counters)
+
+    # -- simulated network --------------------------------------------------
+
+    def _throttled(self):
+        return self.throttle_rate > 0 and self._random.random() < self.throttle_rate
+
+    def _round_trip(self, table_name, operation, throttle=True):
+        """
+        Wait out the simulated latency; with throttle=True retry throttled attempts
+        with backoff like the SDK does, raising once max_attempts are used up.
+        """
+        for attempt in range(max(1, self.max_attempts)):
+            delay_ms = self.latency_ms + (self._random.uniform(0, self.latency_jitter_ms) if self.latency_jitter_ms else 0)
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+
+            if not throttle or not self._throttled():
+                return
+
+            self._record(table_name, operation, throttled=1)
+            if attempt + 1 < self.max_attempts:
+                time.sleep(0.025 * (2 ** attempt) * self._random.uniform(0.5, 1.5))
+
+        raise client_error(
+            'ProvisionedThroughputExceededException',
+            'The level of configured provisioned throughput for the table was exceeded.',
+            operation
+        )
+
+    # -- batch operations ---------------------------------------------------
+
+    def batch_get_item(self, RequestItems, ReturnConsumedCapacity=None):
+        """BatchGetItem with Python values (resource interface)"""
+        total_keys = sum(len(request.get('Keys', [])) for request in RequestItems.values())
+        if total_keys > BATCH_GET_MAX_KEYS:
+            raise _validation_error("Too many items requested for the BatchGetItem call", 'BatchGetItem')
+
+        self._round_trip(next(iter(RequestItems), ''), 'BatchGetItem', throttle=False)
+        responses, unprocessed, consumed = {}, {}, []
+        response_bytes = 0
+
+        for table_name, request in RequestItems.items():
+            data = self._table_data(table_name)
+            context = _Context(request.get('ExpressionAttributeNames') or {}, {})
+            projection = parse_projection(request['ProjectionExpression']) if request.get('ProjectionExpression') else None
+            consistent = bool(request.get('ConsistentRead'))
+            keys = [data.key_of(key, 'BatchGetItem') for key in request.get('Keys', [])]
+            if len(set(keys)) != len(keys):
+                raise _validation_error("Provided list of item keys contains duplicates", 'BatchGetItem')
+
+            items, leftovers, units = [], [], 0
+            for key, raw_key in zip(keys, request.get('Keys', [])):
+                if self._throttled() or response_bytes > BATCH_GET_MAX_BYTES:
+                    leftovers.append(raw_key)
+                    continue
+                with self._lock:
+                    item = data.get(key)
+                    size = item_size(item)
+                    if item is not None:
+                        items.append(project(item, projection, context) if projection else copy.deepcopy(item))
+                units += read_units(size, consistent)
+                response_bytes += size
+
+            responses[table_name] = items
+            if leftovers:
+                unprocessed[table_name] = dict(request, Keys=leftovers)
+            consumed.append({'TableName': table_name, 'CapacityUnits': units})
+            self._record(table_name, 'BatchGetItem', calls=1, items=len(items), scanned=len(items),
+                         rcu=units, throttled=len(leftovers))
+
+        response = {'Responses': responses, 'UnprocessedKeys': unprocessed}
+        if ReturnConsumedCapacity in ('TOTAL', 'INDEXES'):
+            response['ConsumedCapacity'] = consumed
+        return response
+
+    def _batch_write(self, RequestItems, operation='BatchWriteItem'):
+        """
+        BatchWriteItem with Python values.
+
+        Returns:
+            dict: Requests left unprocessed by (simulated) throttling, per table
+        """
+        total_requests = sum(len(requests) for requests in RequestItems.values())
+        if total_requests > BATCH_WRITE_MAX_REQUESTS:
+            raise _validation_error(
+                "Too many items requested for the BatchWriteItem call", operation
+            )
+
+        self._round_trip(next(iter(RequestItems), ''), operation, throttle=False)
+        unprocessed = {}
+
+        for table_name, requests in RequestItems.items():
+            data = self._table_data(table_name)
+            keys = []
+            for request in requests:
+                if 'PutRequest' in request:
+                    keys.append(data.key_of(data.key_dict(request['PutRequest']['Item']), operation))
+                else:
+                    keys.append(data.key_of(request['DeleteRequest']['Key'], operation))
+            if len(set(keys)) != len(keys):
+                raise _validation_error("Provided list of item keys contains duplicates", operation)
+
+            leftovers, units = [], 0
+            for key, request in zip(keys, requests):
+                if self._throttled():
+                    leftovers.append(request)
+                    continue
+                with self._lock:
+                    old = data.get(key)
+                    if 'PutRequest' in request:
+                        item = normalize_item(request['PutRequest']['Item'])
+                        units += write_units(max(item_size(old), item_size(item))) + data.write(key, item)
+                    else:
+                        units += write_units(item_size(old)) + data.write(key, None)
+
+            if leftovers:
+                unprocessed[table_name] = leftovers
+            self._record(table_name, operation, calls=1, items=len(requests) - len(leftovers),
+                         wcu=units, throttled=len(leftovers))
+
+        return unprocessed
+
+class LocalDynamoDBClient:
+    """
+    Stand-in for the low-level client (resource.meta.client), which takes and
+    returns typed attribute values ({'S': ...}). Only batch_write_item (the
+    services) and scan (parallel_scan.ParallelScanner) are needed.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def _plain(values):
+        return {name: _deserializer.deserialize(value) for name, value in values.items()}
+
+    @staticmethod
+    def _typed(values):
+        return {name: _serializer.serialize(value) for name, value in values.items()}
+
+    def scan(self, TableName, **params):
+        """
+        Table.scan with typed ExpressionAttributeValues, ExclusiveStartKey, Items and
+        LastEvaluatedKey (Segment/TotalSegments, Limit, filters, projections and
+        ReturnConsumedCapacity work the same way)
+        """
+        if 'ExpressionAttributeValues' in params:
+            params['ExpressionAttributeValues'] = self._plain(params['ExpressionAttributeValues'])
+        if 'ExclusiveStartKey' in params:
+            params['ExclusiveStartKey'] = self._plain(params['ExclusiveStartKey'])
+
+        response = self.db.Table(TableName).scan(**params)
+        if 'Items' in response:
+            response['Items'] = [self._typed(item) for item in response['Items']]
+        if 'LastEvaluatedKey' in response:
+            response['LastEvaluatedKey'] = self._typed(response['LastEvaluatedKey'])
+        return response
+
+    def batch_write_item(self, RequestItems):
+        plain = {}
+        for table_name, requests in RequestItems.items():
+            plain[table_name] = []
+            for request in requests:
+                if 'PutRequest' in request:
+                    item = {name: _deserializer.deserialize(value) for name, value in request['PutRequest']['Item'].items()}
+                    plain[table_name].append({'PutRequest': {'Item': item}})
+                else:
+                    key = {name: _deserializer.deserialize(value) for name, value in request['DeleteRequest']['Key'].items()}
+                    plain[table_name].append({'DeleteRequest': {'Key': key}})
+
+        unprocessed = self.db._batch_write(plain)
+        typed = {}
+        for table_name, requests in unprocessed.items():
+            typed[table_name] = []
+            for request in requests:
+                body_name, field = ('PutRequest', 'Item') if 'PutRequest' in request else ('DeleteRequest', 'Key')
+                typed[table_name].append({body_name: {field: {
+                    name: _serializer.serialize(value) for name, value in request[body_name][field].items()
+                }}})
+        return {'UnprocessedItems': typed}
+
+class LocalBatchWriter:
+    """Stand-in for Table.batch_writer(): buffers writes and sends them 25 at a time"""
+
+    def __init__(self, table, overwrite_by_pkeys=None):
+        self.table = table
+        self.overwrite_by_pkeys = overwrite_by_pkeys
+        self._buffer = []
+
+    def put_item(self, Item):
+        self._add({'PutRequest': {'Item': Item}})
+
+    def delete_item(self, Key):
+        self._add({'DeleteRequest': {'Key': Key}})
+
+    def _add(self, request):
+        if self.overwrite_by_pkeys:
+            body = request.get('PutRequest', {}).get('Item') or request['DeleteRequest']['Key']
+            new_key = [body.get(name) for name in self.overwrite_by_pkeys]
+            self._buffer = [
+                existing for existing in self._buffer
+                if [(existing.get('PutRequest', {}).get('Item') or existing['DeleteRequest']['Key']).get(name)
+                    for name in self.overwrite_by_pkeys] != new_key
+            ]
+        self._buffer.append(request)
+        if len(self._buffer) >= BATCH_WRITE_MAX_REQUESTS:
+            self._flush()
+
+    def _flush(self):
+        requests = self._buffer[:BATCH_WRITE_MAX_REQUESTS]
+        self._buffer = self._buffer[BATCH_WRITE_MAX_REQUESTS:]
+        unprocessed = self.table.db._batch_write({self.table.name: requests})
+        # like boto3, unprocessed requests go back in the buffer for the next flush
+        self._buffer.extend(unprocessed.get(self.table.name, []))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        while self._buffer:
+            self._flush()
+
+class LocalTable:
+    """Stand-in for a boto3 Table resource"""
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    @property
+    def table_name(self):
+        return self.name
+
+    @property
+    def _data(self):
+        return self.db._table_data(self.name)
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return LocalBatchWriter(self, overwrite_by_pkeys)
+
+    def _prepare(self, params, *fields):
+        """
+        Render Key/Attr condition objects to strings (one builder per request, as
+        boto3 does) and collect the request's names and values.
+
+        Returns:
+            tuple: ({field: expression string or None}, _Context)
+        """
+        builder = ConditionExpressionBuilder()
+        names = dict(params.get('ExpressionAttributeNames') or {})
+        values = {placeholder: normalize(value)
+                  for placeholder, value in (params.get('ExpressionAttributeValues') or {}).items()}
+        expressions = {}
+
+        for field in fields:
+            expression = params.get(field)
+            if isinstance(expression, ConditionBase):
+                built = builder.build_expression(expression, is_key_condition=(field == 'KeyConditionExpression'))
+                names.update(built.attribute_name_placeholders)
+                values.update({placeholder: normalize(value)
+                               for placeholder, value in built.attribute_value_placeholders.items()})
+                expression = built.condition_expression
+            expressions[field] = expression
+
+        return expressions, _Context(names, values)
+
+    def _check_condition(self, expression, item, context, operation, size):
+        """Raise ConditionalCheckFailedException (charging the write) if the condition fails"""
+        if expression and not evaluate_condition(parse_condition(expression), item or {}, context):
+            self.db._record(self.name, operation, calls=1, wcu=write_units(size))
+            raise client_error('ConditionalCheckFailedException', 'The conditional request failed', operation)
+
+    @staticmethod
+    def _consumed(params, table_name, units):
+        if params.get('ReturnConsumedCapacity') in ('TOTAL', 'INDEXES'):
+            return {'ConsumedCapacity': {'TableName': table_name, 'CapacityUnits': units}}
+        return {}
+
+    def get_item(self, **params):
+        expressions, context = self._prepare(params)
+        data = self._data
+        key = data.key_of(params['Key'], 'GetItem')
+        projection = parse_projection(params['ProjectionExpression']) if params.get('ProjectionExpression') else None
+        consistent = bool(params.get('ConsistentRead'))
+        self.db._round_trip(self.name, 'GetItem')
+
+        with self.db._lock:
+            item = data.get(key)
+            size = item_size(item)
+            if item is not None:
+                item = project(item, projection, context) if projection else copy.deepcopy(item)
+
+        units = read_units(size, consistent)
+        self.db._record(self.name, 'GetItem', calls=1, items=int(item is not None),
+                        scanned=int(item is not None), rcu=units)
+        response = self._consumed(params, self.name, units)
+        if item is not None:
+            response['Item'] = item
+        return response
+
+    def put_item(self, **params):
+        expressions, context = self._prepare(params, 'ConditionExpression')
+        data = self._data
+        item = normalize_item(params['Item'])
+        key = data.key_of(data.key_dict(item), 'PutItem')
+        self.db._round_trip(self.name, 'PutItem')
+
+        with self.db._lock:
+            old = data.get(key)
+            size = max(item_size(old), item_size(item))
+            self._check_condition(expressions['ConditionExpression'], old, context, 'PutItem', size)
+            units = write_units(size) + data.write(key, item)
+
+        self.db._record(self.name, 'PutItem', calls=1, items=1, wcu=units)
+        response = self._consumed(params, self.name, units)
+        if params.get('ReturnValues') == 'ALL_OLD' and old is not None:
+            response['Attributes'] = copy.deepcopy(old)
+        return response
+
+    def delete_item(self, **params):
+        expressions, context = self._prepare(params, 'ConditionExpression')
+        data = self._data
+        key = data.key_of(params['Key'], 'DeleteItem')
+        self.db._round_trip(self.name, 'DeleteItem')
+
+        with self.db._lock:
+            old = data.get(key)
+            size = item_size(old)
+            self._check_condition(expressions['ConditionExpression'], old, context, 'DeleteItem', size)
+            units = write_units(size) + (data.write(key, None) if old is not None else 0)
+
+        self.db._record(self.name, 'DeleteItem', calls=1, items=int(old is not None), wcu=units)
+        response = self._consumed(params, self.name, units)
+        if params.get('ReturnValues') == 'ALL_OLD' and old is not None:
+            response['Attributes'] = old
+        return response
+
+    def update_item(self, **params):
+        expressions, context = self._prepare(params, 'ConditionExpression')
+        data = self._data
+        raw_key = normalize_item(params['Key'])
+        key = data.key_of(raw_key, 'UpdateItem')
+        actions = parse_update(params['UpdateExpression']) if params.get('UpdateExpression') else ()
+        self.db._round_trip(self.name, 'UpdateItem')
+
+        with self.db._lock:
+            old = data.get(key)
+            self._check_condition(expressions['ConditionExpression'], old, context, 'UpdateItem', item_size(old))
+
+            updated, touched = apply_update(actions, old or raw_key, context)
+            if touched & set(raw_key):
+                raise _validation_error(
+                    "Cannot update attribute: this attribute is part of the key", 'UpdateItem'
+                )
+            units = write_units(max(item_size(old), item_size(updated))) + data.write(key, updated)
+
+        self.db._record(self.name, 'UpdateItem', calls=1, items=1, wcu=units)
+        response = self._consumed(params, self.name, units)
+        return_values = params.get('ReturnValues', 'NONE')
+        if return_values == 'ALL_NEW':
+            response['Attributes'] = copy.deepcopy(updated)
+        elif return_values == 'ALL_OLD' and old is not None:
+            response['Attributes'] = copy.deepcopy(old)
+        elif return_values in ('UPDATED_NEW', 'UPDATED_OLD'):
+            source = updated if return_values == 'UPDATED_NEW' else (old or {})
+            response['Attributes'] = {name: copy.deepcopy(source[name]) for name in touched if name in source}
+        return response
+
+    def query(self, **params):
+        expressions, context = self._prepare(params, 'KeyConditionExpression', 'FilterExpression')
+        if not expressions['KeyConditionExpression']:
+            raise _validation_error("Either the KeyConditions or KeyConditionExpression parameter must be specified", 'Query')
+
+        data = self._data
+        index_name = params.get('IndexName')
+        hash_key, range_key = data.key_names(index_name)
+        if index_name and params.get('ConsistentRead'):
+            raise _validation_error("Consistent reads are not supported on global secondary indexes", 'Query')
+
+        key_condition = parse_condition(expressions['KeyConditionExpression'])
+        partition = _partition_value(key_condition, hash_key, context)
+        unknown = _key_attributes(key_condition, context) - {hash_key, range_key}
+        if partition is None or unknown:
+            raise _validation_error("Query condition missed key schema element", 'Query')
+
+        self.db._round_trip(self.name, 'Query')
+        with self.db._lock:
+            ordered = [
+                entry for entry in data.query_items(index_name, partition[0])
+                if evaluate_condition(key_condition, entry[1], context)
+            ]
+            start = params.get('ExclusiveStartKey')
+            if params.get('ScanIndexForward', True):
+                if start:
+                    position = bisect.bisect_right([order for order, _ in ordered], data.order_key(normalize_item(start), index_name))
+                    ordered = ordered[position:]
+            else:
+                if start:
+                    position = bisect.bisect_left([order for order, _ in ordered], data.order_key(normalize_item(start), index_name))
+                    ordered = ordered[:position]
+                ordered.reverse()
+            return self._page('Query', params, expressions, context, [item for _, item in ordered], index_name)
+
+    def scan(self, **params):
+        expressions, context = self._prepare(params, 'FilterExpression')
+        data = self._data
+        index_name = params.get('IndexName')
+        data.key_names(index_name)
+        segment, total_segments = params.get('Segment'), params.get('TotalSegments')
+        if (segment is None) != (total_segments is None):
+            raise _validation_error("Segment and TotalSegments must be specified together", 'Scan')
+
+        self.db._round_trip(self.name, 'Scan')
+        with self.db._lock:
+            ordered = data.scan_items(index_name)
+            start = params.get('ExclusiveStartKey')
+            if start:
+                position = bisect.bisect_right([order for order, _ in ordered], data.scan_key(normalize_item(start), index_name))
+                ordered = ordered[position:]
+            if total_segments:
+                ordered = [entry for entry in ordered if entry[0][0] % total_segments == segment]
+            return self._page('Scan', params, expressions, context, [item for _, item in ordered], index_name)
+
+    def _page(self, operation, params, expressions, context, candidates, index_name):
+        """
+        Read one page of candidates (caller holds the lock): stop at Limit, the page
+        byte budget or max_page_items, then apply the filter and projection.
+        """
+        data = self._data
+        limit = params.get('Limit')
+        if self.db.max_page_items:
+            limit = min(limit, self.db.max_page_items) if limit else self.db.max_page_items
+        filter_node = parse_condition(expressions['FilterExpression']) if expressions.get('FilterExpression') else None
+        projection = parse_projection(params['ProjectionExpression']) if params.get('ProjectionExpression') else None
+
+        items, evaluated, page_bytes, last_item = [], 0, 0, None
+        for item in candidates:
+            size = item_size(item)
+            if evaluated and page_bytes + size > self.db.page_size_bytes:
+                break
+            evaluated += 1
+            page_bytes += size
+            last_item = item
+            if filter_node is None or evaluate_condition(filter_node, item, context):
+                items.append(project(item, projection, context) if projection else copy.deepcopy(item))
+            if limit and evaluated >= limit:
+                break
+
+        units = read_units(page_bytes, bool(params.get('ConsistentRead')))
+        self.db._record(self.name, operation, calls=1, items=len(items), scanned=evaluated, rcu=units)
+
+        response = {'Count': len(items), 'ScannedCount': evaluated}
+        if params.get('Select') != 'COUNT':
+            response['Items'] = items
+        if evaluated < len(candidates):
+            response['LastEvaluatedKey'] = copy.deepcopy(data.key_dict(last_item, index_name))
+        response.update(self._consumed(params, self.name, units))
+        return response
+
+# ---------------------------------------------------------------------------
+# Wiring into the backends' DynamoDBService classes
+# ---------------------------------------------------------------------------
+
+def bind_service(service, db):
+    """
+    Point an existing DynamoDBService (any of the three backends) at a LocalDynamoDB.
+    Works on the module-level instances the handlers create at import time.
+
+    Returns:
+        The same service
+    """
+    service.dynamodb = db
+    for attribute in ('main_table', 'orders_table'):
+        table_name = getattr(service, f"{attribute}_name", None)
+        if table_name:
+            setattr(service, attribute, db.Table(table_name))
+    return service
+
+def create_service(service_class, db):
+    """
+    Make a DynamoDBService on a LocalDynamoDB without creating a boto3 resource
+    (no AWS region or credentials needed). Table names come from MAIN_TABLE /
+    ORDERS_TABLE like in the Lambdas.
+
+    Args:
+        service_class: A backend's DynamoDBService class
+        db (LocalDynamoDB): The stand-in to use
+
+    Returns:
+        The service instance
+    """
+    service = service_class.__new__(service_class)
+    service.main_table_name = os.environ.get('MAIN_TABLE', 'matt-cognito-hop-main')
+    service.orders_table_name = os.environ.get('ORDERS_TABLE', 'matt-cognito-hop-orders')
+    return bind_service(service, db)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the capacity a GSI query and a filtered scan consume')
+    parser.add_argument('--users', type=int, default=2000, help='Users to generate')
+    parser.add_argument('--sessions', type=int, default=3, help='Sessions per user')
+    args = parser.parse_args()
+
+    from boto3.dynamodb.conditions import Attr, Key
+
+    db = LocalDynamoDB()
+    table_name = 'matt-cognito-hop-main'
+    items = []
+    for number in range(args.users):
+        user_id = f"user-{number:08x}"
+        items.append({'PK': user_id, 'SK': 'user', 'email': f"{user_id}@example.com",
+                      'GSI3-PK': f"sub-{number}", 'GSI3-SK': 'user'})
+        for session in range(args.sessions):
+            items.append({'PK': f"session-{number}-{session}", 'SK': 'session', 'user_id': user_id,
+                          'access_token': 'x' * 1000, 'GSI1-PK': f"user-{user_id}", 'GSI1-SK': f"session#{session}"})
+    db.seed_items(table_name, items)
+    table = db.Table(table_name)
+
+    target = f"user-{args.users // 2:08x}"
+    with db.track() as indexed:
+        table.query(IndexName='GSI1', KeyConditionExpression=Key('GSI1-PK').eq(f"user-{target}"))
+    with db.track() as scanned:
+        params = {'FilterExpression': Attr('user_id').eq(target) & Attr('SK').eq('session')}
+        while True:
+            response = table.scan(**params)
+            if 'LastEvaluatedKey' not in response:
+                break
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    print(json.dumps({
+        'items': db.item_count(table_name),
+        'gsi_query': indexed.as_dict()['total'],
+        'filtered_scan': scanned.as_dict()['total']
+    }, indent=2))
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Parallel segmented scan for bulk maintenance jobs (backfills, audits, exports).
+Splits the table into Segment/TotalSegments slices scanned by a thread pool,
+checkpoints every segment's LastEvaluatedKey to a JSON file so an interrupted
+run resumes where it stopped, and throttles itself to a read-capacity budget
+using the ConsumedCapacity DynamoDB reports for each page.
+
+Usage from another script in this folder:
+
+    from parallel_scan import ParallelScanner
+
+    scanner = ParallelScanner('my-table', total_segments=8, rcu_per_second=200,
+                              checkpoint_path='backfill.checkpoint.json')
+    for item in scanner.iter_items():        # generator: consume in this thread
+        ...
+    scanner.run(lambda items, segment: ...)  # callback: called from worker threads
+
+Pages are checkpointed only after they have been handled (callback returned,
+or the generator consumer asked for the item after the page's last one), so a
+resumed run may repeat at most the pages that were in flight: handlers should
+be idempotent.
+
+Run it directly to count items in a table:
+    python parallel_scan.py --table matt-cognito-hop-main --segments 8
+"""
+
+import argparse
+import base64
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+class RCURateLimiter:
+    """
+    Token bucket shared by all segment workers.
+    Each request waits until the bucket is positive, then the capacity the
+    page actually consumed is taken out (the bucket may go negative, which
+    makes the next requests wait longer).
+    """
+
+    def __init__(self, rcu_per_second):
+        self.rate = float(rcu_per_second)
+        self.tokens = self.rate  # allow one second of burst
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Add the tokens earned since the last refill (caller holds the lock)"""
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait(self, stop_event=None):
+        """Block until there is capacity left for another request"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens > 0:
+                    return
+                delay = -self.tokens / self.rate + 0.001
+
+            if stop_event is not None and stop_event.wait(delay):
+                return
+            if stop_event is None:
+                time.sleep(delay)
+
+    def consume(self, units):
+        """Charge the capacity a page consumed"""
+        with self._lock:
+            self._refill()
+            self.tokens -= units
+
+class ScanCheckpoint:
+    """
+    Per-segment progress saved as JSON: the last handled LastEvaluatedKey,
+    whether the segment finished, and how many items it produced so far.
+    """
+
+    def __init__(self, path, table_name, total_segments):
+        self.path = path
+        self.table_name = table_name
+        self.total_segments = total_segments
+        self.segments = {
+            segment: {'last_key': None, 'done': False, 'items': 0}
+            for segment in range(total_segments)
+        }
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        """Resume from an existing checkpoint file (it must describe the same scan)"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+
+        if saved.get('table') != self.table_name or saved.get('total_segments') != self.total_segments:
+            raise ValueError(
+                f"Checkpoint {self.path} is for table {saved.get('table')} with "
+                f"{saved.get('total_segments')} segments, not {self.table_name} with {self.total_segments}"
+            )
+
+        for segment, state in saved['segments'].items():
+            self.segments[int(segment)] = {
+                'last_key': _decode_key(state['last_key']),
+                'done': state['done'],
+                'items': state['items']
+            }
+
+    def pending_segments(self):
+        """Segments that still have pages to read"""
+        return [segment for segment, state in self.segments.items() if not state['done']]
+
+    def start_key(self, segment):
+        """ExclusiveStartKey to resume a segment from (None = from the beginning)"""
+        return self.segments[segment]['last_key']
+
+    def advance(self, segment, last_key, item_count):
+        """Record a handled page and persist the checkpoint"""
+        with self._lock:
+            state = self.segments[segment]
+            state['last_key'] = last_key
+            state['done'] = last_key is None
+            state['items'] += item_count
+            self._save()
+
+    def total_items(self):
+        """Items handled across all segments, including earlier runs"""
+        return sum(state['items'] for state in self.segments.values())
+
+    def _save(self):
+        """Write the checkpoint atomically (caller holds the lock)"""
+        if not self.path:
+            return
+
+        data = {
+            'table': self.table_name,
+            'total_segments': self.total_segments,
+            'segments': {
+                str(segment): {
+                    'last_key': _encode_key(state['last_key']),
+                    'done': state['done'],
+                    'items': state['items']
+                }
+                for segment, state in self.segments.items()
+            }
+        }
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.scan-checkpoint-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+def _encode_key(key):
+    """Make a low-level LastEvaluatedKey JSON safe (binary key values are base64 encoded)"""
+    if key is None:
+        return None
+    encoded = {}
+    for name, value in key.items():
+        if 'B' in value:
+            encoded[name] = {'B64': base64.b64encode(value['B']).decode('ascii')}
+        else:
+            encoded[name] = value
+    return encoded
+
+def _decode_key(key):
+    """Reverse _encode_key"""
+    if key is None:
+        return None
+    decoded = {}
+    for name, value in key.items():
+        if 'B64' in value:
+            decoded[name] = {'B': base64.b64decode(value['B64'])}
+        else:
+            decoded[name] = value
+    return decoded
+
+class ParallelScanner:
+    """
+    Scan a whole table with TotalSegments parallel workers.
+    Uses one low-level client (thread safe) and hands back items as plain
+    Python values, like the boto3 Table resource does.
+    """
+
+    def __init__(self, table_name, total_segments=8, max_workers=None, rcu_per_second=None,
+                 page_size=None, scan_params=None, checkpoint_path=None, client=None,
+                 region=None, endpoint_url=None):
+        """
+        Args:
+            table_name (str): Table to scan
+            total_segments (int): Number of Segment slices
+            max_workers (int): Threads scanning at once (default: one per segment, max 32)
+            rcu_per_second (float): Read capacity budget across all workers (None = unlimited)
+            page_size (int): Limit per Scan request (optional)
+            scan_params (dict): Extra Scan parameters, e.g. FilterExpression (boto3 conditions allowed)
+            checkpoint_path (str): JSON file to resume from / save progress to (optional)
+            client: boto3 DynamoDB client to use (optional)
+            region (str): AWS region when no client is given
+            endpoint_url (str): e.g. http://localhost:8000 for DynamoDB Local
+        """
+        self.table_name = table_name
+        self.total_segments = total_segments
+        self.max_workers = max_workers or min(total_segments, 32)
+        self.page_size = page_size
+        self.client = client or boto3.client(
+            'dynamodb',
+            region_name=region,
+            endpoint_url=endpoint_url,
+            config=Config(retries={'max_attempts': 10, 'mode': 'adaptive'}, max_pool_connections=self.max_workers)
+        )
+        self.rate_limiter = RCURateLimiter(rcu_per_second) if rcu_per_second else None
+        self.checkpoint = ScanCheckpoint(checkpoint_path, table_name, total_segments)
+        self.scan_params = self._build_scan_params(scan_params or {})
+
+        self.consumed_rcu = 0.0
+        self.pages = 0
+        self._stats_lock = threading.Lock()
+        self._deserializer = TypeDeserializer()
+
+    def _build_scan_params(self, params):
+        """Turn resource-style parameters (condition objects, Python values) into low-level ones"""
+        params = dict(params)
+        names = dict(params.pop('ExpressionAttributeNames', {}))
+        values = dict(params.pop('ExpressionAttributeValues', {}))
+
+        if isinstance(params.get('FilterExpression'), ConditionBase):
+            built = ConditionExpressionBuilder().build_expression(params['FilterExpression'])
+            params['FilterExpression'] = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            values.update(built.attribute_value_placeholders)
+
+        if names:
+            params['ExpressionAttributeNames'] = names
+        if values:
+            serializer = TypeSerializer()
+            params['ExpressionAttributeValues'] = {name: serializer.serialize(value) for name, value in values.items()}
+
+        return params
+
+    def _scan_segment(self, segment, handle_page, stop_event):
+        """
+        Read one segment page by page until it is exhausted or the scan is stopped.
+
+        Args:
+            segment (int): Segment number
+            handle_page (callable): Called with (items, segment, last_key) for every page
+            stop_event (threading.Event): Set when the scan should stop early
+        """
+        start_key = self.checkpoint.start_key(segment)
+
+        while not stop_event.is_set():
+            if self.rate_limiter:
+                self.rate_limiter.wait(stop_event)
+                if stop_event.is_set():
+                    return
+
+            request = dict(self.scan_params)
+            request.update({
+                'TableName': self.table_name,
+                'Segment': segment,
+                'TotalSegments': self.total_segments,
+                'ReturnConsumedCapacity': 'TOTAL'
+            })
+            if self.page_size:
+                request['Limit'] = self.page_size
+            if start_key:
+                request['ExclusiveStartKey'] = start_key
+
+            response = self.client.scan(**request)
+
+            units = response.get('ConsumedCapacity', {}).get('CapacityUnits', 0.0)
+            if self.rate_limiter:
+                self.rate_limiter.consume(units)
+            with self._stats_lock:
+                self.consumed_rcu += units
+                self.pages += 1
+
+            items = [
+                {name: self._deserializer.deserialize(value) for name, value in item.items()}
+                for item in response.get('Items', [])
+            ]
+            start_key = response.get('LastEvaluatedKey')
+            handle_page(items, segment, start_key)
+
+            if not start_key:
+                return
+
+    def run(self, callback):
+        """
+        Scan every pending segment in parallel, calling callback(items, segment)
+        from the worker threads for each page. The first exception stops the
+        other workers and is re-raised here once they have finished.
+
+        Args:
+            callback (callable): Receives (items, segment) per page
+
+        Returns:
+            dict: Scan statistics
+        """
+        stop_event = threading.Event()
+        started_at = time.monotonic()
+
+        def handle_page(items, segment, last_key):
+            callback(items, segment)
+            self.checkpoint.advance(segment, last_key, len(items))
+
+        def worker(segment):
+            try:
+                self._scan_segment(segment, handle_page, stop_event)
+            except BaseException:
+                stop_event.set()
+                raise
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(worker, segment) for segment in self.checkpoint.pending_segments()]
+
+        for future in futures:
+            future.result()
+
+        return self.stats(time.monotonic() - started_at)
+
+    def iter_items(self):
+        """
+        Scan every pending segment in parallel and yield items in this thread.
+        At most a couple of pages per worker are buffered; closing the generator
+        early stops the workers.
+
+        Yields:
+            dict: Items from the table
+        """
+        stop_event = threading.Event()
+        pages = queue.Queue(maxsize=self.max_workers * 2)
+        finished = object()
+        pending = self.checkpoint.pending_segments()
+
+        def put(entry):
+            # don't block forever if the consumer went away
+            while not stop_event.is_set():
+                try:
+                    pages.put(entry, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def worker(segment):
+            try:
+                self._scan_segment(segment, lambda items, seg, last_key: put((seg, items, last_key)), stop_event)
+                put((segment, finished, None))
+            except BaseException as e:
+                put((segment, e, None))
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        for segment in pending:
+            executor.submit(worker, segment)
+
+        remaining = len(pending)
+        try:
+            while remaining:
+                segment, items, last_key = pages.get()
+                if items is finished:
+                    remaining -= 1
+                    continue
+                if isinstance(items, BaseException):
+                    raise items
+
+                yield from items
+                # the consumer has handled the whole page by the time we get back here
+                self.checkpoint.advance(segment, last_key, len(items))
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=True)
+
+    def stats(self, elapsed=None):
+        """
+        Returns:
+            dict: Items handled, pages read, RCU consumed, and segments still pending
+        """
+        stats = {
+            'items': self.checkpoint.total_items(),
+            'pages': self.pages,
+            'consumed_rcu': round(self.consumed_rcu, 1),
+            'pending_segments': len(self.checkpoint.pending_segments())
+        }
+        if elapsed is not None:
+            stats['elapsed_seconds'] = round(elapsed, 2)
+        return stats
+
+def add_scan_arguments(parser):
+    """Add the shared --segments/--rcu/--checkpoint/--endpoint-url options to a script's parser"""
+    parser.add_argument('--segments', type=int, default=8, help='Parallel scan segments')
+    parser.add_argument('--rcu', type=float, default=None, help='Read capacity units per second to stay under')
+    parser.add_argument('--page-size', type=int, default=None, help='Items evaluated per Scan request')
+    parser.add_argument('--checkpoint', default=None, help='Checkpoint file to resume from / save progress to')
+    parser.add_argument('--endpoint-url', default=None, help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Count the items in a table with a parallel scan')
+    parser.add_argument('--table', default='matt-cognito-hop-main', help='DynamoDB table name')
+    parser.add_argument('--region', default='ap-southeast-2', help='AWS region')
+    add_scan_arguments(parser)
+    args = parser.parse_args()
+
+    scanner = ParallelScanner(
+        args.table,
+        total_segments=args.segments,
+        rcu_per_second=args.rcu,
+        page_size=args.page_size,
+        scan_params={'ProjectionExpression': 'PK'},
+        checkpoint_path=args.checkpoint,
+        region=args.region,
+        endpoint_url=args.endpoint_url
+    )
+    print(f"Scanning {args.table} with {args.segments} segments...")
+    print(json.dumps(scanner.run(lambda items, segment: None)))
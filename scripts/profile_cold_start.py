@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Cold start profiler for the Lambda handlers.
+Reads every function from the backends' serverless.yml files (and their
+functions/*.yml includes) and imports its
+handler in a fresh interpreter with -X importtime, the way the Lambda runtime
+does on a cold start - module-level code included (service and repository
+setup). For each handler it reports the init time (median over --runs fresh
+interpreters), the whole process time (interpreter start + init) and the
+import tree of the median run, slowest modules first:
+
+    python profile_cold_start.py
+    python profile_cold_start.py --functions validateAppChannel,getSession --depth 6
+    python profile_cold_start.py --check          # exit 1 when a handler is over its budget
+
+A handler is over its budget when its init time is above INIT_BUDGETS_MS
+(DEFAULT_INIT_BUDGET_MS unless listed) or when it imports one of
+DEFERRED_MODULES at init - boto3 and the jwt libraries load on first use,
+so a module-level import of them is a regression on any machine. Times
+depend on the machine: the budgets are for a laptop / CI runner, a 128 MB
+Lambda gets a fraction of a vCPU and is several times slower. Runs with the
+bytecode cache warm (the first run is a discarded warm-up).
+No AWS access needed, nothing is called.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_ROOT = os.path.join(REPO_ROOT, 'backend')
+BACKENDS = ['sso_backend', 'client_backend', 'admin_backend']
+
+# Init budget per handler ('backend/function'), in ms on the machine running the check
+DEFAULT_INIT_BUDGET_MS = 80
+INIT_BUDGETS_MS = {}
+# Packages no handler may import at init: the services import them on first use
+DEFERRED_MODULES = ('boto3', 's3transfer', 'jose', 'jwt', 'cryptography', 'rsa', 'urllib3')
+
+# Configuration the handlers read at import, like the Lambda environment
+HANDLER_ENVIRONMENT = {
+    'COGNITO_USER_POOL_ID': 'ap-southeast-2_coldstart',
+    'COGNITO_APP_CLIENT_ID': 'coldstart-client',
+    'COGNITO_CLIENT_ID': 'coldstart-client',
+    'AWS_REGION': 'ap-southeast-2',
+    'AWS_DEFAULT_REGION': 'ap-southeast-2',
+    'MAIN_TABLE': 'matt-cognito-hop-main',
+    'ORDERS_TABLE': 'matt-cognito-hop-orders'
+}
+
+MARKER = '--- handler import ---'
+# Imports the handler module and resolves the function, like the runtime's init phase
+PROBE = f"""
+import importlib, json, os, sys, time
+os.write(2, b'{MARKER}\\n')
+started = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+getattr(module, sys.argv[2])
+init_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{'init_ms': init_ms, 'modules': sorted(sys.modules)}}))
+"""
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)\s*$')
+HANDLER_LINE = re.compile(r'^\s+handler:\s*(\S+)\s*$')
+
+def read_functions(backend_name):
+    """
+    List the functions a backend can deploy: the ones in its serverless.yml plus
+    the ones in its functions/*.yml includes (every deployment mode, so the SSO
+    router is profiled next to the per-route functions)
+
+    Returns:
+        list: (function name, handler path) pairs
+    """
+    backend_dir = os.path.join(BACKEND_ROOT, backend_name)
+    with open(os.path.join(backend_dir, 'serverless.yml'), 'r', encoding='utf-8') as f:
+        functions = parse_functions(f, indent='  ', section='functions:')
+
+    for path in sorted(glob.glob(os.path.join(backend_dir, 'functions', '*.yml'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            functions.extend(parse_functions(f, indent=''))
+
+    return functions
+
+def parse_functions(lines, indent, section=None):
+    """
+    Read function names and handlers from serverless yaml lines, without a yaml parser
+
+    Args:
+        lines: the file's lines
+        indent (str): indentation of the function names
+        section (str): top-level key the functions are under, None if they are top-level
+
+    Returns:
+        list: (function name, handler path) pairs, in file order
+    """
+    function_line = re.compile(rf'^{indent}([A-Za-z0-9_-]+):\s*$')
+    functions = []
+    in_section = section is None
+    current = None
+
+    for line in lines:
+        if section and not line.startswith(' ') and line.strip():
+            in_section = line.startswith(section)
+            continue
+        if not in_section:
+            continue
+
+        function_match = function_line.match(line)
+        if function_match:
+            current = function_match.group(1)
+            continue
+
+        handler_match = HANDLER_LINE.match(line)
+        if handler_match and current:
+            functions.append((current, handler_match.group(1)))
+            current = None
+
+    return functions
+
+def parse_import_tree(stderr):
+    """
+    Turn -X importtime output (children are printed before their parent) into a tree
+
+    Returns:
+        list: top-level imports made by the handler import, as
+            {'name', 'self_ms', 'ms', 'children'} dicts
+    """
+    pending = {}
+    for line in stderr.split(MARKER, 1)[-1].splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        node = {
+            'name': name,
+            'self_ms': int(self_us) / 1000,
+            'ms': int(cumulative_us) / 1000,
+            'children': pending.pop(depth + 1, [])
+        }
+        pending.setdefault(depth, []).append(node)
+
+    return pending.get(0, [])
+
+def run_probe(backend_name, handler_path):
+    """
+    Import one handler in a fresh interpreter
+
+    Returns:
+        dict: init_ms, process_ms, modules and tree
+    """
+    module_name, function_name = handler_path.rsplit('.', 1)
+    env = dict(os.environ, **HANDLER_ENVIRONMENT)
+    env.pop('PYTHONPATH', None)
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE, module_name, function_name],
+        cwd=os.path.join(BACKEND_ROOT, backend_name), env=env, capture_output=True, text=True
+    )
+    process_ms = (time.perf_counter() - started) * 1000
+
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {handler_path} failed:\n{result.stderr.split(MARKER, 1)[-1].strip()[-2000:]}")
+
+    # handlers may log at import, the probe's own line is the last one
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        'init_ms': measured['init_ms'],
+        'process_ms': process_ms,
+        'modules': measured['modules'],
+        'tree': parse_import_tree(result.stderr)
+    }
+
+def profile_function(backend_name, function_name, handler_path, runs):
+    """
+    Profile one handler over several fresh interpreters (plus a discarded warm-up)
+
+    Returns:
+        dict: median timings, the median run's import tree, deferred modules it
+            imported and the budget check
+    """
+    run_probe(backend_name, handler_path)
+    probes = sorted((run_probe(backend_name, handler_path) for _ in range(runs)), key=lambda probe: probe['init_ms'])
+    median = probes[len(probes) // 2]
+
+    budget_ms = INIT_BUDGETS_MS.get(f"{backend_name}/{function_name}", DEFAULT_INIT_BUDGET_MS)
+    deferred = sorted({name for name in median['modules'] if name.split('.')[0] in DEFERRED_MODULES})
+    init_ms = statistics.median(probe['init_ms'] for probe in probes)
+
+    violations = []
+    if init_ms > budget_ms:
+        violations.append(f"init {init_ms:.1f} ms (budget {budget_ms} ms)")
+    if deferred:
+        roots = sorted({name.split('.')[0] for name in deferred})
+        violations.append(f"imports {', '.join(roots)} at init")
+
+    return {
+        'backend': backend_name,
+        'function': function_name,
+        'handler': handler_path,
+        'init_ms': round(init_ms, 1),
+        'process_ms': round(statistics.median(probe['process_ms'] for probe in probes), 1),
+        'modules': len(median['modules']),
+        'budget_ms': budget_ms,
+        'deferred_imported': deferred,
+        'violations': violations,
+        'tree': median['tree']
+    }
+
+def print_tree(nodes, min_ms, max_depth, depth=0):
+    """Print an import tree, slowest first, hiding modules under min_ms"""
+    for node in sorted(nodes, key=lambda node: node['ms'], reverse=True):
+        if node['ms'] < min_ms:
+            continue
+        print(f"  {node['ms']:>8.1f} ms  {'  ' * depth}{node['name']}")
+        if depth + 1 < max_depth:
+            print_tree(node['children'], min_ms, max_depth, depth + 1)
+
+def print_report(results, min_ms, max_depth):
+    """Per handler import trees, then one summary line per handler"""
+    for result in results:
+        print(f"\n{result['backend']}/{result['function']}  {result['handler']}")
+        print(f"  init {result['init_ms']:.1f} ms (budget {result['budget_ms']} ms), "
+              f"process {result['process_ms']:.1f} ms, {result['modules']} modules")
+        print_tree(result['tree'], min_ms, max_depth)
+
+    print()
+    print(f"{'function':<42}{'init ms':>9}{'budget':>8}{'process ms':>12}{'modules':>9}  status")
+    for result in results:
+        status = 'ok' if not result['violations'] else 'OVER: ' + '; '.join(result['violations'])
+        print(f"{result['backend'] + '/' + result['function']:<42}{result['init_ms']:>9.1f}{result['budget_ms']:>8}"
+              f"{result['process_ms']:>12.1f}{result['modules']:>9}  {status}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Profile the cold start imports of every serverless.yml handler')
+    parser.add_argument('--backends', default=','.join(BACKENDS), help='Comma separated backends to profile')
+    parser.add_argument('--functions', default=None, help='Comma separated function names (default: all)')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per handler (median is reported)')
+    parser.add_argument('--min-ms', type=float, default=1.0, help='Hide modules faster than this in the tree')
+    parser.add_argument('--depth', type=int, default=4, help='Import tree levels to show')
+    parser.add_argument('--check', action='store_true', help='Exit 1 if any handler is over its budget')
+    parser.add_argument('--json', dest='json_path', default=None, help='Also write the results to this file')
+    args = parser.parse_args()
+
+    wanted = set(args.functions.split(',')) if args.functions else None
+    results = []
+    for backend_name in args.backends.split(','):
+        if backend_name not in BACKENDS:
+            parser.error(f"unknown backend {backend_name} (choose from {', '.join(BACKENDS)})")
+
+        for function_name, handler_path in read_functions(backend_name):
+            if wanted and function_name not in wanted:
+                continue
+            print(f"Profiling {backend_name}/{function_name}...", file=sys.stderr)
+            results.append(profile_function(backend_name, function_name, handler_path, args.runs))
+
+    if not results:
+        parser.error('no handlers matched')
+
+    print_report(results, args.min_ms, args.depth)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+    over = [result for result in results if result['violations']]
+    if args.check and over:
+        print(f"\n{len(over)} of {len(results)} handlers over their cold start budget", file=sys.stderr)
+        sys.exit(1)
@@ -54,7 +54,10 @@ def update_admin_user_with_sub(cognito_sub):
                 "user_id": ADMIN_USER_ID,
                 "email": item.get("email", "matthew.enarle@ecloudvalley.com"),
                 "is_admin": True,
-                "sub": cognito_sub  # Add the sub
+                "sub": cognito_sub,  # Add the sub
+                # GSI3 for sub lookups
+                "GSI3-PK": f"sub-{cognito_sub}",
+                "GSI3-SK": "user"
             }
             
             # Add additional fields from profile if available
@@ -76,6 +79,8 @@ def update_admin_user_with_sub(cognito_sub):
         # Update existing user record
         item = response['Item']
         item['sub'] = cognito_sub
+        item['GSI3-PK'] = f"sub-{cognito_sub}"
+        item['GSI3-SK'] = "user"
         
         # Update the user record
         table.put_item(Item=item)